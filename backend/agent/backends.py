@@ -0,0 +1,149 @@
+"""
+Filesystem backends for the RepoLearn Deep Agent.
+
+Sandboxes file operations: read-only access to cloned repositories and
+structure-enforced writes to tutorials. Imported lazily by agent/graph.py
+so that importing the package doesn't pull in deepagents.
+"""
+
+from deepagents.backends import FilesystemBackend
+from deepagents.backends.protocol import WriteResult, EditResult, FileInfo, GrepMatch
+
+from agent.ignore_policy import describe_flags, get_ignore_policy
+from agent.repo_store import get_repo_store
+from agent.run_context import current_thread_id
+from agent.run_scope import get_tutorial_scope
+
+
+class ReadOnlyRepoBackend(FilesystemBackend):
+    """Prevents write/edit operations on the repositories folder.
+    
+    Reads also report access to the disk quota manager and lazily restore
+    clones that were evicted. Every read tool applies the clone's ignore
+    policy (dependencies, lockfiles, generated/minified/binary files).
+    """
+    def _touch(self, path: str | None) -> str | None:
+        """Report the access and restore an evicted clone; returns an error message on failure."""
+        repo_name = (path or "").strip("/").split("/")[0]
+        if not repo_name:
+            return None
+        try:
+            error = get_repo_store().ensure_available(repo_name)
+        except Exception as e:
+            error = f"Failed to restore repository {repo_name}: {e}"
+        return f"Error: {error}" if error else None
+
+    def _filter_flags(self, path: str, is_dir: bool = False) -> int | None:
+        """Ignore-policy flags for a virtual path: 0 = visible, None = hidden directory."""
+        repo_name, _, rel_path = path.strip("/").partition("/")
+        if not rel_path:
+            return 0
+        policy = get_ignore_policy(repo_name)
+        if policy is None:
+            return 0
+        if is_dir:
+            return None if policy.is_hidden_dir(rel_path) else 0
+        return policy.flags_for(rel_path)
+
+    def _visible(self, info: dict) -> bool:
+        return self._filter_flags(info.get("path", ""), bool(info.get("is_dir"))) == 0
+
+    def ls_info(self, path: str) -> list[FileInfo]:
+        error = self._touch(path)
+        if error:
+            # ls/glob only show paths, so the error travels as the single entry
+            return [{"path": error}]
+        return [info for info in super().ls_info(path) if self._visible(info)]
+
+    def read(self, file_path: str, offset: int = 0, limit: int = 2000) -> str:
+        error = self._touch(file_path)
+        if error:
+            return error
+        flags = self._filter_flags(file_path)
+        if flags:
+            return (
+                f"Error: FILTERED ({', '.join(describe_flags(flags))}): {file_path} is excluded by the "
+                f"repository ignore policy and is rarely worth reading. If you really need it, "
+                f"call read_ignored_file(\"{file_path}\")."
+            )
+        return super().read(file_path, offset, limit)
+
+    def grep_raw(self, pattern: str, path: str | None = None, glob: str | None = None) -> list[GrepMatch] | str:
+        error = self._touch(path)
+        if error:
+            return error
+        matches = super().grep_raw(pattern, path, glob)
+        if isinstance(matches, str):
+            return matches
+        return [match for match in matches if self._visible(match)]
+
+    def glob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
+        error = self._touch(path)
+        if error:
+            return [{"path": error}]
+        return [info for info in super().glob_info(pattern, path) if self._visible(info)]
+
+    def write(self, file_path: str, content: str) -> WriteResult:
+        return WriteResult(error=f"PERMISSION DENIED: Write access not allowed in repository backend for {file_path}. Use /tutorials/ path for your output.")
+
+    def edit(self, file_path: str, old_string: str, new_string: str, replace_all: bool = False) -> EditResult:
+        return EditResult(error=f"PERMISSION DENIED: Edit access not allowed in repository backend for {file_path}. Use /tutorials/ path for your output.")
+
+class RestrictedTutorialsBackend(FilesystemBackend):
+    """Enforces that all writes/edits go into /{repo_name}/{audience}/structure.
+    
+    Once a run has called get_tutorial_path, writes from that run (and its
+    subagents) are further limited to that one tutorial folder.
+    """
+    
+    def _validate_path(self, file_path: str) -> str | None:
+        """Returns error message if path is invalid, None if valid.
+        Note: file_path here is already stripped of the /tutorials/ prefix by CompositeBackend.
+        Expected format: repo_name/audience/filename.md
+        """
+        parts = file_path.strip("/").split("/")
+        
+        if len(parts) < 3:
+            return (
+                f"INVALID PATH: '{file_path}'. "
+                f"Tutorial files must be written inside specific audience folders. "
+                f"Correct format: /tutorials/{{repo_name}}/{{audience}}/filename.md. "
+                f"Always call get_tutorial_path(url, audience) FIRST to get the correct path."
+            )
+        
+        audience = parts[1]
+        if audience not in ("user", "dev"):
+            return (
+                f"INVALID AUDIENCE: '{audience}' in path '{file_path}'. "
+                f"The second folder must be 'user' or 'dev'. "
+                f"Call get_tutorial_path(url, 'user') or get_tutorial_path(url, 'dev')."
+            )
+        
+        # Runs (and their subagents) may only write to their own tutorial folder
+        scope = get_tutorial_scope(current_thread_id())
+        if not scope:
+            return (
+                f"NO TUTORIAL PATH: '{file_path}'. "
+                f"This run has no tutorial folder yet. "
+                f"Call get_tutorial_path(url, audience) before writing tutorial files."
+            )
+        if "/".join(parts[:2]) != scope:
+            return (
+                f"OUT OF SCOPE: '{file_path}'. "
+                f"This run may only write under /tutorials/{scope}/. "
+                f"Use the path returned by get_tutorial_path(url, audience)."
+            )
+        
+        return None  # Valid structure
+
+    def write(self, file_path: str, content: str) -> WriteResult:
+        error = self._validate_path(file_path)
+        if error:
+            return WriteResult(error=error)
+        return super().write(file_path, content)
+
+    def edit(self, file_path: str, old_string: str, new_string: str, replace_all: bool = False) -> EditResult:
+        error = self._validate_path(file_path)
+        if error:
+            return EditResult(error=error)
+        return super().edit(file_path, old_string, new_string, replace_all)
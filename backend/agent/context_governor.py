@@ -0,0 +1,360 @@
+"""
+Context-window governor middleware.
+
+Long runs resend an ever-growing message history on every model call: tool
+results, subagent reports and full file contents. This middleware enforces a
+token budget on each model request, without touching the agent's state:
+
+1. Stale tool outputs (older than the last few AI turns) are replaced by short
+   stubs, e.g. "[stale read_file /repo/main.py: 400 lines, 12000 chars elided] …".
+2. If the request is still over budget, older turns are collapsed into one
+   digest message; the original task and the most recent turns are kept, and
+   tool calls are never separated from their results. The latest tool-call
+   turn is always kept; if it alone exceeds the recent-turns budget its tool
+   outputs are truncated rather than summarised away.
+
+Savings are accumulated per thread_id in memory and exposed via the custom API
+(`/context-stats/{thread_id}`). When the main agent finishes, the run's totals
+are logged and kept (for the last KEEP_COMPLETED_RUNS runs), so the endpoint
+still reports them afterwards; a new run on the same thread starts from zero.
+
+Configuration (environment):
+    REPOLEARN_CONTEXT_BUDGET_TOKENS: Token budget per model call (default 24000)
+"""
+
+from __future__ import annotations
+
+import os
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, List, TypedDict
+
+from langchain.agents.middleware.types import AgentMiddleware
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, ToolMessage
+
+from agent.run_context import current_thread_id
+
+DEFAULT_BUDGET_TOKENS = 24000
+# Tool outputs from before this many AI turns ago are stubbed
+KEEP_RECENT_TURNS = 3
+# Tool outputs shorter than this are cheap enough to keep verbatim
+STUB_MIN_CHARS = 800
+# Share of the budget reserved for recent turns when summarising
+RECENT_BUDGET_SHARE = 0.6
+# Rough token estimate used for budgeting (no tokenizer dependency)
+CHARS_PER_TOKEN = 4
+# Finished runs whose savings stay queryable
+KEEP_COMPLETED_RUNS = 100
+
+DIGEST_PREFIX = "[Context governor] Summary of earlier turns (details elided to save context):"
+
+
+class ContextStats(TypedDict):
+    """Per-thread savings accumulated by the governor."""
+    model_calls: int
+    tokens_before: int      # Estimated tokens that would have been sent
+    tokens_after: int       # Estimated tokens actually sent
+    tokens_saved: int
+    stubbed_tool_outputs: int
+    summarised_messages: int
+
+
+def get_budget_tokens() -> int:
+    try:
+        return int(os.getenv("REPOLEARN_CONTEXT_BUDGET_TOKENS", DEFAULT_BUDGET_TOKENS))
+    except ValueError:
+        return DEFAULT_BUDGET_TOKENS
+
+
+def _content_text(message: AnyMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    parts = []
+    for block in content or []:
+        if isinstance(block, str):
+            parts.append(block)
+        elif isinstance(block, dict) and block.get("type") == "text":
+            parts.append(str(block.get("text", "")))
+    return "\n".join(parts)
+
+
+def estimate_tokens(messages: List[AnyMessage]) -> int:
+    """Cheap token estimate: content plus serialized tool-call arguments."""
+    chars = 0
+    for message in messages:
+        chars += len(_content_text(message))
+        for call in getattr(message, "tool_calls", None) or []:
+            chars += len(str(call.get("args", "")))
+    return chars // CHARS_PER_TOKEN
+
+
+def _brief(text: str, limit: int = 160) -> str:
+    first = next((line.strip() for line in text.splitlines() if line.strip()), "")
+    return first if len(first) <= limit else first[: limit - 1] + "…"
+
+
+def _call_target(args: Dict[str, Any]) -> str:
+    for key in ("file_path", "path", "pattern", "subagent_type", "github_url"):
+        if key in args:
+            return str(args[key])
+    return ""
+
+
+class ContextGovernorMiddleware(AgentMiddleware):
+    """
+    Middleware that keeps each model request within a token budget.
+
+    Each instance is bound to an agent name (the main graph or a subagent).
+    """
+
+    def __init__(self, agent_name: str = "main", budget_tokens: int | None = None):
+        """
+        Initialize the middleware.
+
+        Args:
+            agent_name: The agent this middleware is attached to (for logging)
+            budget_tokens: Token budget per model call (defaults to the env setting)
+        """
+        self.agent_name = agent_name
+        self.budget_tokens = budget_tokens
+
+    def wrap_model_call(self, request: Any, handler: Callable[[Any], Any]) -> Any:
+        """Compact the request's messages (sync version)."""
+        return handler(self._govern_request(request))
+
+    async def awrap_model_call(self, request: Any, handler: Callable[[Any], Any]) -> Any:
+        """Compact the request's messages (async version)."""
+        return await handler(self._govern_request(request))
+
+    def after_agent(self, state: Any, runtime: Any) -> None:
+        """Log and archive the thread's savings once the main agent's run completes."""
+        if self.agent_name == "main":
+            thread_id = current_thread_id()
+            if thread_id:
+                finish_context_stats(thread_id)
+        return None
+
+    async def aafter_agent(self, state: Any, runtime: Any) -> None:
+        return self.after_agent(state, runtime)
+
+    def _govern_request(self, request: Any) -> Any:
+        messages = list(getattr(request, "messages", None) or [])
+        if not messages:
+            return request
+
+        budget = self.budget_tokens or get_budget_tokens()
+        governed, stubbed, summarised = govern_messages(messages, budget)
+        if not stubbed and not summarised:
+            _record(current_thread_id(), estimate_tokens(messages), None, 0, 0)
+            return request
+
+        _record(current_thread_id(), estimate_tokens(messages), estimate_tokens(governed), stubbed, summarised)
+        if hasattr(request, "override"):
+            return request.override(messages=governed)
+        request.messages = governed
+        return request
+
+
+def govern_messages(messages: List[AnyMessage], budget_tokens: int) -> tuple[List[AnyMessage], int, int]:
+    """
+    Apply the stubbing and summarisation passes.
+
+    Returns:
+        (messages to send, number of stubbed tool outputs, number of summarised messages)
+    """
+    governed, stubbed = _stub_stale_tool_outputs(messages)
+    summarised = 0
+    if estimate_tokens(governed) > budget_tokens:
+        governed, summarised, truncated = _summarise_old_turns(governed, budget_tokens)
+        stubbed += truncated
+    return governed, stubbed, summarised
+
+
+def _stub_stale_tool_outputs(messages: List[AnyMessage]) -> tuple[List[AnyMessage], int]:
+    ai_positions = [i for i, m in enumerate(messages) if isinstance(m, AIMessage)]
+    if len(ai_positions) <= KEEP_RECENT_TURNS:
+        return messages, 0
+    cutoff = ai_positions[-KEEP_RECENT_TURNS]
+
+    calls: Dict[str, tuple[str, Dict[str, Any]]] = {}
+    for message in messages[:cutoff]:
+        for call in getattr(message, "tool_calls", None) or []:
+            calls[call.get("id")] = (call.get("name", "tool"), call.get("args") or {})
+
+    result: List[AnyMessage] = []
+    stubbed = 0
+    for i, message in enumerate(messages):
+        text = _content_text(message) if isinstance(message, ToolMessage) else ""
+        if i >= cutoff or len(text) < STUB_MIN_CHARS or text.startswith("[stale "):
+            result.append(message)
+            continue
+        name, args = calls.get(message.tool_call_id, (message.name or "tool", {}))
+        target = _call_target(args)
+        label = f"{name} {target}".strip()
+        stub = (
+            f"[stale {label}: {len(text.splitlines())} lines, {len(text)} chars elided] "
+            f"{_brief(text)}"
+        )
+        result.append(ToolMessage(content=stub, tool_call_id=message.tool_call_id, name=message.name, id=message.id))
+        stubbed += 1
+    return result, stubbed
+
+
+def _summarise_old_turns(messages: List[AnyMessage], budget_tokens: int) -> tuple[List[AnyMessage], int, int]:
+    """
+    Collapse the turns between the task and the recent ones into a digest.
+
+    Returns:
+        (messages, number of summarised messages, number of truncated tool outputs)
+    """
+    # Keep the original task (first human message) verbatim
+    head_end = next((i + 1 for i, m in enumerate(messages) if isinstance(m, HumanMessage)), 0)
+
+    # Walk back from the end until the recent share of the budget is used up
+    recent_budget = int(budget_tokens * RECENT_BUDGET_SHARE)
+    start = len(messages)
+    used = 0
+    while start > head_end:
+        cost = estimate_tokens([messages[start - 1]])
+        if used + cost > recent_budget and start < len(messages):
+            break
+        used += cost
+        start -= 1
+    # Never start on a tool result: move back to the AI message that issued the call
+    while start > head_end and start < len(messages) and isinstance(messages[start], ToolMessage):
+        start -= 1
+    # The latest tool-call turn (the call the model is answering) is always kept
+    last_call = next(
+        (i for i in range(len(messages) - 1, head_end - 1, -1)
+         if isinstance(messages[i], AIMessage) and messages[i].tool_calls),
+        len(messages),
+    )
+    start = min(start, last_call)
+
+    recent, truncated = _truncate_tool_outputs(messages[start:], recent_budget)
+    middle = messages[head_end:start]
+    if not middle:
+        return messages[:head_end] + recent, 0, truncated
+
+    lines = [DIGEST_PREFIX]
+    for message in middle:
+        if isinstance(message, AIMessage):
+            for call in message.tool_calls or []:
+                lines.append(f"- called {call.get('name')}({_call_target(call.get('args') or {})})")
+            if _content_text(message).strip():
+                lines.append(f"- assistant: {_brief(_content_text(message))}")
+        elif isinstance(message, ToolMessage):
+            lines.append(f"  -> {message.name or 'tool'}: {_brief(_content_text(message), 120)}")
+        elif isinstance(message, HumanMessage):
+            if _content_text(message).startswith(DIGEST_PREFIX):
+                lines.extend(_content_text(message).splitlines()[1:])
+            else:
+                lines.append(f"- user: {_brief(_content_text(message))}")
+
+    digest = HumanMessage(content="\n".join(lines))
+    return messages[:head_end] + [digest] + recent, len(middle), truncated
+
+
+def _truncate_tool_outputs(messages: List[AnyMessage], budget_tokens: int) -> tuple[List[AnyMessage], int]:
+    """Cut the largest tool outputs down (keeping their start) until the messages fit the budget."""
+    excess_chars = (estimate_tokens(messages) - budget_tokens) * CHARS_PER_TOKEN
+    if excess_chars <= 0:
+        return messages, 0
+
+    result = list(messages)
+    truncated = 0
+    largest_first = sorted(
+        (i for i, m in enumerate(messages) if isinstance(m, ToolMessage)),
+        key=lambda i: len(_content_text(messages[i])),
+        reverse=True,
+    )
+    for i in largest_first:
+        if excess_chars <= 0:
+            break
+        message = messages[i]
+        text = _content_text(message)
+        keep = max(STUB_MIN_CHARS, len(text) - excess_chars)
+        if keep >= len(text):
+            continue
+        content = f"{text[:keep]}\n[truncated: {len(text) - keep} of {len(text)} chars elided to fit the context budget]"
+        result[i] = ToolMessage(content=content, tool_call_id=message.tool_call_id, name=message.name, id=message.id)
+        excess_chars -= len(text) - keep
+        truncated += 1
+    return result, truncated
+
+
+# ----------------------------------------------------------------------
+# Per-thread savings
+# ----------------------------------------------------------------------
+
+_stats: Dict[str, ContextStats] = {}
+# Totals of finished runs, oldest first
+_completed: OrderedDict[str, ContextStats] = OrderedDict()
+_stats_lock = Lock()
+
+
+def _record(thread_id: str | None, before: int, after: int | None, stubbed: int, summarised: int) -> None:
+    if not thread_id:
+        return
+    after = before if after is None else after
+    with _stats_lock:
+        stats = _stats.setdefault(thread_id, {
+            "model_calls": 0,
+            "tokens_before": 0,
+            "tokens_after": 0,
+            "tokens_saved": 0,
+            "stubbed_tool_outputs": 0,
+            "summarised_messages": 0,
+        })
+        stats["model_calls"] += 1
+        stats["tokens_before"] += before
+        stats["tokens_after"] += after
+        stats["tokens_saved"] += before - after
+        stats["stubbed_tool_outputs"] += stubbed
+        stats["summarised_messages"] += summarised
+
+
+def get_context_stats(thread_id: str) -> ContextStats | None:
+    """Get the governor's savings for a thread's current (or last finished) run."""
+    with _stats_lock:
+        stats = _stats.get(thread_id) or _completed.get(thread_id)
+        return dict(stats) if stats else None
+
+
+def finish_context_stats(thread_id: str) -> ContextStats | None:
+    """Log a finished run's savings and move them to the completed runs."""
+    with _stats_lock:
+        stats = _stats.pop(thread_id, None)
+        if stats is None:
+            return None
+        _completed[thread_id] = stats
+        _completed.move_to_end(thread_id)
+        while len(_completed) > KEEP_COMPLETED_RUNS:
+            _completed.popitem(last=False)
+    print(
+        f"Context governor: thread {thread_id} saved ~{stats['tokens_saved']} of "
+        f"{stats['tokens_before']} tokens over {stats['model_calls']} model calls "
+        f"({stats['stubbed_tool_outputs']} tool outputs stubbed, "
+        f"{stats['summarised_messages']} messages summarised)"
+    )
+    return dict(stats)
+
+
+def clear_context_stats(thread_id: str) -> None:
+    with _stats_lock:
+        _stats.pop(thread_id, None)
+        _completed.pop(thread_id, None)
+
+
+def create_context_governor_middleware(agent_name: str) -> ContextGovernorMiddleware:
+    """
+    Factory function to create a ContextGovernorMiddleware instance.
+
+    Args:
+        agent_name: The agent name (e.g., "main", "code-analyzer")
+
+    Returns:
+        A configured ContextGovernorMiddleware instance
+    """
+    return ContextGovernorMiddleware(agent_name=agent_name)
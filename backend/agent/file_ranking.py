@@ -0,0 +1,408 @@
+"""
+File importance ranking for cloned repositories.
+
+After a repository is cloned, this module builds its module import graph,
+scores every source file by centrality (PageRank over import edges), mixes in
+git churn and entry-point heuristics, and publishes a ranked "read these first"
+list. Subagents fetch the list through the `get_important_files` tool so their
+small read budget is spent on the files that actually matter.
+
+Rankings are cached as JSON under data/index/rankings/{repo_name}.json, keyed
+by the ranking and ignore-policy versions that produced them.
+"""
+
+import ast
+import json
+import os
+import re
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Set, TypedDict
+
+from agent import paths
+from agent.ignore_policy import POLICY_VERSION, IgnorePolicy, get_ignore_policy
+
+RANKINGS_SUBDIR = "rankings"
+
+PYTHON_EXTS = {".py"}
+JS_EXTS = [".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs"]
+C_EXTS = {".c", ".h", ".cc", ".cpp", ".hpp", ".hh"}
+OTHER_SOURCE_EXTS = {".go", ".rs", ".java", ".kt", ".rb", ".php", ".swift", ".cs", ".scala"}
+SOURCE_EXTS = PYTHON_EXTS | set(JS_EXTS) | C_EXTS | OTHER_SOURCE_EXTS
+
+# Files that are conventional entry points or project manifests
+ENTRY_POINT_NAMES = {
+    "main.py", "__main__.py", "app.py", "cli.py", "server.py", "manage.py",
+    "wsgi.py", "asgi.py", "setup.py", "pyproject.toml", "package.json",
+    "index.ts", "index.tsx", "index.js", "main.ts", "main.js", "app.ts",
+    "app.tsx", "server.ts", "server.js", "main.go", "main.rs", "lib.rs",
+    "cargo.toml", "go.mod", "readme.md", "readme.rst", "readme",
+}
+
+# Score weights (must sum to 1.0)
+CENTRALITY_WEIGHT = 0.6
+CHURN_WEIGHT = 0.2
+ENTRY_WEIGHT = 0.2
+
+MAX_FILES = 5000
+MAX_FILE_BYTES = 512 * 1024
+# Bumped when scoring changes, so cached rankings are recomputed
+RANKING_VERSION = 2
+
+JS_IMPORT_RE = re.compile(
+    r"""(?:import\s+(?:[^'"]*?\s+from\s+)?|export\s+[^'"]*?\s+from\s+|require\s*\(\s*|import\s*\(\s*)['"]([^'"]+)['"]"""
+)
+C_INCLUDE_RE = re.compile(r'^\s*#\s*include\s+"([^"]+)"', re.MULTILINE)
+
+
+class RankedFile(TypedDict):
+    """A single entry in the ranked file list."""
+    path: str               # Virtual path (e.g., "/owner_repo/src/main.py")
+    score: float            # Combined importance score in [0, 1]
+    centrality: float       # Normalized PageRank
+    churn: float            # Normalized commit count
+    entry_point: bool       # Matches an entry-point/manifest heuristic
+    imported_by: int        # Number of files importing this one
+
+
+def _collect_files(repo_dir: Path, policy: IgnorePolicy | None) -> List[str]:
+    """List candidate files (POSIX paths relative to the repo root) the ignore policy leaves visible."""
+    files: List[str] = []
+    for root, dirs, names in os.walk(repo_dir):
+        rel_root = Path(root).relative_to(repo_dir).as_posix()
+        rel_root = "" if rel_root == "." else rel_root + "/"
+        dirs[:] = sorted(
+            d for d in dirs
+            if not d.startswith(".") and not (policy and policy.is_hidden_dir(rel_root + d))
+        )
+        for name in sorted(names):
+            ext = os.path.splitext(name)[1].lower()
+            if ext not in SOURCE_EXTS and name.lower() not in ENTRY_POINT_NAMES:
+                continue
+            if policy and policy.is_filtered(rel_root + name):
+                continue
+            full = Path(root) / name
+            try:
+                if full.stat().st_size > MAX_FILE_BYTES:
+                    continue
+            except OSError:
+                continue
+            files.append(full.relative_to(repo_dir).as_posix())
+            if len(files) >= MAX_FILES:
+                return files
+    return files
+
+
+def _read_text(path: Path) -> str:
+    try:
+        return path.read_text(encoding="utf-8", errors="ignore")
+    except OSError:
+        return ""
+
+
+def _python_module_index(files: List[str]) -> Dict[str, str]:
+    """Map dotted module names to files, as Python would import them.
+
+    A module's name is its path from its package root: the nearest ancestor
+    directory without an __init__.py (src/pkg/mod.py with src/pkg/__init__.py
+    is "pkg.mod"). Its full path from the repo root ("src.pkg.mod") is also
+    indexed, for namespace packages. Top-level single-file modules that shadow
+    the standard library (e.g. a scripts/json.py) are not indexed, so
+    `import json` doesn't create edges to them.
+    """
+    package_dirs = {rel.rsplit("/", 1)[0] for rel in files if rel.endswith("/__init__.py")}
+    index: Dict[str, str] = {}
+    for rel in files:
+        if not rel.endswith(".py"):
+            continue
+        parts = rel[:-3].split("/")
+        is_package = parts[-1] == "__init__"
+        if is_package:
+            parts = parts[:-1]
+        # Walk up to the package root
+        start = len(parts) - 1
+        while start > 0 and "/".join(parts[:start]) in package_dirs:
+            start -= 1
+        for name in (".".join(parts[start:]), ".".join(parts)):
+            if not name or name in index:
+                continue
+            if "." not in name and not is_package and name in sys.stdlib_module_names:
+                continue
+            index[name] = rel
+    return index
+
+
+def _python_imports(rel: str, source: str, module_index: Dict[str, str]) -> Set[str]:
+    """Resolve the repo-local files imported by a Python module."""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return set()
+
+    package = rel[:-3].split("/")[:-1]
+    candidates: List[str] = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            candidates.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = package[: len(package) - (node.level - 1)]
+                prefix = ".".join(base + ([node.module] if node.module else []))
+            else:
+                prefix = node.module or ""
+            # "from pkg import name" may name a submodule or an attribute of pkg;
+            # walking up the dotted name below handles both cases.
+            for alias in node.names:
+                candidates.append(f"{prefix}.{alias.name}" if prefix else alias.name)
+
+    resolved: Set[str] = set()
+    for name in candidates:
+        # Walk up the dotted name until it matches a known module
+        parts = name.split(".")
+        while parts:
+            target = module_index.get(".".join(parts))
+            if target:
+                if target != rel:
+                    resolved.add(target)
+                break
+            parts.pop()
+    return resolved
+
+
+def _js_imports(rel: str, source: str, file_set: Set[str]) -> Set[str]:
+    """Resolve relative JS/TS import specifiers to repo files."""
+    resolved: Set[str] = set()
+    base_dir = os.path.dirname(rel)
+    for spec in JS_IMPORT_RE.findall(source):
+        if not spec.startswith("."):
+            continue
+        target = os.path.normpath(os.path.join(base_dir, spec)).replace(os.sep, "/")
+        options = [target] + [target + ext for ext in JS_EXTS] + [f"{target}/index{ext}" for ext in JS_EXTS]
+        for option in options:
+            if option in file_set and option != rel:
+                resolved.add(option)
+                break
+    return resolved
+
+
+def _c_includes(rel: str, source: str, file_set: Set[str]) -> Set[str]:
+    """Resolve quoted #include directives relative to the including file."""
+    resolved: Set[str] = set()
+    base_dir = os.path.dirname(rel)
+    for spec in C_INCLUDE_RE.findall(source):
+        target = os.path.normpath(os.path.join(base_dir, spec)).replace(os.sep, "/")
+        if target in file_set and target != rel:
+            resolved.add(target)
+        elif spec in file_set and spec != rel:
+            resolved.add(spec)
+    return resolved
+
+
+def build_import_graph(repo_dir: Path, files: List[str]) -> Dict[str, Set[str]]:
+    """Build a mapping of file -> set of repo files it imports."""
+    file_set = set(files)
+    module_index = _python_module_index(files)
+    graph: Dict[str, Set[str]] = {}
+    for rel in files:
+        ext = os.path.splitext(rel)[1].lower()
+        if ext in PYTHON_EXTS:
+            graph[rel] = _python_imports(rel, _read_text(repo_dir / rel), module_index)
+        elif ext in JS_EXTS:
+            graph[rel] = _js_imports(rel, _read_text(repo_dir / rel), file_set)
+        elif ext in C_EXTS:
+            graph[rel] = _c_includes(rel, _read_text(repo_dir / rel), file_set)
+        else:
+            graph[rel] = set()
+    return graph
+
+
+def pagerank(graph: Dict[str, Set[str]], damping: float = 0.85, iterations: int = 50, tol: float = 1e-8) -> Dict[str, float]:
+    """
+    Compute PageRank over the import graph.
+
+    Edges point from importer to imported file, so widely imported modules
+    accumulate rank. Dangling files spread their rank uniformly.
+    """
+    nodes = list(graph)
+    n = len(nodes)
+    if n == 0:
+        return {}
+    rank = {node: 1.0 / n for node in nodes}
+    for _ in range(iterations):
+        dangling = sum(rank[node] for node in nodes if not graph[node])
+        base = (1.0 - damping) / n + damping * dangling / n
+        new_rank = {node: base for node in nodes}
+        for node in nodes:
+            targets = graph[node]
+            if targets:
+                share = damping * rank[node] / len(targets)
+                for target in targets:
+                    new_rank[target] += share
+        delta = sum(abs(new_rank[node] - rank[node]) for node in nodes)
+        rank = new_rank
+        if delta < tol:
+            break
+    return rank
+
+
+def git_churn(repo_dir: Path, max_commits: int = 500) -> Dict[str, int]:
+    """
+    Count commits touching each file.
+
+    Clones are shallow (see repo_store.CLONE_HISTORY_DEPTH); their boundary
+    commits have no parent, so they'd list every file as added and are left
+    out. A --depth 1 clone therefore yields {}.
+    """
+    try:
+        shallow_path = subprocess.run(
+            ["git", "-C", str(repo_dir), "rev-parse", "--git-path", "shallow"],
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+        if shallow_path.returncode != 0:
+            return {}
+        shallow_file = repo_dir / shallow_path.stdout.strip()
+        boundary = shallow_file.read_text().split() if shallow_file.is_file() else []
+        # --no-renames: rename detection would fetch old blobs of blobless clones
+        result = subprocess.run(
+            [
+                "git", "-C", str(repo_dir), "log", f"-n{max_commits}", "--name-only", "--no-renames",
+                "--format=", "HEAD", *(f"^{sha}" for sha in boundary),
+            ],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+    except (subprocess.TimeoutExpired, OSError):
+        return {}
+    if result.returncode != 0:
+        return {}
+    counts: Dict[str, int] = {}
+    for line in result.stdout.splitlines():
+        line = line.strip()
+        if line:
+            counts[line] = counts.get(line, 0) + 1
+    return counts
+
+
+def _is_entry_point(rel: str) -> bool:
+    name = rel.rsplit("/", 1)[-1].lower()
+    if name not in ENTRY_POINT_NAMES:
+        return False
+    # Only shallow entry points count (src/main.py yes, tests/fixtures/x/main.py no)
+    return rel.count("/") <= 2
+
+
+def _is_test_file(rel: str) -> bool:
+    lowered = rel.lower()
+    name = lowered.rsplit("/", 1)[-1]
+    return (
+        "/tests/" in f"/{lowered}" or "/test/" in f"/{lowered}" or "__tests__" in lowered
+        or name.startswith("test_") or name.endswith(("_test.py", "_test.go"))
+        or ".test." in name or ".spec." in name
+    )
+
+
+def rank_repository(repo_name: str) -> List[RankedFile]:
+    """
+    Rank the files of a cloned repository by importance.
+
+    Args:
+        repo_name: The sanitized repository directory name (e.g., "owner_repo")
+
+    Returns:
+        Files sorted by descending score.
+    """
+    repo_dir = paths.REPOS_DIR / repo_name
+    policy = get_ignore_policy(repo_name)
+    files = _collect_files(repo_dir, policy)
+    graph = build_import_graph(repo_dir, files)
+    ranks = pagerank(graph)
+    churn = git_churn(repo_dir)
+
+    imported_by: Dict[str, int] = {}
+    for targets in graph.values():
+        for target in targets:
+            imported_by[target] = imported_by.get(target, 0) + 1
+
+    max_rank = max(ranks.values(), default=0.0) or 1.0
+    min_rank = min(ranks.values(), default=0.0)
+    rank_span = (max_rank - min_rank) or 1.0
+    max_churn = max((churn.get(rel, 0) for rel in files), default=0) or 1
+    # Without a churn signal (no history, or every file touched equally) its weight goes to the others
+    has_churn = len({churn.get(rel, 0) for rel in files}) > 1
+    weight_total = 1.0 if has_churn else 1.0 - CHURN_WEIGHT
+
+    ranked: List[RankedFile] = []
+    for rel in files:
+        centrality = (ranks.get(rel, min_rank) - min_rank) / rank_span
+        churn_score = churn.get(rel, 0) / max_churn if has_churn else 0.0
+        entry = _is_entry_point(rel)
+        score = (CENTRALITY_WEIGHT * centrality + CHURN_WEIGHT * churn_score + ENTRY_WEIGHT * float(entry)) / weight_total
+        if _is_test_file(rel):
+            score *= 0.5
+        ranked.append({
+            "path": f"/{repo_name}/{rel}",
+            "score": round(score, 4),
+            "centrality": round(centrality, 4),
+            "churn": round(churn_score, 4),
+            "entry_point": entry,
+            "imported_by": imported_by.get(rel, 0),
+        })
+
+    ranked.sort(key=lambda item: (-item["score"], item["path"]))
+    return ranked
+
+
+def _ranking_path(repo_name: str) -> Path:
+    return paths.INDEX_DIR / RANKINGS_SUBDIR / f"{repo_name}.json"
+
+
+def publish_ranking(repo_name: str) -> List[RankedFile]:
+    """Compute the ranking for a repository and cache it on disk."""
+    ranked = rank_repository(repo_name)
+    _ranking_path(repo_name).parent.mkdir(parents=True, exist_ok=True)
+    with open(_ranking_path(repo_name), "w") as f:
+        json.dump({
+            "version": RANKING_VERSION,
+            "policyVersion": POLICY_VERSION,
+            "repoId": repo_name,
+            "generatedAt": datetime.now().isoformat(),
+            "files": ranked,
+        }, f)
+    return ranked
+
+
+def load_ranking(repo_name: str) -> List[RankedFile] | None:
+    """Load a cached ranking, or None if it hasn't been computed yet (or is stale)."""
+    path = _ranking_path(repo_name)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    # Built by older scoring or ignore rules: recompute
+    if data.get("version") != RANKING_VERSION or data.get("policyVersion") != POLICY_VERSION:
+        return None
+    return data.get("files", [])
+
+
+def get_ranking(repo_name: str) -> List[RankedFile]:
+    """Return the cached ranking for a repository, computing it on first use."""
+    ranked = load_ranking(repo_name)
+    if ranked is None:
+        ranked = publish_ranking(repo_name)
+    return ranked
+
+
+def discard_ranking(repo_name: str) -> None:
+    """Remove the cached ranking for a repository (e.g., after deletion)."""
+    try:
+        _ranking_path(repo_name).unlink()
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,362 @@
+"""
+Repository ignore policy for the filesystem tools.
+
+Agents waste turns and tokens on dependencies, lockfiles, minified bundles,
+generated code and binaries. This module classifies every file of a clone once
+and stores the result as a per-clone flag bitmap (one byte of flags per file,
+in sorted path order). ReadOnlyRepoBackend consults it for `ls`, `glob`, `grep`
+and `read_file`; `read_ignored_file` is the explicit override.
+
+Rules, in order of precedence:
+1. .gitignore (evaluated by `git check-ignore`, which like git itself never
+   ignores tracked files)
+2. .gitattributes `linguist-generated` / `linguist-vendored` (via
+   `git check-attr`); an explicit `-linguist-vendored` or `=false` disables the
+   matching heuristic below for that file
+3. Heuristics: vendored directories, generated-file names and headers,
+   lockfiles, binary content, size and minification. Build-output directories
+   (dist/, build/, coverage/, ...) only count at the repo root, or anywhere for
+   files git doesn't track, since nested ones are often real source.
+
+Policies are cached under data/index/ignore/{repo_name}.json.
+"""
+
+import base64
+import json
+import os
+import re
+import subprocess
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Set
+
+from agent import paths
+
+POLICY_SUBDIR = "ignore"
+
+# Flag bits
+GITIGNORED = 1
+GENERATED = 2
+VENDORED = 4
+LOCKFILE = 8
+BINARY = 16
+LARGE = 32
+MINIFIED = 64
+
+FLAG_NAMES = {
+    GITIGNORED: "gitignored",
+    GENERATED: "generated",
+    VENDORED: "vendored",
+    LOCKFILE: "lockfile",
+    BINARY: "binary",
+    LARGE: "large",
+    MINIFIED: "minified",
+}
+
+MAX_TEXT_BYTES = 1024 * 1024
+SNIFF_BYTES = 8192
+MINIFY_SAMPLE_BYTES = 64 * 1024
+
+VENDORED_DIRS = {
+    "node_modules", "vendor", "vendors", "third_party", "third-party",
+    "bower_components", "Pods", "site-packages", ".yarn", "jspm_packages",
+}
+GENERATED_DIRS = {"dist", "build", "out", "__generated__", ".next", "coverage"}
+GENERATED_SUFFIXES = (
+    "_pb2.py", "_pb2_grpc.py", "_pb2.pyi", ".pb.go", ".pb.cc", ".pb.h", "_pb.js", "_pb.d.ts",
+    ".pb.swift", ".g.dart", ".freezed.dart", ".designer.cs", ".generated.ts", ".generated.js",
+    ".js.map", ".css.map",
+)
+# Generated-file header comments: Go's "Code generated ... DO NOT EDIT.", the
+# "@generated" tag, and "Generated by <tool> ... DO NOT EDIT" (e.g., protoc)
+GENERATED_HEADER_RE = re.compile(
+    r"^\s*(?:#|//|/\*|\*|--|;|<!--)\s*"
+    r"(?:Code generated .+ DO NOT EDIT|@generated\b|(?:[Aa]uto-?)?[Gg]enerated by .+ DO NOT EDIT)"
+)
+# Only the first few lines can hold the header
+GENERATED_HEADER_LINES = 5
+LOCKFILES = {
+    "package-lock.json", "npm-shrinkwrap.json", "yarn.lock", "pnpm-lock.yaml", "bun.lockb",
+    "poetry.lock", "pipfile.lock", "uv.lock", "pdm.lock", "cargo.lock", "gemfile.lock",
+    "composer.lock", "go.sum", "mix.lock", "podfile.lock", "pubspec.lock", "flake.lock",
+}
+BINARY_EXTS = {
+    ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".webp", ".pdf", ".zip", ".gz", ".tgz",
+    ".bz2", ".xz", ".7z", ".tar", ".jar", ".war", ".class", ".so", ".dylib", ".dll", ".exe",
+    ".o", ".a", ".pyc", ".woff", ".woff2", ".ttf", ".otf", ".eot", ".mp3", ".mp4", ".mov",
+    ".avi", ".wav", ".sqlite", ".db", ".wasm", ".bin",
+}
+MINIFIABLE_EXTS = {".js", ".mjs", ".cjs", ".css", ".json"}
+# Docs may mention "generated" code without being generated themselves
+PROSE_EXTS = {".md", ".rst", ".txt", ".adoc"}
+# Bumped when the rules change, so cached policies are rebuilt
+POLICY_VERSION = 2
+
+
+def _run_git(repo_dir: Path, args: List[str], paths: List[str]) -> str | None:
+    """Run a git plumbing command over NUL-separated paths on stdin."""
+    if not paths or not (repo_dir / ".git").exists():
+        return None
+    try:
+        result = subprocess.run(
+            ["git", "-C", str(repo_dir), *args],
+            input="\0".join(paths) + "\0",
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+    # check-ignore exits 1 when nothing matched
+    if result.returncode not in (0, 1):
+        return None
+    return result.stdout
+
+
+def _gitignored(repo_dir: Path, paths: List[str]) -> Set[str]:
+    output = _run_git(repo_dir, ["check-ignore", "--stdin", "-z"], paths)
+    return {p for p in (output or "").split("\0") if p}
+
+
+def _tracked(repo_dir: Path) -> Set[str] | None:
+    """Paths git tracks, or None if unknown (not a git repo)."""
+    if not (repo_dir / ".git").exists():
+        return None
+    try:
+        result = subprocess.run(
+            ["git", "-C", str(repo_dir), "ls-files", "-z"],
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+    if result.returncode != 0:
+        return None
+    return {p for p in result.stdout.split("\0") if p}
+
+
+def _linguist_attrs(repo_dir: Path, paths: List[str]) -> Dict[str, Dict[str, bool]]:
+    """Explicit linguist attributes: {path: {"linguist-generated": True/False, ...}}."""
+    output = _run_git(
+        repo_dir, ["check-attr", "-z", "--stdin", "linguist-generated", "linguist-vendored"], paths
+    )
+    attrs: Dict[str, Dict[str, bool]] = {}
+    fields = (output or "").split("\0")
+    for i in range(0, len(fields) - 2, 3):
+        path, attr, value = fields[i], fields[i + 1], fields[i + 2]
+        if value in ("set", "true"):
+            attrs.setdefault(path, {})[attr] = True
+        elif value in ("unset", "false"):
+            attrs.setdefault(path, {})[attr] = False
+    return attrs
+
+
+def _content_flags(full_path: Path, name: str, size: int) -> int:
+    """Flags that depend on file content (binary, generated markers, minified)."""
+    ext = os.path.splitext(name)[1].lower()
+    if ext in BINARY_EXTS:
+        return BINARY
+    try:
+        with open(full_path, "rb") as f:
+            head = f.read(MINIFY_SAMPLE_BYTES if ext in MINIFIABLE_EXTS else SNIFF_BYTES)
+    except OSError:
+        return 0
+    if b"\0" in head[:SNIFF_BYTES]:
+        return BINARY
+
+    flags = 0
+    if ext not in PROSE_EXTS:
+        preamble = head[:SNIFF_BYTES].decode("utf-8", errors="ignore").splitlines()[:GENERATED_HEADER_LINES]
+        if any(GENERATED_HEADER_RE.match(line) for line in preamble):
+            flags |= GENERATED
+    if ext in MINIFIABLE_EXTS and size > 2048:
+        lines = head.split(b"\n")
+        longest = max(len(line) for line in lines)
+        if longest > 5000 or len(head) / len(lines) > 300:
+            flags |= MINIFIED
+    return flags
+
+
+def classify_files(repo_dir: Path, paths: List[str]) -> bytearray:
+    """Compute the flag byte for each path (POSIX, relative to repo_dir)."""
+    ignored = _gitignored(repo_dir, paths)
+    attrs = _linguist_attrs(repo_dir, paths)
+    tracked = _tracked(repo_dir)
+
+    flags = bytearray(len(paths))
+    for i, rel in enumerate(paths):
+        parts = rel.split("/")
+        name = parts[-1]
+        lowered = name.lower()
+        explicit = attrs.get(rel, {})
+        value = 0
+
+        if rel in ignored:
+            value |= GITIGNORED
+
+        if explicit.get("linguist-vendored"):
+            value |= VENDORED
+        elif "linguist-vendored" not in explicit and any(p in VENDORED_DIRS for p in parts[:-1]):
+            value |= VENDORED
+
+        if explicit.get("linguist-generated"):
+            value |= GENERATED
+        elif "linguist-generated" not in explicit:
+            # Without git, every file counts as tracked (root-level dirs only)
+            untracked = tracked is not None and rel not in tracked
+            dirs = parts[:-1] if untracked else parts[:min(1, len(parts) - 1)]
+            if any(p in GENERATED_DIRS for p in dirs) or lowered.endswith(GENERATED_SUFFIXES):
+                value |= GENERATED
+
+        if lowered in LOCKFILES:
+            value |= LOCKFILE
+
+        full_path = repo_dir / rel
+        try:
+            size = full_path.stat().st_size
+        except OSError:
+            size = 0
+        if size > MAX_TEXT_BYTES:
+            value |= LARGE
+        if ".min." in lowered:
+            value |= MINIFIED
+        # Content sniffing is only worth it for files that are still visible
+        if not value:
+            content = _content_flags(full_path, name, size)
+            if "linguist-generated" in explicit:
+                content &= ~GENERATED
+            value |= content
+
+        flags[i] = value
+    return flags
+
+
+def describe_flags(value: int) -> List[str]:
+    return [name for bit, name in FLAG_NAMES.items() if value & bit]
+
+
+class IgnorePolicy:
+    """
+    Precomputed ignore policy for one clone.
+
+    Usage:
+        policy = get_ignore_policy(repo_name)
+        if policy.is_filtered("src/app.min.js"): ...
+    """
+
+    def __init__(self, repo_name: str, paths: List[str], flags: bytearray):
+        self.repo_name = repo_name
+        self.paths = paths
+        self.flags = flags
+        self._index = {path: i for i, path in enumerate(paths)}
+        # All directories, and those containing at least one visible file
+        self._dirs: Set[str] = {""}
+        self._visible_dirs: Set[str] = {""}
+        for path, value in zip(paths, flags):
+            parts = path.split("/")[:-1]
+            for depth in range(1, len(parts) + 1):
+                directory = "/".join(parts[:depth])
+                self._dirs.add(directory)
+                if not value:
+                    self._visible_dirs.add(directory)
+
+    @classmethod
+    def build(cls, repo_name: str) -> "IgnorePolicy":
+        repo_dir = paths.REPOS_DIR / repo_name
+        rel_paths: List[str] = []
+        for root, dirs, names in os.walk(repo_dir):
+            dirs[:] = [d for d in dirs if d != ".git"]
+            for name in names:
+                rel_paths.append((Path(root) / name).relative_to(repo_dir).as_posix())
+        rel_paths.sort()
+        return cls(repo_name, rel_paths, classify_files(repo_dir, rel_paths))
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": POLICY_VERSION,
+            "repoId": self.repo_name,
+            "paths": self.paths,
+            "flags": base64.b64encode(bytes(self.flags)).decode(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "IgnorePolicy":
+        if data.get("version") != POLICY_VERSION:
+            raise ValueError("Ignore policy was built by older rules")
+        return cls(data["repoId"], data["paths"], bytearray(base64.b64decode(data["flags"])))
+
+    def flags_for(self, rel_path: str) -> int:
+        """Flags for a file (0 = visible). Unknown paths are visible."""
+        i = self._index.get(rel_path.strip("/"))
+        return self.flags[i] if i is not None else 0
+
+    def is_filtered(self, rel_path: str) -> bool:
+        return bool(self.flags_for(rel_path))
+
+    def is_hidden_dir(self, rel_path: str) -> bool:
+        """A directory is hidden if every file under it is filtered."""
+        rel_path = rel_path.strip("/")
+        return rel_path in self._dirs and rel_path not in self._visible_dirs
+
+    def visible_files(self) -> List[str]:
+        return [path for path, value in zip(self.paths, self.flags) if not value]
+
+    def summary(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {"total": len(self.paths), "filtered": 0}
+        for value in self.flags:
+            if value:
+                counts["filtered"] += 1
+                for name in describe_flags(value):
+                    counts[name] = counts.get(name, 0) + 1
+        return counts
+
+
+_policies: Dict[str, IgnorePolicy] = {}
+_policies_lock = Lock()
+
+
+def _policy_path(repo_name: str) -> Path:
+    return paths.INDEX_DIR / POLICY_SUBDIR / f"{repo_name}.json"
+
+
+def build_ignore_policy(repo_name: str) -> IgnorePolicy:
+    """Classify a clone's files and cache the policy (in memory and on disk)."""
+    policy = IgnorePolicy.build(repo_name)
+    _policy_path(repo_name).parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = _policy_path(repo_name).with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(policy.to_dict(), f)
+    os.replace(tmp_path, _policy_path(repo_name))
+    with _policies_lock:
+        _policies[repo_name] = policy
+    return policy
+
+
+def get_ignore_policy(repo_name: str) -> IgnorePolicy | None:
+    """Get a clone's policy, loading or building it on first use (None if not cloned)."""
+    with _policies_lock:
+        policy = _policies.get(repo_name)
+    if policy is not None:
+        return policy
+    if not (paths.REPOS_DIR / repo_name).is_dir():
+        return None
+
+    try:
+        with open(_policy_path(repo_name), "r") as f:
+            policy = IgnorePolicy.from_dict(json.load(f))
+    except (OSError, json.JSONDecodeError, KeyError, ValueError):
+        return build_ignore_policy(repo_name)
+    with _policies_lock:
+        _policies[repo_name] = policy
+    return policy
+
+
+def discard_ignore_policy(repo_name: str) -> None:
+    """Forget a clone's policy (e.g., after eviction; recomputed on re-clone)."""
+    with _policies_lock:
+        _policies.pop(repo_name, None)
+    try:
+        _policy_path(repo_name).unlink()
+    except FileNotFoundError:
+        pass
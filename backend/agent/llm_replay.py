@@ -0,0 +1,325 @@
+"""
+Record/replay harness for the LLM.
+
+Lets the graph run end-to-end without network access or API costs, so the
+backend's own overhead can be measured and regressions caught in CI:
+
+- record: the real model is used, and every model call (of the main agent and
+  of each subagent) is appended to a cassette file (JSON lines).
+- replay: `get_model()` returns ReplayChatModel, a deterministic fake that serves
+  the recorded responses. A request is answered by the recorded call with the
+  same agent and fingerprint (the n-th such request gets the n-th such call),
+  so parallel subagents of the same type each get their own responses
+  whatever order they run in.
+
+The agent making a call is known from CassetteMiddleware, which is attached to
+the main graph and to every subagent when a mode is set. Each request gets a
+structural fingerprint (message types, human/task text, tool names and tool
+call ids). A request with no matching recording means the run diverged (e.g., a
+tool now returns something the agent reacts to differently); replay counts it
+and falls back to the agent's next unserved call in recorded order.
+
+Note: model calls made outside the agent loop (e.g., deepagents' own
+summarization, which the context governor's budget keeps from triggering) are
+not recorded.
+
+Configuration (environment):
+    REPOLEARN_LLM_MODE: "record" or "replay" (unset = live model only)
+    REPOLEARN_LLM_CASSETTE: Cassette path (default data/index/cassettes/latest.jsonl)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, List, Sequence, TypedDict
+
+from langchain.agents.middleware.types import AgentMiddleware
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, SystemMessage, messages_from_dict, message_to_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from agent import paths
+
+CASSETTE_VERSION = 2
+MODES = ("record", "replay")
+
+# Agent whose model call is in progress (set by CassetteMiddleware)
+_current_agent: ContextVar[str | None] = ContextVar("repolearn_llm_agent", default=None)
+
+
+class CassetteExhaustedError(RuntimeError):
+    """Replay asked for more responses than were recorded for an agent."""
+
+
+class ReplayStats(TypedDict):
+    """Counters for one replay (reset by `Cassette.rewind`)."""
+    served: int             # Responses served
+    diverged: int           # Requests whose fingerprint differs from the recording
+
+
+def get_llm_mode() -> str | None:
+    """The configured mode ("record" / "replay"), or None for live runs."""
+    mode = os.getenv("REPOLEARN_LLM_MODE", "").strip().lower()
+    return mode if mode in MODES else None
+
+
+def get_cassette_path() -> Path:
+    return Path(os.getenv("REPOLEARN_LLM_CASSETTE") or paths.INDEX_DIR / "cassettes" / "latest.jsonl")
+
+
+def fingerprint(messages: Sequence[AnyMessage]) -> str:
+    """
+    Structural hash of a model request.
+
+    Message types, tool names, tool call ids and the text of human messages
+    (the task, or a subagent's task description) are hashed. Tool outputs are
+    not: they contain absolute paths and timestamps that legitimately differ
+    between the recording and the replay environment.
+    """
+    shape = []
+    for message in messages:
+        if isinstance(message, SystemMessage):
+            continue
+        calls = [(c.get("name"), c.get("id")) for c in getattr(message, "tool_calls", None) or []]
+        text = message.text if isinstance(message, HumanMessage) else None
+        shape.append((message.type, getattr(message, "tool_call_id", None), calls, text))
+    return hashlib.sha1(json.dumps(shape).encode()).hexdigest()[:16]
+
+
+class Cassette:
+    """
+    A recorded run: a header line, then one line per model call.
+
+    Line format:
+        {"agent": "code-analyzer", "seq": 0, "fingerprint": "...",
+         "request_messages": 5, "response": <message_to_dict(AIMessage)>}
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.header: Dict[str, Any] = {}
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        # Replay: (agent, fingerprint) -> indexes into the agent's entries, and which were served
+        self._by_fingerprint: Dict[tuple[str, str], List[int]] = {}
+        self._served: Dict[str, List[bool]] = {}
+        self._stats: ReplayStats = {"served": 0, "diverged": 0}
+        self._lock = Lock()
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def start_recording(self, header: Dict[str, Any] | None = None) -> None:
+        """Truncate the cassette and write its header."""
+        with self._lock:
+            self.header = {
+                "version": CASSETTE_VERSION,
+                "recorded_at": datetime.now().isoformat(),
+                **(header or {}),
+            }
+            self._entries = {}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "w") as f:
+                f.write(json.dumps({"header": self.header}) + "\n")
+
+    def record(self, agent: str, messages: Sequence[AnyMessage], response: AIMessage) -> None:
+        """Append one model call."""
+        if not self.header:
+            # Recording without an explicit start: begin a fresh cassette
+            self.start_recording()
+        with self._lock:
+            queue = self._entries.setdefault(agent, [])
+            entry = {
+                "agent": agent,
+                "seq": len(queue),
+                "fingerprint": fingerprint(messages),
+                "request_messages": len(messages),
+                "response": message_to_dict(response),
+            }
+            queue.append(entry)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    # ------------------------------------------------------------------
+    # Replay
+    # ------------------------------------------------------------------
+
+    def load(self) -> "Cassette":
+        """Read the cassette from disk and rewind it."""
+        entries: Dict[str, List[Dict[str, Any]]] = {}
+        header: Dict[str, Any] = {}
+        with open(self.path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                if "header" in data:
+                    header = data["header"]
+                else:
+                    entries.setdefault(data["agent"], []).append(data)
+        if header.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Cassette {self.path} has version {header.get('version')}, expected {CASSETTE_VERSION}. Re-record it.")
+        by_fingerprint: Dict[tuple[str, str], List[int]] = {}
+        for agent, queue in entries.items():
+            for i, entry in enumerate(queue):
+                by_fingerprint.setdefault((agent, entry["fingerprint"]), []).append(i)
+        with self._lock:
+            self.header = header
+            self._entries = entries
+            self._by_fingerprint = by_fingerprint
+        self.rewind()
+        return self
+
+    def rewind(self) -> None:
+        """Make every recorded response available again."""
+        with self._lock:
+            self._served = {agent: [False] * len(queue) for agent, queue in self._entries.items()}
+            self._stats = {"served": 0, "diverged": 0}
+
+    def next_response(self, agent: str, messages: Sequence[AnyMessage]) -> AIMessage:
+        """Serve the agent's recorded response to this request."""
+        key = (agent, fingerprint(messages))
+        with self._lock:
+            queue = self._entries.get(agent, [])
+            served = self._served.get(agent, [])
+            index = next((i for i in self._by_fingerprint.get(key, []) if not served[i]), None)
+            if index is None:
+                # Diverged: fall back to the agent's next unserved call in recorded order
+                index = next((i for i, done in enumerate(served) if not done), None)
+                if index is None:
+                    raise CassetteExhaustedError(
+                        f"Cassette {self.path} has no response left for agent '{agent}' "
+                        f"(recorded: {len(queue)}). Re-record it if the prompts or tools changed."
+                    )
+                self._stats["diverged"] += 1
+            entry = queue[index]
+            served[index] = True
+            self._stats["served"] += 1
+        # A fresh message per call: replays must not share mutable state
+        return messages_from_dict([entry["response"]])[0]
+
+    def agents(self) -> Dict[str, int]:
+        """Number of recorded calls per agent."""
+        with self._lock:
+            return {agent: len(queue) for agent, queue in self._entries.items()}
+
+    def stats(self) -> ReplayStats:
+        with self._lock:
+            return dict(self._stats)
+
+
+_cassettes: Dict[Path, Cassette] = {}
+_cassettes_lock = Lock()
+
+
+def get_cassette(path: Path | None = None) -> Cassette:
+    """Get the shared cassette for a path (default: the configured one)."""
+    path = (path or get_cassette_path()).resolve()
+    with _cassettes_lock:
+        cassette = _cassettes.get(path)
+        if cassette is None:
+            cassette = Cassette(path)
+            if get_llm_mode() == "replay" and path.exists():
+                cassette.load()
+            _cassettes[path] = cassette
+        return cassette
+
+
+class ReplayChatModel(BaseChatModel):
+    """Deterministic chat model serving the responses of a recorded cassette."""
+
+    cassette_path: str = ""
+
+    @property
+    def _llm_type(self) -> str:
+        return "repolearn-replay"
+
+    def _generate(self, messages: List[AnyMessage], stop: List[str] | None = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        cassette = get_cassette(Path(self.cassette_path) if self.cassette_path else None)
+        agent = _current_agent.get() or "main"
+        response = cassette.next_response(agent, messages)
+        return ChatResult(generations=[ChatGeneration(message=response)])
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> "ReplayChatModel":
+        """Tool schemas are irrelevant: the recorded responses already contain the calls."""
+        return self
+
+
+def _response_message(response: Any) -> AIMessage | None:
+    """Extract the AIMessage from a wrap_model_call result."""
+    if isinstance(response, AIMessage):
+        return response
+    for message in reversed(getattr(response, "result", None) or []):
+        if isinstance(message, AIMessage):
+            return message
+    return None
+
+
+class CassetteMiddleware(AgentMiddleware):
+    """
+    Middleware that tags model calls with their agent and records them.
+
+    Each instance is bound to an agent name (the main graph or a subagent).
+    """
+
+    def __init__(self, agent_name: str = "main", mode: str | None = None):
+        """
+        Initialize the middleware.
+
+        Args:
+            agent_name: The agent this middleware is attached to
+            mode: "record" or "replay" (defaults to the env setting)
+        """
+        self.agent_name = agent_name
+        self.mode = mode or get_llm_mode()
+
+    def wrap_model_call(self, request: Any, handler: Callable[[Any], Any]) -> Any:
+        """Tag (and record) a model call (sync version)."""
+        token = _current_agent.set(self.agent_name)
+        try:
+            response = handler(request)
+        finally:
+            _current_agent.reset(token)
+        self._record(request, response)
+        return response
+
+    async def awrap_model_call(self, request: Any, handler: Callable[[Any], Any]) -> Any:
+        """Tag (and record) a model call (async version)."""
+        token = _current_agent.set(self.agent_name)
+        try:
+            response = await handler(request)
+        finally:
+            _current_agent.reset(token)
+        self._record(request, response)
+        return response
+
+    def _record(self, request: Any, response: Any) -> None:
+        if self.mode != "record":
+            return
+        message = _response_message(response)
+        if message is None:
+            return
+        try:
+            get_cassette().record(self.agent_name, list(getattr(request, "messages", None) or []), message)
+        except OSError as e:
+            print(f"Warning: Failed to record model call: {e}")
+
+
+def cassette_middleware(agent_name: str) -> List[CassetteMiddleware]:
+    """
+    Middleware list to attach to an agent: empty unless record/replay is enabled.
+
+    Args:
+        agent_name: The agent name (e.g., "main", "code-analyzer")
+
+    Returns:
+        [CassetteMiddleware] in record/replay mode, otherwise []
+    """
+    mode = get_llm_mode()
+    return [CassetteMiddleware(agent_name=agent_name, mode=mode)] if mode else []
@@ -10,19 +10,30 @@ This means:
 1. Tool calls are visible in real-time during polling
 2. They DO NOT pollute the main agent's context (respecting Deep Agents philosophy)
 3. They need to be persisted separately for historical view (via snapshots)
+
+Importing LangChain's AgentMiddleware costs ~2s, so the middleware class is
+assembled on first use (`SubagentToolEventMiddleware` resolves lazily, like
+`agent.graph.graph`); importing this module stays cheap.
 """
 
-from typing import Callable, Any
-from langchain_core.messages import ToolMessage
-from langgraph.types import Command
-from langchain.agents.middleware.types import AgentMiddleware
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Callable, Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # Only needed for annotations; skip the import cost at runtime
+    from langchain.agents.middleware.types import AgentMiddleware
+    from langchain_core.messages import ToolMessage
+    from langgraph.types import Command
 
+from agent.run_context import current_thread_id
 from agent.tool_call_store import get_tool_call_store, create_tool_call_entry
 
 
-class SubagentToolEventMiddleware(AgentMiddleware):
+class _ToolEventRecorder:
     """
-    Middleware that captures tool calls and stores them for frontend display.
+    Tool-call capture logic of SubagentToolEventMiddleware (no LangChain base).
     
     Each instance is bound to a specific subagent name.
     """
@@ -96,14 +107,7 @@ class SubagentToolEventMiddleware(AgentMiddleware):
         Returns:
             The thread_id if available, None otherwise.
         """
-        try:
-            from langgraph.config import get_config
-            config = get_config()
-            configurable = config.get("configurable", {})
-            return configurable.get("thread_id")
-        except Exception:
-            # If we can't get config, we're not in a LangGraph context
-            return None
+        return current_thread_id()
 
 
 def _extract_brief_args(tool_name: str, args: dict) -> str:
@@ -153,7 +157,30 @@ def _extract_brief_args(tool_name: str, args: dict) -> str:
     return ""
 
 
-def create_subagent_tool_middleware(subagent_name: str) -> SubagentToolEventMiddleware:
+@lru_cache(maxsize=1)
+def _middleware_class() -> type[AgentMiddleware]:
+    from langchain.agents.middleware.types import AgentMiddleware
+
+    class SubagentToolEventMiddleware(_ToolEventRecorder, AgentMiddleware):
+        """
+        Middleware that captures tool calls and stores them for frontend display.
+        
+        Each instance is bound to a specific subagent name.
+        """
+
+    SubagentToolEventMiddleware.__module__ = __name__
+    SubagentToolEventMiddleware.__qualname__ = "SubagentToolEventMiddleware"
+    return SubagentToolEventMiddleware
+
+
+def __getattr__(name: str):
+    """Lazily resolve `SubagentToolEventMiddleware` (imports LangChain)."""
+    if name == "SubagentToolEventMiddleware":
+        return _middleware_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def create_subagent_tool_middleware(subagent_name: str) -> AgentMiddleware:
     """
     Factory function to create a SubagentToolEventMiddleware instance.
     
@@ -163,4 +190,4 @@ def create_subagent_tool_middleware(subagent_name: str) -> SubagentToolEventMidd
     Returns:
         A configured SubagentToolEventMiddleware instance
     """
-    return SubagentToolEventMiddleware(subagent_name=subagent_name)
+    return _middleware_class()(subagent_name=subagent_name)
@@ -0,0 +1,24 @@
+"""
+Data directory layout shared by the agent modules.
+
+    data/
+        repositories/   Cloned repositories (read-only for the agent)
+        tutorials/      Generated tutorials, one folder per repo and audience
+        index/          Caches and indexes (rankings, ignore policies, search, ...)
+
+The root defaults to ../data (next to backend/), which is where the frontend
+reads tutorials from. REPOLEARN_DATA_DIR moves it, e.g. for isolated load
+tests.
+
+Modules read these attributes at call time (`paths.REPOS_DIR`, not a copy made
+at import), so pointing them somewhere else - as the benchmark harness does -
+only takes patching this module.
+"""
+
+import os
+from pathlib import Path
+
+DATA_DIR = Path(os.getenv("REPOLEARN_DATA_DIR") or Path(__file__).parent.parent.parent / "data")
+REPOS_DIR = DATA_DIR / "repositories"
+TUTORIALS_DIR = DATA_DIR / "tutorials"
+INDEX_DIR = DATA_DIR / "index"
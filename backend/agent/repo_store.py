@@ -0,0 +1,419 @@
+"""
+Cloned repository storage with a disk quota and LRU eviction.
+
+Every clone under data/repositories is tracked with its size on disk, its
+GitHub URL and the last time it was accessed (by `git_clone`, `get_repo_path`,
+`get_important_files` or a filesystem read through the repo backend). When the
+total size exceeds the configured budget, least-recently-used clones are
+evicted by a background thread.
+
+Guarantees:
+1. Repos with an active run (touched from a LangGraph thread that hasn't called
+   `complete_tutorial` yet) are never evicted.
+2. Only the clone is removed - tutorials under data/tutorials stay intact.
+3. Evicted repos are re-cloned lazily the next time they are needed.
+4. Clones deleted behind the store's back (e.g., by the frontend's delete
+   routes) are dropped from the totals the next time they are computed.
+
+Configuration (environment):
+    REPOLEARN_REPO_QUOTA_BYTES: Byte budget for all clones (default 10 GiB, 0 disables eviction)
+
+Usage records persist in data/index/repo_usage.json.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import time
+from pathlib import Path
+from threading import Lock, Thread
+from typing import Dict, List, TypedDict
+
+from agent import paths
+from agent.run_context import current_thread_id
+
+USAGE_FILE = "repo_usage.json"
+
+DEFAULT_QUOTA_BYTES = 10 * 1024 ** 3
+CLONE_TIMEOUT_SECONDS = 120
+# Commits fetched per clone: enough history for the file ranking's churn
+# signal. Clones are blobless, so old commits only cost their trees.
+CLONE_HISTORY_DEPTH = 200
+# A run that hasn't touched its repo for this long is considered abandoned
+ACTIVE_RUN_TTL_SECONDS = 3 * 60 * 60
+# Never evict a repo accessed this recently, even without an active run
+RECENT_ACCESS_GRACE_SECONDS = 10 * 60
+# Access times are flushed to disk at most this often
+PERSIST_INTERVAL_SECONDS = 30
+
+
+class RepoUsage(TypedDict):
+    """Usage record for a single cloned repository."""
+    repo_name: str          # Sanitized directory name (e.g., "owner_repo")
+    github_url: str         # Source URL, used for lazy re-clone ("" if unknown)
+    size_bytes: int         # Size on disk (0 once evicted)
+    last_access: float      # Unix timestamp of the last access
+    evicted: bool           # True if the clone was removed to free space
+
+
+def get_quota_bytes() -> int:
+    """Read the configured byte budget (0 means unlimited)."""
+    try:
+        return int(os.getenv("REPOLEARN_REPO_QUOTA_BYTES", DEFAULT_QUOTA_BYTES))
+    except ValueError:
+        return DEFAULT_QUOTA_BYTES
+
+
+def clone_repository(github_url: str, target_dir: Path) -> str | None:
+    """
+    Clone a repository with bounded, blobless history.
+
+    Only the checked-out files' contents are downloaded; the last
+    CLONE_HISTORY_DEPTH commits come along as metadata for git churn.
+
+    Returns:
+        None on success, or an error message.
+    """
+    try:
+        result = subprocess.run(
+            [
+                "git", "clone", "--filter=blob:none", "--depth", str(CLONE_HISTORY_DEPTH),
+                "--no-tags", github_url, str(target_dir),
+            ],
+            capture_output=True,
+            text=True,
+            timeout=CLONE_TIMEOUT_SECONDS,
+        )
+    except subprocess.TimeoutExpired:
+        shutil.rmtree(target_dir, ignore_errors=True)
+        return f"Git clone timed out after {CLONE_TIMEOUT_SECONDS} seconds"
+    if result.returncode != 0:
+        return result.stderr or "git clone failed"
+    return None
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for root, _, names in os.walk(path):
+        for name in names:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+def _url_from_tutorials(repo_name: str) -> str:
+    """Recover a repo's GitHub URL from its tutorial metadata, if any."""
+    for metadata_path in (paths.TUTORIALS_DIR / repo_name).glob("*/metadata.json"):
+        try:
+            with open(metadata_path, "r") as f:
+                url = json.load(f).get("githubUrl")
+            if url:
+                return url
+        except (OSError, json.JSONDecodeError):
+            continue
+    return ""
+
+
+class RepoStore:
+    """
+    Tracks clone usage and evicts least-recently-used clones over budget.
+
+    Usage:
+        store = get_repo_store()
+        store.record_clone(repo_name, github_url)
+        store.touch(repo_name)
+        error = store.ensure_available(repo_name)
+    """
+
+    def __init__(self, repos_dir: Path | None = None, usage_path: Path | None = None):
+        self._repos_dir = repos_dir or paths.REPOS_DIR
+        self._usage_path = usage_path or paths.INDEX_DIR / USAGE_FILE
+        self._lock = Lock()
+        self._clone_lock = Lock()
+        self._usage: Dict[str, RepoUsage] = {}
+        # repo_name -> {thread_id: last_seen}
+        self._active: Dict[str, Dict[str, float]] = {}
+        self._last_persist = 0.0
+        self._evicting = False
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self) -> None:
+        try:
+            with open(self._usage_path, "r") as f:
+                self._usage = json.load(f).get("repos", {})
+        except (OSError, json.JSONDecodeError):
+            self._usage = {}
+
+        # Register clones made before tracking existed (or by other tools).
+        # Their sizes are measured in the background: walking every clone
+        # here would stall the first request that touches the store.
+        untracked: List[str] = []
+        if self._repos_dir.is_dir():
+            for repo_dir in self._repos_dir.iterdir():
+                if repo_dir.is_dir() and repo_dir.name not in self._usage:
+                    self._usage[repo_dir.name] = {
+                        "repo_name": repo_dir.name,
+                        "github_url": _url_from_tutorials(repo_dir.name),
+                        "size_bytes": 0,
+                        "last_access": repo_dir.stat().st_mtime,
+                        "evicted": False,
+                    }
+                    untracked.append(repo_dir.name)
+        self._drop_missing()
+        if untracked:
+            Thread(target=self._measure_sizes, args=(untracked,), daemon=True, name="repo-sizer").start()
+
+    def _measure_sizes(self, repo_names: List[str]) -> None:
+        """Fill in the sizes of newly registered clones, then apply the quota."""
+        for repo_name in repo_names:
+            size = _dir_size(self._repos_dir / repo_name)
+            with self._lock:
+                record = self._usage.get(repo_name)
+                if record is not None and not record["evicted"]:
+                    record["size_bytes"] = size
+        with self._lock:
+            self._persist(force=True)
+        self.maybe_evict()
+
+    def _persist(self, force: bool = False) -> None:
+        """Atomically write usage records. Caller must hold self._lock."""
+        now = time.time()
+        if not force and now - self._last_persist < PERSIST_INTERVAL_SECONDS:
+            return
+        self._last_persist = now
+        try:
+            self._usage_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._usage_path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"repos": self._usage}, f)
+            os.replace(tmp_path, self._usage_path)
+        except OSError as e:
+            print(f"Warning: Failed to persist repo usage: {e}")
+
+    # ------------------------------------------------------------------
+    # Tracking
+    # ------------------------------------------------------------------
+
+    def record_clone(self, repo_name: str, github_url: str) -> None:
+        """Register a fresh clone and evict others if the budget is exceeded."""
+        # Walk the clone before locking: touch() is on every backend read
+        size = _dir_size(self._repos_dir / repo_name)
+        with self._lock:
+            self._usage[repo_name] = {
+                "repo_name": repo_name,
+                "github_url": github_url,
+                "size_bytes": size,
+                "last_access": time.time(),
+                "evicted": False,
+            }
+            self._mark_active(repo_name)
+            self._persist(force=True)
+        self.maybe_evict()
+
+    def touch(self, repo_name: str) -> None:
+        """Record an access to a repo (and bind it to the current run, if any)."""
+        with self._lock:
+            record = self._usage.get(repo_name)
+            if record is None:
+                return
+            record["last_access"] = time.time()
+            self._mark_active(repo_name)
+            self._persist()
+
+    def _mark_active(self, repo_name: str) -> None:
+        """Caller must hold self._lock."""
+        thread_id = current_thread_id()
+        if thread_id:
+            self._active.setdefault(repo_name, {})[thread_id] = time.time()
+
+    def release(self, repo_name: str, thread_id: str | None = None) -> None:
+        """Mark a run as finished with a repo (defaults to the current run)."""
+        thread_id = thread_id or current_thread_id()
+        with self._lock:
+            runs = self._active.get(repo_name)
+            if runs and thread_id:
+                runs.pop(thread_id, None)
+            if not runs:
+                self._active.pop(repo_name, None)
+
+    def _drop_missing(self) -> None:
+        """
+        Forget clones deleted manually (never cloned again = nothing to restore).
+
+        Caller must hold self._lock (or be __init__).
+        """
+        missing = [
+            name for name, record in self._usage.items()
+            if not record["evicted"] and not (self._repos_dir / name).is_dir()
+        ]
+        for name in missing:
+            del self._usage[name]
+            self._active.pop(name, None)
+        if missing:
+            self._persist(force=True)
+
+    def _has_active_run(self, repo_name: str, now: float) -> bool:
+        """Caller must hold self._lock."""
+        runs = self._active.get(repo_name, {})
+        for thread_id, last_seen in list(runs.items()):
+            if now - last_seen > ACTIVE_RUN_TTL_SECONDS:
+                del runs[thread_id]
+        return bool(runs)
+
+    # ------------------------------------------------------------------
+    # Lazy restore
+    # ------------------------------------------------------------------
+
+    def is_evicted(self, repo_name: str) -> bool:
+        with self._lock:
+            record = self._usage.get(repo_name)
+            return bool(record and record["evicted"])
+
+    def ensure_available(self, repo_name: str) -> str | None:
+        """
+        Make sure a repo's clone is on disk, re-cloning it if it was evicted.
+
+        Returns:
+            None if the repo is available (or was never tracked), otherwise an error message.
+        """
+        if not self.is_evicted(repo_name):
+            self.touch(repo_name)
+            return None
+
+        # Serialize restores so concurrent readers don't clone twice
+        with self._clone_lock:
+            if not self.is_evicted(repo_name):
+                self.touch(repo_name)
+                return None
+            with self._lock:
+                github_url = self._usage[repo_name]["github_url"] or _url_from_tutorials(repo_name)
+            if not github_url:
+                return f"Repository {repo_name} was evicted and its URL is unknown. Clone it again with git_clone."
+
+            target_dir = self._repos_dir / repo_name
+            shutil.rmtree(target_dir, ignore_errors=True)
+            error = clone_repository(github_url, target_dir)
+            if error:
+                return f"Failed to restore evicted repository {repo_name}: {error}"
+
+        self.record_clone(repo_name, github_url)
+        return None
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            self._drop_missing()
+            return sum(r["size_bytes"] for r in self._usage.values() if not r["evicted"])
+
+    def maybe_evict(self) -> None:
+        """Start a background eviction pass if the quota is exceeded."""
+        quota = get_quota_bytes()
+        if quota <= 0 or self.total_bytes() <= quota:
+            return
+        with self._lock:
+            if self._evicting:
+                return
+            self._evicting = True
+        Thread(target=self._evict_until_under_quota, args=(quota,), daemon=True, name="repo-evictor").start()
+
+    def _evict_until_under_quota(self, quota: int) -> List[str]:
+        evicted: List[str] = []
+        try:
+            while True:
+                # Pick, mark and delete under the clone lock, so a restore in
+                # ensure_available() can't re-clone the victim in between and
+                # then lose the fresh clone to this pass's rmtree.
+                with self._clone_lock:
+                    repo_name = self._evict_one(quota)
+                    if repo_name is None:
+                        break
+                # Rankings and ignore policies may change on re-clone (new HEAD); recompute then
+                from agent.file_ranking import discard_ranking
+                from agent.ignore_policy import discard_ignore_policy
+                discard_ranking(repo_name)
+                discard_ignore_policy(repo_name)
+                evicted.append(repo_name)
+                print(f"Evicted repository clone {repo_name} (LRU, quota {quota} bytes)")
+        finally:
+            with self._lock:
+                self._evicting = False
+        return evicted
+
+    def _evict_one(self, quota: int) -> str | None:
+        """
+        Evict the least-recently-used idle clone if still over quota.
+
+        Caller must hold self._clone_lock.
+
+        Returns:
+            The evicted repo's name, or None if nothing (more) needs to go.
+        """
+        with self._lock:
+            self._drop_missing()
+            now = time.time()
+            total = sum(r["size_bytes"] for r in self._usage.values() if not r["evicted"])
+            if total <= quota:
+                return None
+            candidates = sorted(
+                (
+                    r for r in self._usage.values()
+                    if not r["evicted"]
+                    and now - r["last_access"] > RECENT_ACCESS_GRACE_SECONDS
+                    and not self._has_active_run(r["repo_name"], now)
+                ),
+                key=lambda r: r["last_access"],
+            )
+            if not candidates:
+                print(f"Warning: Repo quota exceeded ({total} > {quota} bytes) but nothing is evictable")
+                return None
+            victim = candidates[0]
+            # Mark before deleting so readers re-clone (after this pass) instead of reading a half-deleted tree
+            victim["evicted"] = True
+            victim["size_bytes"] = 0
+            if not victim["github_url"]:
+                victim["github_url"] = _url_from_tutorials(victim["repo_name"])
+            self._persist(force=True)
+            repo_name = victim["repo_name"]
+
+        shutil.rmtree(self._repos_dir / repo_name, ignore_errors=True)
+        return repo_name
+
+    def get_usage(self) -> Dict:
+        """Snapshot of usage records, totals and active runs."""
+        with self._lock:
+            self._drop_missing()
+            now = time.time()
+            repos = sorted(self._usage.values(), key=lambda r: r["last_access"], reverse=True)
+            return {
+                "quota_bytes": get_quota_bytes(),
+                "total_bytes": sum(r["size_bytes"] for r in repos if not r["evicted"]),
+                "repos": [
+                    {**r, "active": self._has_active_run(r["repo_name"], now)}
+                    for r in repos
+                ],
+            }
+
+
+# Global singleton instance
+_store_instance: RepoStore | None = None
+_store_lock = Lock()
+
+
+def get_repo_store() -> RepoStore:
+    """Get the global repo store singleton."""
+    global _store_instance
+    if _store_instance is None:
+        with _store_lock:
+            if _store_instance is None:
+                _store_instance = RepoStore()
+    return _store_instance
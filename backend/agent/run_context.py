@@ -0,0 +1,16 @@
+"""
+Access to the running LangGraph context.
+
+Middleware, tools and backends that keep per-run state (tool-call logs, write
+scopes, active clones, context savings) key it by the run's thread_id.
+"""
+
+
+def current_thread_id() -> str | None:
+    """Get the LangGraph thread_id of the running tool or model call, if any."""
+    try:
+        from langgraph.config import get_config
+        return get_config().get("configurable", {}).get("thread_id")
+    except Exception:
+        # Not inside a LangGraph run (e.g., HTTP endpoint or CLI)
+        return None
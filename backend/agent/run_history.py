@@ -0,0 +1,283 @@
+"""
+Compressed, paged storage for completed-run history.
+
+Run history (subagent tool calls, and the message / todo / subagent snapshot
+saved by the job page) used to be inlined into metadata.json, which every
+listing view parses. It now lives next to it in each audience folder:
+
+    history.jsonl.gz    Append-only gzip file. Each append is one gzip member
+                        holding newline-delimited JSON records of one kind.
+                        (Compaction rewrites it under a new name.)
+    history.idx.json    Small offset index: the data file's name plus byte
+                        offset/length, kind and record count of every live
+                        member. Per-kind counts are derived from it.
+
+A page is served by decompressing only the members that overlap it. Appending
+with `replace=True` (the default) supersedes earlier members of the same kind
+in the index; their bytes stay in the file, keeping it append-only until
+`compact()` (run when a tutorial completes) rewrites it with live members only.
+
+Appends never touch metadata.json, so they don't race the other writers of
+that file (complete_tutorial and the frontend's metadata route). The one
+exception is `migrate_legacy_metadata()`, which moves history older tutorials
+still inline out of metadata.json whenever it is read or written.
+"""
+
+import gzip
+import json
+import os
+import tempfile
+import uuid
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Tuple, TypedDict
+
+from agent import paths
+
+HISTORY_FILE = "history.jsonl.gz"
+INDEX_FILE = "history.idx.json"
+
+HISTORY_KINDS = ("tool_call", "message", "todo", "subagent")
+
+_locks: Dict[Path, Lock] = {}
+_locks_lock = Lock()
+
+
+class HistoryMember(TypedDict):
+    """Index entry for one gzip member."""
+    kind: str
+    offset: int     # Byte offset of the member in the data file
+    length: int     # Compressed byte length
+    count: int      # Number of records in the member
+
+
+class HistoryPage(TypedDict):
+    kind: str
+    offset: int
+    limit: int
+    total: int
+    records: List[Any]
+    next_offset: int | None
+
+
+def write_json_atomic(path: Path, data: Any, indent: int | None = 2) -> None:
+    """Write JSON via a temp file + rename so readers never see a torn file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=indent)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _lock_for(directory: Path) -> Lock:
+    with _locks_lock:
+        return _locks.setdefault(directory, Lock())
+
+
+def _history_dir(repo_id: str, audience: str) -> Path:
+    return paths.TUTORIALS_DIR / repo_id / audience
+
+
+def _load_index(directory: Path) -> Tuple[str, List[HistoryMember]]:
+    """The data file name and live members (compaction switches data files)."""
+    try:
+        with open(directory / INDEX_FILE, "r") as f:
+            index = json.load(f)
+        return index.get("file", HISTORY_FILE), index.get("members", [])
+    except (OSError, json.JSONDecodeError):
+        return HISTORY_FILE, []
+
+
+def _write_index(directory: Path, data_file: str, members: List[HistoryMember]) -> None:
+    write_json_atomic(directory / INDEX_FILE, {"file": data_file, "members": members}, indent=None)
+
+
+def _counts(members: List[HistoryMember]) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for member in members:
+        counts[member["kind"]] = counts.get(member["kind"], 0) + member["count"]
+    return counts
+
+
+def append_records(repo_id: str, audience: str, kind: str, records: List[Any], replace: bool = True) -> int:
+    """
+    Append records of one kind to a tutorial's run history.
+
+    Args:
+        repo_id: The sanitized repository name
+        audience: 'user' or 'dev'
+        kind: One of HISTORY_KINDS
+        records: JSON-serializable records, in order
+        replace: Supersede previously stored records of this kind
+
+    Returns:
+        The number of live records of this kind after the append.
+    """
+    if kind not in HISTORY_KINDS:
+        raise ValueError(f"Unknown history kind: {kind}")
+
+    directory = _history_dir(repo_id, audience)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    with _lock_for(directory):
+        data_file, members = _load_index(directory)
+        if replace:
+            members = [m for m in members if m["kind"] != kind]
+
+        if records:
+            payload = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records)
+            compressed = gzip.compress(payload.encode("utf-8"))
+            history_path = directory / data_file
+            with open(history_path, "ab") as f:
+                offset = f.tell()
+                f.write(compressed)
+                f.flush()
+                os.fsync(f.fileno())
+            members.append({"kind": kind, "offset": offset, "length": len(compressed), "count": len(records)})
+
+        # The index is written after the data, so a crash leaves at most unreferenced bytes
+        _write_index(directory, data_file, members)
+    return _counts(members).get(kind, 0)
+
+
+def compact(repo_id: str, audience: str) -> int:
+    """
+    Drop superseded members from a tutorial's history file.
+
+    Live members are copied (still compressed) into a fresh data file, the
+    index is switched to it, then the old file is removed. A crash at any
+    point leaves the old index and file intact.
+
+    Returns:
+        The number of bytes reclaimed.
+    """
+    directory = _history_dir(repo_id, audience)
+    with _lock_for(directory):
+        data_file, members = _load_index(directory)
+        old_path = directory / data_file
+        try:
+            old_size = old_path.stat().st_size
+        except FileNotFoundError:
+            return 0
+        live_size = sum(m["length"] for m in members)
+        if live_size >= old_size:
+            return 0
+
+        new_file = HISTORY_FILE if data_file != HISTORY_FILE else f"history.{uuid.uuid4().hex[:8]}.jsonl.gz"
+        compacted: List[HistoryMember] = []
+        with open(old_path, "rb") as src, open(directory / new_file, "wb") as dst:
+            for member in members:
+                src.seek(member["offset"])
+                compacted.append({**member, "offset": dst.tell()})
+                dst.write(src.read(member["length"]))
+            dst.flush()
+            os.fsync(dst.fileno())
+        _write_index(directory, new_file, compacted)
+        old_path.unlink()
+    return old_size - live_size
+
+
+def read_page(repo_id: str, audience: str, kind: str, offset: int = 0, limit: int = 100) -> HistoryPage:
+    """
+    Read one page of a tutorial's run history.
+
+    Args:
+        repo_id: The sanitized repository name
+        audience: 'user' or 'dev'
+        kind: One of HISTORY_KINDS
+        offset: Index of the first record to return (within this kind)
+        limit: Maximum number of records
+
+    Returns:
+        The page, with `next_offset` set if more records follow.
+    """
+    directory = _history_dir(repo_id, audience)
+    records: List[Any] = []
+    end = offset + limit
+    position = 0
+    # Held while reading so compaction can't swap the data file mid-page
+    with _lock_for(directory):
+        data_file, members = _load_index(directory)
+        members = [m for m in members if m["kind"] == kind]
+        total = sum(m["count"] for m in members)
+        if members and offset < total:
+            with open(directory / data_file, "rb") as f:
+                for member in members:
+                    member_start, member_end = position, position + member["count"]
+                    position = member_end
+                    if member_end <= offset:
+                        continue
+                    if member_start >= end:
+                        break
+                    f.seek(member["offset"])
+                    lines = gzip.decompress(f.read(member["length"])).decode("utf-8").splitlines()
+                    lo = max(offset - member_start, 0)
+                    hi = min(end - member_start, member["count"])
+                    records.extend(json.loads(line) for line in lines[lo:hi])
+
+    return {
+        "kind": kind,
+        "offset": offset,
+        "limit": limit,
+        "total": total,
+        "records": records,
+        "next_offset": end if end < total else None,
+    }
+
+
+def get_counts(repo_id: str, audience: str) -> Dict[str, int]:
+    """Number of live records per kind."""
+    return _counts(_load_index(_history_dir(repo_id, audience))[1])
+
+
+# Run history older tutorials inlined into metadata.json, by field
+LEGACY_METADATA_FIELDS = ("snapshot", "subagent_tool_log")
+_SNAPSHOT_KINDS = (("messages", "message"), ("todos", "todo"), ("subagents", "subagent"))
+_migrate_lock = Lock()
+
+
+def migrate_legacy_metadata(repo_id: str, audience: str) -> bool:
+    """
+    Move run history an older metadata.json still inlines into the history files.
+
+    Records already in the history are newer than the inlined copy and are kept.
+    The legacy fields are then dropped from metadata.json (written atomically).
+
+    Args:
+        repo_id: The sanitized repository name
+        audience: 'user' or 'dev'
+
+    Returns:
+        True if metadata.json was migrated.
+    """
+    metadata_path = _history_dir(repo_id, audience) / "metadata.json"
+    # Serialized so two readers can't both find the history empty and append twice
+    with _migrate_lock:
+        try:
+            with open(metadata_path, "r") as f:
+                metadata = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return False
+        if not isinstance(metadata, dict) or not any(field in metadata for field in LEGACY_METADATA_FIELDS):
+            return False
+
+        counts = get_counts(repo_id, audience)
+        legacy: List[Tuple[str, Any]] = [("tool_call", metadata.get("subagent_tool_log"))]
+        snapshot = metadata.get("snapshot")
+        if isinstance(snapshot, dict):
+            legacy.extend((kind, snapshot.get(key)) for key, kind in _SNAPSHOT_KINDS)
+        for kind, records in legacy:
+            if isinstance(records, list) and records and not counts.get(kind):
+                append_records(repo_id, audience, kind, records)
+
+        for field in LEGACY_METADATA_FIELDS:
+            metadata.pop(field, None)
+        write_json_atomic(metadata_path, metadata)
+    return True
@@ -0,0 +1,42 @@
+"""
+Per-run tutorial write scope.
+
+When a run calls `get_tutorial_path(url, audience)`, its thread is bound to that
+tutorial folder. RestrictedTutorialsBackend then rejects writes from the same
+thread (including its subagents, which share the thread_id) anywhere else, so
+doc-writer can write sections directly without being able to touch other
+tutorials. Writes from a thread that isn't bound (or from outside a run) are
+rejected, and `complete_tutorial` releases the binding.
+
+Note: This is an in-memory registry that resets on server restart; a run
+that resumes after a restart must re-bind with `get_tutorial_path` before
+writing again.
+"""
+
+from threading import Lock
+from typing import Dict
+
+_scopes: Dict[str, str] = {}
+_scopes_lock = Lock()
+
+
+def bind_tutorial_path(thread_id: str, repo_name: str, audience: str) -> None:
+    """Bind a thread to the tutorial folder "{repo_name}/{audience}"."""
+    with _scopes_lock:
+        _scopes[thread_id] = f"{repo_name}/{audience}"
+
+
+def get_tutorial_scope(thread_id: str | None) -> str | None:
+    """The tutorial folder a thread may write to, or None if unbound."""
+    if not thread_id:
+        return None
+    with _scopes_lock:
+        return _scopes.get(thread_id)
+
+
+def release_tutorial_path(thread_id: str | None) -> None:
+    """Drop a thread's binding (when its tutorial is complete)."""
+    if not thread_id:
+        return
+    with _scopes_lock:
+        _scopes.pop(thread_id, None)
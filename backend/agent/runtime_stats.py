@@ -0,0 +1,144 @@
+"""
+Server runtime statistics for load testing and capacity planning.
+
+- Event-loop lag: a probe task sleeps for a fixed interval on the server's
+  event loop and records how late it wakes up. Long synchronous work on the
+  loop (instead of in a worker thread) shows up directly as lag.
+- RSS: resident memory of the server process (None where neither /proc,
+  psutil nor the Unix `resource` module is available).
+
+Both are exposed via the custom API (`/runtime-stats`), together with the
+ToolCallStore lock counters. The probe starts on the first request to that
+endpoint, so servers that are never load-tested don't run it.
+"""
+
+import asyncio
+import os
+import sys
+from collections import deque
+from threading import Lock
+from typing import Dict, List, Sequence, TypedDict
+
+try:
+    import resource  # Unix only
+except ImportError:
+    resource = None
+
+try:
+    import psutil  # Optional; used where /proc and resource are unavailable (Windows)
+except ImportError:
+    psutil = None
+
+PROBE_INTERVAL_SECONDS = 0.05
+# Lag samples kept (at the default interval: the last ~10 minutes)
+PROBE_WINDOW = 12000
+
+
+class LagStats(TypedDict):
+    """Event-loop lag over the probe window, in milliseconds."""
+    samples: int
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0-100) of unsorted values; 0.0 if empty."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def get_rss_bytes() -> int | None:
+    """Current resident set size (peak RSS where only `resource` works); None if unknown."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+    return None
+
+
+class EventLoopLagProbe:
+    """
+    Measures how late the event loop runs a periodic timer.
+
+    Usage:
+        probe = get_lag_probe()
+        probe.ensure_started()      # from inside the server's event loop
+        stats = probe.snapshot()
+    """
+
+    def __init__(self, interval: float = PROBE_INTERVAL_SECONDS, window: int = PROBE_WINDOW):
+        self._interval = interval
+        self._samples: deque = deque(maxlen=window)
+        self._lock = Lock()
+        self._task: asyncio.Task | None = None
+
+    def ensure_started(self) -> None:
+        """Start the probe on the running loop (no-op if it's already running there)."""
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._task.get_loop() is loop:
+            return
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self._interval)
+            lag = max(0.0, loop.time() - start - self._interval)
+            with self._lock:
+                self._samples.append(lag)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+    def snapshot(self) -> LagStats:
+        with self._lock:
+            samples: List[float] = list(self._samples)
+        return {
+            "samples": len(samples),
+            "mean_ms": round(sum(samples) / len(samples) * 1000, 3) if samples else 0.0,
+            "p50_ms": round(percentile(samples, 50) * 1000, 3),
+            "p95_ms": round(percentile(samples, 95) * 1000, 3),
+            "p99_ms": round(percentile(samples, 99) * 1000, 3),
+            "max_ms": round(max(samples, default=0.0) * 1000, 3),
+        }
+
+
+# Global singleton instance
+_probe_instance: EventLoopLagProbe | None = None
+_probe_lock = Lock()
+
+
+def get_lag_probe() -> EventLoopLagProbe:
+    """Get the global event-loop lag probe singleton."""
+    global _probe_instance
+    if _probe_instance is None:
+        with _probe_lock:
+            if _probe_instance is None:
+                _probe_instance = EventLoopLagProbe()
+    return _probe_instance
+
+
+def get_runtime_stats() -> Dict:
+    """RSS, event-loop lag and ToolCallStore lock contention for this process."""
+    from agent.tool_call_store import get_tool_call_store
+
+    return {
+        "rss_bytes": get_rss_bytes(),
+        "event_loop_lag": get_lag_probe().snapshot(),
+        "tool_call_store": get_tool_call_store().get_lock_stats(),
+    }
@@ -8,6 +8,9 @@ They help with quick analysis of specific parts of the codebase.
 """
 
 from agent.middleware import create_subagent_tool_middleware
+from agent.context_governor import create_context_governor_middleware
+from agent.llm_replay import cassette_middleware
+from agent.tools import get_important_files, read_ignored_file
 
 # Code Analyzer Subagent
 # Quick overview of code files
@@ -26,6 +29,7 @@ code_analyzer = {
 - Maximum 2-3 sentences per section
 - Skip deep analysis - high-level overview only
 - Read 1-2 files max, then summarize
+- Pick those files with `get_important_files` - don't guess
 - No code snippets unless essential
 
 ## 🔒 PATH SAFETY
@@ -35,14 +39,17 @@ code_analyzer = {
 - The main agent handles all file output.
 
 ## Available Tools (ONLY THESE exist)
+- `get_important_files`: Ranked "read these first" list for a GitHub URL
 - `ls`: List files in a directory
 - `read_file`: Read content from a file
 - `glob`: Find files matching a pattern
 - `grep`: Search for text within files
+- `read_ignored_file`: Read a file hidden by the ignore policy (only if truly needed)
 
 ## Quick Process
-1. Read the target file(s) with `read_file`
-2. Return a SHORT summary (max 5-10 lines total)
+1. Call `get_important_files(github_url)` to see which files matter most
+2. Read the top-ranked file(s) with `read_file`
+3. Return a SHORT summary (max 5-10 lines total)
 
 ## Output Format (keep it SHORT)
 - **Purpose**: 1 sentence
@@ -50,8 +57,12 @@ code_analyzer = {
 - **Architecture**: 1-2 sentences
 
 Be FAST! Don't overthink it.""",
-    "tools": [],  # Uses FilesystemMiddleware tools from parent
-    "middleware": [create_subagent_tool_middleware("code-analyzer")],  # Tool call event emitter
+    "tools": [get_important_files, read_ignored_file],  # Plus FilesystemMiddleware tools from parent
+    "middleware": [
+        create_subagent_tool_middleware("code-analyzer"),  # Tool call event emitter
+        create_context_governor_middleware("code-analyzer"),  # Per-call token budget
+        *cassette_middleware("code-analyzer"),  # Record/replay (only if REPOLEARN_LLM_MODE is set)
+    ],
 }
 
 # Documentation Writer Subagent
@@ -64,7 +75,8 @@ doc_writer = {
     - Brief API overviews
     - Quick usage examples
     
-    Input should describe what docs to write briefly.""",
+    Input should describe what docs to write briefly AND the full file path
+    under the tutorial path. It saves the file itself and returns a short receipt.""",
     "system_prompt": """You are a Doc Writer - a FAST, BRIEF agent for quick documentation.
 
 ## ⚡ SPEED MODE: Be FAST and BRIEF
@@ -75,30 +87,37 @@ doc_writer = {
 
 ## 🔒 PATH SAFETY
 - You can READ files from the repository using: `ls`, `read_file`, `glob`, `grep`.
-- You CANNOT write files directly - return content to the main agent.
+- You WRITE your doc yourself with `write_file`, to the exact path given in your task
+  (it starts with /tutorials/{repo_name}/{audience}/). Other paths are rejected.
 - You CANNOT use shell/bash - tools like `find`, `cat`, `head` don't exist.
-- The main agent handles saving files to the correct tutorial path.
 
 ## Available Tools (ONLY THESE exist)
 - `ls`: List files in a directory
 - `read_file`: Read content from a file
 - `glob`: Find files matching a pattern
 - `grep`: Search for text within files
+- `write_file`: Save your doc to the tutorial path from your task
 
 ## Quick Process
 1. Check what info is available
 2. Write a SHORT, focused doc
-3. Return the content (main agent will save it)
+3. Save it with `write_file` to the path from your task
+4. Reply with ONLY a one-line receipt - NOT the doc content:
+   `Wrote /tutorials/.../1_getting_started.md (8 lines): <one-sentence summary>`
 
 ## Output Format
-- Keep it under 10 lines
+- Keep the doc under 10 lines
 - Use simple markdown
 - 1 code example if needed
 - Skip the elaborate explanations
 
 Write FAST! Users can ask for more detail later.""",
     "tools": [],  # Uses FilesystemMiddleware tools from parent
-    "middleware": [create_subagent_tool_middleware("doc-writer")],  # Tool call event emitter
+    "middleware": [
+        create_subagent_tool_middleware("doc-writer"),  # Tool call event emitter
+        create_context_governor_middleware("doc-writer"),  # Per-call token budget
+        *cassette_middleware("doc-writer"),  # Record/replay (only if REPOLEARN_LLM_MODE is set)
+    ],
 }
 
 # List of all available subagents
@@ -0,0 +1,226 @@
+"""
+Incremental thread-state deltas for the job dashboard.
+
+Instead of re-fetching the full thread state (every message, todo and subagent
+tool call) on each poll, clients send back an opaque cursor and receive only
+what changed since it:
+
+1. New messages (appended after the last message the client saw)
+2. The todo list, only when some todo's content or status changed
+3. New subagent tool calls from the ToolCallStore
+4. Tutorial files written or modified under the run's tutorial path
+
+The cursor is a URL-safe base64 JSON blob; the server keeps no per-client state.
+If the message history was rewritten (e.g. summarised, or an earlier message
+edited in place), the delta carries `reset: true` and the full message list so
+the client can replace its copy.
+"""
+
+import base64
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, TypedDict
+
+from agent import paths
+
+
+class DeltaCursor(TypedDict):
+    m: int              # Number of messages the client has
+    mh: str             # Hash of the messages the client has ("" if none)
+    t: str              # Hash of the todo list the client has
+    c: int              # Number of tool call entries the client has
+    f: float            # Newest tutorial file mtime the client has seen
+    fs: Dict[str, str]  # Signatures of the files seen at exactly that mtime
+
+
+class FileChange(TypedDict):
+    path: str       # Virtual path (e.g., "/tutorials/owner_repo/dev/0_overview.md")
+    size: int
+    mtime: float
+
+
+class ThreadDelta(TypedDict):
+    cursor: str
+    reset: bool
+    messages: List[Dict[str, Any]]
+    todos: List[Dict[str, Any]] | None      # None means unchanged
+    tool_calls: List[Dict[str, Any]]
+    files: List[FileChange]
+    status: str                             # Thread status ("busy", "idle", ...)
+    finished: bool
+
+
+EMPTY_CURSOR: DeltaCursor = {"m": 0, "mh": "", "t": "", "c": 0, "f": 0.0, "fs": {}}
+
+
+def encode_cursor(cursor: DeltaCursor) -> str:
+    raw = json.dumps(cursor, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str | None) -> DeltaCursor:
+    """Decode a client cursor; missing or malformed cursors start from scratch."""
+    if not token:
+        return {**EMPTY_CURSOR, "fs": {}}
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        cursor = {**EMPTY_CURSOR, **{k: data[k] for k in EMPTY_CURSOR if k in data}}
+        if not isinstance(cursor["fs"], dict):
+            cursor["fs"] = {}
+        return cursor
+    except (ValueError, TypeError):
+        return {**EMPTY_CURSOR, "fs": {}}
+
+
+def _todos_hash(todos: List[Dict[str, Any]]) -> str:
+    if not todos:
+        return ""
+    raw = json.dumps([(t.get("content"), t.get("status")) for t in todos], sort_keys=True)
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+def _messages_hashes(messages: List[Dict[str, Any]], seen: int) -> Tuple[str, str]:
+    """
+    Hashes of the first `seen` messages and of all of them ("" for none).
+
+    Hashing content rather than the last message ID detects in-place edits
+    of earlier messages.
+    """
+    digest = hashlib.sha1()
+    prefix_hash = ""
+    for i, message in enumerate(messages):
+        digest.update(json.dumps(message, sort_keys=True, default=str).encode())
+        if i + 1 == seen:
+            prefix_hash = digest.hexdigest()[:16]
+    return prefix_hash, (digest.hexdigest()[:16] if messages else "")
+
+
+def _file_signature(path: Path, size: int) -> str:
+    """Size plus content hash; tells apart writes that land on the same mtime."""
+    try:
+        content_hash = hashlib.sha1(path.read_bytes()).hexdigest()[:12]
+    except OSError:
+        content_hash = ""
+    return f"{size}:{content_hash}"
+
+
+def _changed_files(
+    repo_id: str | None,
+    audience: str | None,
+    since: float,
+    seen: Dict[str, str],
+) -> Tuple[List[FileChange], float, Dict[str, str]]:
+    """
+    Tutorial files written at or after `since` that the client hasn't seen.
+
+    Filesystem mtimes are coarse, so a file written in the same tick as the
+    cursor's newest one has an equal mtime. Files at exactly `since` are
+    compared against the signatures in `seen` instead of being dropped.
+
+    Returns:
+        (changes, newest mtime, signatures of the files at that mtime)
+    """
+    if not repo_id or not audience:
+        return [], since, seen
+    tutorial_dir = (paths.TUTORIALS_DIR / repo_id / audience).resolve()
+    # Never list (or hash) anything outside the tutorials directory
+    if not tutorial_dir.is_relative_to(paths.TUTORIALS_DIR.resolve()) or not tutorial_dir.is_dir():
+        return [], since, seen
+
+    changes: List[FileChange] = []
+    newest = since
+    boundary: Dict[str, str] = {}
+    for path in tutorial_dir.iterdir():
+        if not path.is_file() or path.name == "metadata.json":
+            continue
+        stat = path.stat()
+        if stat.st_mtime < since:
+            continue
+        signature = _file_signature(path, stat.st_size)
+        if stat.st_mtime > newest:
+            newest = stat.st_mtime
+            boundary = {}
+        if stat.st_mtime == newest:
+            boundary[path.name] = signature
+        if stat.st_mtime == since and seen.get(path.name) == signature:
+            continue
+        changes.append({
+            "path": f"/tutorials/{repo_id}/{audience}/{path.name}",
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+        })
+    changes.sort(key=lambda c: c["mtime"])
+    return changes, newest, boundary
+
+
+def compute_delta(
+    cursor: DeltaCursor,
+    values: Dict[str, Any],
+    tool_calls: List[Dict[str, Any]],
+    status: str = "",
+    finished: bool = False,
+    repo_id: str | None = None,
+    audience: str | None = None,
+) -> ThreadDelta:
+    """
+    Compute what changed since `cursor`.
+
+    Args:
+        cursor: The decoded client cursor
+        values: Thread state values (as returned by the LangGraph threads API)
+        tool_calls: Flat, chronological ToolCallStore entries for the thread
+        status: Thread status to pass through
+        finished: Whether the run has finished
+        repo_id: Optional repository name, to report tutorial file changes
+        audience: Optional audience, to report tutorial file changes
+
+    Returns:
+        The delta, including the cursor to send on the next request.
+    """
+    messages: List[Dict[str, Any]] = values.get("messages") or []
+    todos: List[Dict[str, Any]] = values.get("todos") or []
+
+    # Messages are append-only unless history was rewritten; detect that by
+    # checking the messages the client has are unchanged.
+    seen = cursor["m"]
+    seen_hash, messages_hash = _messages_hashes(messages, seen)
+    reset = False
+    if seen > len(messages) or (seen and seen_hash != cursor["mh"]):
+        reset = True
+        seen = 0
+    new_messages = messages[seen:]
+
+    todos_hash = _todos_hash(todos)
+    changed_todos = todos if (reset or todos_hash != cursor["t"]) else None
+
+    # ToolCallStore is append-only until cleared; a shorter list means it was cleared
+    seen_calls = cursor["c"] if cursor["c"] <= len(tool_calls) else 0
+    new_calls = tool_calls[seen_calls:]
+
+    files, newest_file, newest_signatures = _changed_files(repo_id, audience, cursor["f"], cursor["fs"])
+
+    next_cursor: DeltaCursor = {
+        "m": len(messages),
+        "mh": messages_hash,
+        "t": todos_hash,
+        "c": len(tool_calls),
+        "f": newest_file,
+        "fs": newest_signatures,
+    }
+    return {
+        "cursor": encode_cursor(next_cursor),
+        "reset": reset,
+        "messages": new_messages,
+        "todos": changed_todos,
+        "tool_calls": new_calls,
+        "files": files,
+        "status": status,
+        "finished": finished,
+    }
+
+
+def is_empty(delta: ThreadDelta) -> bool:
+    """True if the delta carries no new activity."""
+    return not (delta["reset"] or delta["messages"] or delta["todos"] is not None or delta["tool_calls"] or delta["files"])
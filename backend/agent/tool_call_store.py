@@ -5,12 +5,21 @@ This module provides a thread-safe store for accumulating tool calls made by sub
 The store is keyed by thread_id, allowing multiple concurrent runs to be tracked separately.
 
 Note: This is an in-memory store that resets on server restart.
-For persistence, tool calls are also saved to metadata snapshots.
+For persistence, complete_tutorial saves a thread's entries to the tutorial's
+compressed run history (agent/run_history.py).
+
+Lock contention (how often and how long callers wait for the store's lock) is
+counted once stats are first requested via `get_lock_stats()` /
+`reset_lock_stats()` (the /runtime-stats endpoints), or from startup when
+REPOLEARN_LOCK_STATS=1. Until then the store takes its lock plainly.
 """
 
-from typing import Dict, List, TypedDict
+import os
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, TypedDict
 from threading import Lock
 from datetime import datetime
+import time
 import uuid
 
 class ToolCallEntry(TypedDict):
@@ -23,6 +32,14 @@ class ToolCallEntry(TypedDict):
     status: str             # "start" or "end"
 
 
+class LockStats(TypedDict):
+    """Contention counters for the store's lock."""
+    acquisitions: int
+    contended: int          # Acquisitions that had to wait for another holder
+    wait_seconds: float     # Total time spent waiting
+    max_wait_seconds: float
+
+
 class ToolCallStore:
     """
     Thread-safe in-memory store for subagent tool calls.
@@ -36,22 +53,47 @@ class ToolCallStore:
     def __init__(self):
         self._data: Dict[str, List[ToolCallEntry]] = {}
         self._lock = Lock()
+        self._lock_stats: LockStats = _empty_lock_stats()
+        self._collect_lock_stats = os.getenv("REPOLEARN_LOCK_STATS", "").strip().lower() in ("1", "true", "yes")
+    
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the lock, counting whether (and how long) we had to wait for it if enabled."""
+        if not self._collect_lock_stats:
+            with self._lock:
+                yield
+            return
+        waited = None
+        if not self._lock.acquire(blocking=False):
+            start = time.perf_counter()
+            self._lock.acquire()
+            waited = time.perf_counter() - start
+        try:
+            stats = self._lock_stats
+            stats["acquisitions"] += 1
+            if waited is not None:
+                stats["contended"] += 1
+                stats["wait_seconds"] += waited
+                stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+            yield
+        finally:
+            self._lock.release()
     
     def add_entry(self, thread_id: str, entry: ToolCallEntry) -> None:
         """Add a tool call entry for a thread."""
-        with self._lock:
+        with self._locked():
             if thread_id not in self._data:
                 self._data[thread_id] = []
             self._data[thread_id].append(entry)
     
     def get_entries(self, thread_id: str) -> List[ToolCallEntry]:
         """Get all tool call entries for a thread."""
-        with self._lock:
+        with self._locked():
             return list(self._data.get(thread_id, []))
     
     def clear_thread(self, thread_id: str) -> None:
         """Clear all entries for a thread."""
-        with self._lock:
+        with self._locked():
             if thread_id in self._data:
                 del self._data[thread_id]
     
@@ -65,6 +107,25 @@ class ToolCallStore:
                 result[subagent] = []
             result[subagent].append(entry)
         return result
+    
+    def get_lock_stats(self) -> Dict:
+        """Lock contention counters, plus the number of threads and entries held (starts collection)."""
+        with self._lock:
+            self._collect_lock_stats = True
+            return {
+                **self._lock_stats,
+                "threads": len(self._data),
+                "entries": sum(len(entries) for entries in self._data.values()),
+            }
+    
+    def reset_lock_stats(self) -> None:
+        with self._lock:
+            self._collect_lock_stats = True
+            self._lock_stats = _empty_lock_stats()
+
+
+def _empty_lock_stats() -> LockStats:
+    return {"acquisitions": 0, "contended": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0}
 
 
 # Global singleton instance
@@ -2,18 +2,20 @@
 Custom tools for the RepoLearn Deep Agent.
 """
 
-import os
-import subprocess
 import re
 import json
 from datetime import datetime
-from pathlib import Path
 from langchain_core.tools import tool
 
+from agent import paths
+from agent.file_ranking import get_ranking, publish_ranking
+from agent.ignore_policy import build_ignore_policy
+from agent.repo_store import clone_repository, get_repo_store
+from agent.run_history import append_records, compact, migrate_legacy_metadata, write_json_atomic
+from agent.run_context import current_thread_id
+from agent.run_scope import bind_tutorial_path, release_tutorial_path
+
 # Base directory for cloned repositories
-DATA_DIR = Path(__file__).parent.parent.parent / "data"
-REPOS_DIR = DATA_DIR / "repositories"
-TUTORIALS_DIR = DATA_DIR / "tutorials"
 
 
 def _sanitize_repo_name(url: str) -> str:
@@ -41,34 +43,41 @@ def git_clone(github_url: str) -> str:
     try:
         # Sanitize and create target directory
         repo_name = _sanitize_repo_name(github_url)
-        target_dir = REPOS_DIR / repo_name
+        target_dir = paths.REPOS_DIR / repo_name
         
         # Create directories if they don't exist
-        REPOS_DIR.mkdir(parents=True, exist_ok=True)
+        paths.REPOS_DIR.mkdir(parents=True, exist_ok=True)
         
-        # Check if already cloned
+        # Check if already cloned (waits for / re-clones after a concurrent eviction)
         if target_dir.exists():
+            error = get_repo_store().ensure_available(repo_name)
+            if error:
+                return error
             return f"Repository already exists at: {target_dir}"
         
-        # Clone the repository
-        result = subprocess.run(
-            ["git", "clone", "--depth", "1", github_url, str(target_dir)],
-            capture_output=True,
-            text=True,
-            timeout=120,
-        )
+        # Clone the repository (with enough history for the churn ranking signal)
+        error = clone_repository(github_url, target_dir)
+        if error:
+            return f"Failed to clone repository: {error}"
+        
+        # Track size/access for the disk quota (may evict other LRU clones)
+        get_repo_store().record_clone(repo_name, github_url)
         
-        if result.returncode != 0:
-            return f"Failed to clone repository: {result.stderr}"
+        # Classify dependency/generated/binary files, then rank the rest by
+        # importance so subagents know what to read first
+        try:
+            build_ignore_policy(repo_name)
+            publish_ranking(repo_name)
+        except Exception as e:
+            # Both are optimizations and are rebuilt lazily on first use
+            print(f"Warning: Failed to classify/rank repository files: {e}")
         
         # Create tutorial output directory
-        tutorial_dir = TUTORIALS_DIR / repo_name
+        tutorial_dir = paths.TUTORIALS_DIR / repo_name
         tutorial_dir.mkdir(parents=True, exist_ok=True)
         
         return f"Successfully cloned repository to: {target_dir}\nTutorial output will be saved to: {tutorial_dir}"
     
-    except subprocess.TimeoutExpired:
-        return "Error: Git clone timed out after 120 seconds"
     except Exception as e:
         return f"Error cloning repository: {str(e)}"
 
@@ -84,7 +93,12 @@ def get_repo_path(github_url: str) -> str:
         The VIRTUAL path (e.g., "/owner_repo") where the repository is stored.
     """
     repo_name = _sanitize_repo_name(github_url)
-    target_dir = REPOS_DIR / repo_name
+    target_dir = paths.REPOS_DIR / repo_name
+    
+    # Re-clone lazily if the quota manager evicted this repo
+    error = get_repo_store().ensure_available(repo_name)
+    if error:
+        return f"Error: {error}"
     
     if target_dir.exists():
         return f"/{repo_name}"
@@ -92,6 +106,76 @@ def get_repo_path(github_url: str) -> str:
         return f"Repository not found. Please clone it first using git_clone."
 
 
+@tool
+def get_important_files(github_url: str, limit: int = 10) -> str:
+    """Get a ranked "read these first" list of the most important files in a cloned repository.
+    
+    Files are ranked by how central they are in the import graph, how often they
+    change, and whether they are entry points or project manifests.
+    Call this BEFORE reading files so your limited reads go to the files that matter.
+    
+    Args:
+        github_url: The full GitHub URL
+        limit: How many files to return (default 10)
+    
+    Returns:
+        A numbered list of VIRTUAL file paths, most important first.
+    """
+    repo_name = _sanitize_repo_name(github_url)
+    error = get_repo_store().ensure_available(repo_name)
+    if error:
+        return f"Error: {error}"
+    if not (paths.REPOS_DIR / repo_name).exists():
+        return "Repository not found. Please clone it first using git_clone."
+    
+    try:
+        ranked = get_ranking(repo_name)
+    except Exception as e:
+        return f"Error ranking repository files: {str(e)}"
+    
+    if not ranked:
+        return "No source files found to rank. Use `ls` to explore the repository."
+    
+    limit = max(1, min(limit, 50))
+    lines = [f"Most important files in {repo_name} (read these first):"]
+    for i, item in enumerate(ranked[:limit], start=1):
+        notes = []
+        if item["imported_by"]:
+            notes.append(f"imported by {item['imported_by']}")
+        if item["entry_point"]:
+            notes.append("entry point")
+        suffix = f" ({', '.join(notes)})" if notes else ""
+        lines.append(f"{i}. {item['path']}{suffix}")
+    return "\n".join(lines)
+
+
+@tool
+def read_ignored_file(file_path: str, offset: int = 0, limit: int = 2000) -> str:
+    """Read a repository file that `read_file` refuses because of the ignore policy.
+    
+    Files like lockfiles, vendored dependencies, generated or minified code are
+    filtered out of ls/glob/grep/read_file. Use this ONLY when you really need one.
+    
+    Args:
+        file_path: VIRTUAL path of the file (e.g., "/owner_repo/package-lock.json")
+        offset: Line number to start reading from
+        limit: Maximum number of lines to read
+    
+    Returns:
+        The file content with line numbers, or an error message.
+    """
+    from deepagents.backends import FilesystemBackend
+    
+    repo_name = file_path.strip("/").split("/")[0]
+    error = get_repo_store().ensure_available(repo_name)
+    if error:
+        return f"Error: {error}"
+    
+    # Plain backend: same sandboxing and formatting as read_file, without the policy
+    backend = FilesystemBackend(root_dir=str(paths.REPOS_DIR), virtual_mode=True, max_file_size_mb=10)
+    return backend.read(file_path, offset, limit)
+
+
 @tool
 def get_tutorial_path(github_url: str, audience: str = "") -> str:
     """Get the REQUIRED path for saving tutorial files.
@@ -132,12 +216,17 @@ def get_tutorial_path(github_url: str, audience: str = "") -> str:
         return f"ERROR: Could not parse repository from URL: {github_url}"
     
     # Create directory on real filesystem
-    tutorial_dir = TUTORIALS_DIR / repo_name / audience
+    tutorial_dir = paths.TUTORIALS_DIR / repo_name / audience
     try:
         tutorial_dir.mkdir(parents=True, exist_ok=True)
     except Exception as e:
         return f"ERROR: Failed to create tutorial directory: {e}"
     
+    # Scope this run's (and its subagents') writes to this folder
+    thread_id = current_thread_id()
+    if thread_id:
+        bind_tutorial_path(thread_id, repo_name, audience)
+    
     # Return virtual path for CompositeBackend routing
     virtual_path = f"/tutorials/{repo_name}/{audience}"
     
@@ -163,21 +252,26 @@ def complete_tutorial(github_url: str, audience: str, summary: str = "") -> str:
         A message confirming completion.
     """
     repo_name = _sanitize_repo_name(github_url)
-    metadata_path = TUTORIALS_DIR / repo_name / audience / "metadata.json"
+    metadata_path = paths.TUTORIALS_DIR / repo_name / audience / "metadata.json"
     
     try:
         if not metadata_path.exists():
             # Try to create it if missing (recovery)
             metadata_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(metadata_path, 'w') as f:
-                json.dump({
-                    "id": f"{repo_name}_{audience}",
-                    "repoId": repo_name,
-                    "githubUrl": github_url,
-                    "audience": audience, 
-                    "status": "pending",
-                    "createdAt": datetime.now().isoformat()
-                }, f)
+            write_json_atomic(metadata_path, {
+                "id": f"{repo_name}_{audience}",
+                "repoId": repo_name,
+                "githubUrl": github_url,
+                "audience": audience, 
+                "status": "pending",
+                "createdAt": datetime.now().isoformat()
+            }, indent=None)
+            
+        # Older tutorials inline their run history; move it out before rewriting the file
+        try:
+            migrate_legacy_metadata(repo_name, audience)
+        except Exception as e:
+            print(f"Warning: Failed to migrate legacy run history: {e}")
             
         with open(metadata_path, 'r') as f:
             metadata = json.load(f)
@@ -187,24 +281,39 @@ def complete_tutorial(github_url: str, audience: str, summary: str = "") -> str:
         metadata["summary"] = summary
         
         # SAVE TOOL CALLS LOG for historical view (Option B)
+        # Stored in the compressed run history, not inlined into metadata.json
+        tool_entries = []
+        thread_id = current_thread_id()
         try:
-            from langgraph.config import get_config
             from agent.tool_call_store import get_tool_call_store
             
-            config = get_config()
-            thread_id = config.get("configurable", {}).get("thread_id")
-            
             if thread_id:
                 store = get_tool_call_store()
                 tool_entries = store.get_entries(thread_id)
-                if tool_entries:
-                    metadata["subagent_tool_log"] = tool_entries
         except Exception as e:
             # Don't fail the whole completion if log saving fails
-            print(f"Warning: Failed to save tool call logs: {e}")
+            print(f"Warning: Failed to read tool call logs: {e}")
         
-        with open(metadata_path, 'w') as f:
-            json.dump(metadata, f, indent=2)
+        write_json_atomic(metadata_path, metadata)
+        
+        if tool_entries:
+            try:
+                append_records(repo_name, audience, "tool_call", tool_entries)
+                compact(repo_name, audience)
+            except Exception as e:
+                print(f"Warning: Failed to save tool call logs: {e}")
+        
+        # The run is done with its clone (it becomes evictable again) and its tutorial folder
+        get_repo_store().release(repo_name)
+        release_tutorial_path(thread_id)
+        
+        # Pre-render sections and update the full-text search index
+        try:
+            from agent.tutorial_index import get_tutorial_index
+            get_tutorial_index().index_tutorial(repo_name, audience)
+        except Exception as e:
+            # Search/artifacts can be rebuilt later; don't fail completion
+            print(f"Warning: Failed to index tutorial: {e}")
             
         return f"Successfully marked tutorial for {repo_name} ({audience}) as completed."
     except Exception as e:
@@ -0,0 +1,429 @@
+"""
+Pre-rendered tutorial artifacts and full-text search index.
+
+When a tutorial is completed, each markdown section is parsed once into a
+compact artifact (title, heading outline, code-file links and mermaid blocks)
+so tutorial pages can open without re-deriving that structure,
+and the section text is added to a SQLite FTS5 index shared by all tutorials.
+
+Indexing is incremental: a section is only re-parsed when its mtime or size
+changes, and sections whose files were deleted are dropped from the index.
+Tutorials deleted outside the backend (the frontend removes their folders
+directly) are pruned when a search hits one of their sections.
+
+Storage: data/index/tutorials.db
+"""
+
+import html
+import json
+import re
+import sqlite3
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, TypedDict
+
+from agent import paths
+
+INDEX_DB_FILE = "tutorials.db"
+
+AUDIENCES = ("user", "dev")
+
+# Match markers for FTS snippets (control characters never appear in the
+# indexed text); replaced by <mark> tags after HTML-escaping the snippet
+MARK_OPEN = "\x02"
+MARK_CLOSE = "\x03"
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+FENCE_RE = re.compile(r"^(```|~~~)\s*([\w+-]*)")
+LINK_RE = re.compile(r"(?<!!)\[([^\]]*)\]\(([^)\s]+)(?:\s+\"[^\"]*\")?\)")
+
+
+class Heading(TypedDict):
+    level: int
+    text: str
+    anchor: str
+
+
+class CodeLink(TypedDict):
+    text: str
+    path: str
+
+
+class SectionArtifact(TypedDict):
+    """Pre-rendered structure of a single tutorial markdown file."""
+    tutorialId: str         # e.g., "owner_repo_dev"
+    repoId: str             # e.g., "owner_repo"
+    audience: str           # "user" or "dev"
+    filename: str           # e.g., "0_overview.md"
+    title: str
+    headings: List[Heading]
+    codeLinks: List[CodeLink]
+    mermaid: List[str]      # Raw mermaid diagram sources, in document order
+    wordCount: int
+    content: str            # Original markdown
+
+
+class SearchHit(TypedDict):
+    tutorialId: str
+    repoId: str
+    audience: str
+    filename: str
+    title: str
+    snippet: str
+    score: float
+
+
+def _slugify(text: str) -> str:
+    """GitHub-style heading anchor."""
+    slug = re.sub(r"[^\w\- ]", "", text.strip().lower())
+    return slug.replace(" ", "-")
+
+
+def _strip_inline_markdown(text: str) -> str:
+    text = LINK_RE.sub(r"\1", text)
+    return re.sub(r"[`*_~]", "", text)
+
+
+def render_section(repo_id: str, audience: str, filename: str, content: str) -> SectionArtifact:
+    """
+    Parse a markdown section into its pre-rendered artifact.
+
+    Args:
+        repo_id: The sanitized repository name
+        audience: 'user' or 'dev'
+        filename: The markdown filename within the audience folder
+        content: The raw markdown
+
+    Returns:
+        The section artifact.
+    """
+    artifact, _ = _render(repo_id, audience, filename, content)
+    return artifact
+
+
+def _render(repo_id: str, audience: str, filename: str, content: str) -> tuple[SectionArtifact, str]:
+    """Build the section artifact plus the plain text used for the search index."""
+    headings: List[Heading] = []
+    code_links: List[CodeLink] = []
+    mermaid: List[str] = []
+    text_lines: List[str] = []
+
+    seen_links = set()
+    in_fence = False
+    fence_marker = ""
+    fence_lang = ""
+    fence_lines: List[str] = []
+
+    for line in content.splitlines():
+        fence = FENCE_RE.match(line.strip())
+        if in_fence:
+            if fence and line.strip().startswith(fence_marker) and not fence.group(2):
+                if fence_lang == "mermaid":
+                    mermaid.append("\n".join(fence_lines))
+                else:
+                    text_lines.extend(fence_lines)
+                in_fence = False
+            else:
+                fence_lines.append(line)
+            continue
+        if fence:
+            in_fence = True
+            fence_marker = fence.group(1)
+            fence_lang = fence.group(2).lower()
+            fence_lines = []
+            continue
+
+        heading = HEADING_RE.match(line)
+        if heading:
+            text = _strip_inline_markdown(heading.group(2))
+            headings.append({"level": len(heading.group(1)), "text": text, "anchor": _slugify(text)})
+
+        # Same rule as the tutorial page: non-http, non-anchor links open code files
+        for link_text, href in LINK_RE.findall(line):
+            if href.startswith(("http:", "https:", "#", "mailto:")):
+                continue
+            if href not in seen_links:
+                seen_links.add(href)
+                code_links.append({"text": link_text, "path": href})
+
+        text_lines.append(_strip_inline_markdown(line))
+
+    # An unclosed fence runs to the end of the document (as in CommonMark)
+    if in_fence:
+        if fence_lang == "mermaid":
+            mermaid.append("\n".join(fence_lines))
+        else:
+            text_lines.extend(fence_lines)
+
+    title = next((h["text"] for h in headings if h["level"] == 1), None)
+    if not title:
+        title = headings[0]["text"] if headings else filename.rsplit(".", 1)[0]
+
+    plain = "\n".join(text_lines)
+    artifact: SectionArtifact = {
+        "tutorialId": f"{repo_id}_{audience}",
+        "repoId": repo_id,
+        "audience": audience,
+        "filename": filename,
+        "title": title,
+        "headings": headings,
+        "codeLinks": code_links,
+        "mermaid": mermaid,
+        "wordCount": len(plain.split()),
+        "content": content,
+    }
+    return artifact, plain
+
+
+class TutorialIndex:
+    """
+    SQLite-backed store of section artifacts with an FTS5 search index.
+
+    Usage:
+        index = get_tutorial_index()
+        index.index_tutorial("owner_repo", "dev")
+        hits = index.search("middleware")
+    """
+
+    def __init__(self, db_path: Path | None = None, tutorials_dir: Path | None = None):
+        self._db_path = db_path or paths.INDEX_DIR / INDEX_DB_FILE
+        self._tutorials_dir = tutorials_dir or paths.TUTORIALS_DIR
+        self._lock = Lock()
+        self._backfilled = False
+        self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self._db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sections (
+                    repo_id TEXT NOT NULL,
+                    audience TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    mtime REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    artifact TEXT NOT NULL,
+                    PRIMARY KEY (repo_id, audience, filename)
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS sections_fts USING fts5(
+                    repo_id UNINDEXED,
+                    audience UNINDEXED,
+                    filename UNINDEXED,
+                    title,
+                    body,
+                    tokenize = 'porter unicode61'
+                )
+                """
+            )
+
+    def _delete_section(self, repo_id: str, audience: str, filename: str) -> None:
+        self._conn.execute(
+            "DELETE FROM sections WHERE repo_id = ? AND audience = ? AND filename = ?",
+            (repo_id, audience, filename),
+        )
+        self._conn.execute(
+            "DELETE FROM sections_fts WHERE repo_id = ? AND audience = ? AND filename = ?",
+            (repo_id, audience, filename),
+        )
+
+    def index_tutorial(self, repo_id: str, audience: str) -> int:
+        """
+        Incrementally (re)index all markdown sections of one tutorial.
+
+        Args:
+            repo_id: The sanitized repository name
+            audience: 'user' or 'dev'
+
+        Returns:
+            The number of sections that were (re)rendered.
+        """
+        tutorial_dir = self._tutorials_dir / repo_id / audience
+        on_disk: Dict[str, Path] = {}
+        if tutorial_dir.is_dir():
+            on_disk = {p.name: p for p in tutorial_dir.glob("*.md") if p.is_file()}
+
+        updated = 0
+        with self._lock, self._conn:
+            known = {
+                row["filename"]: (row["mtime"], row["size"])
+                for row in self._conn.execute(
+                    "SELECT filename, mtime, size FROM sections WHERE repo_id = ? AND audience = ?",
+                    (repo_id, audience),
+                )
+            }
+
+            for filename in known.keys() - on_disk.keys():
+                self._delete_section(repo_id, audience, filename)
+
+            for filename, path in sorted(on_disk.items()):
+                stat = path.stat()
+                if known.get(filename) == (stat.st_mtime, stat.st_size):
+                    continue
+                content = path.read_text(encoding="utf-8", errors="replace")
+                artifact, body = _render(repo_id, audience, filename, content)
+
+                self._delete_section(repo_id, audience, filename)
+                self._conn.execute(
+                    "INSERT INTO sections (repo_id, audience, filename, mtime, size, artifact) VALUES (?, ?, ?, ?, ?, ?)",
+                    (repo_id, audience, filename, stat.st_mtime, stat.st_size, json.dumps(artifact)),
+                )
+                self._conn.execute(
+                    "INSERT INTO sections_fts (repo_id, audience, filename, title, body) VALUES (?, ?, ?, ?, ?)",
+                    (repo_id, audience, filename, artifact["title"], body),
+                )
+                updated += 1
+        return updated
+
+    def remove_tutorial(self, repo_id: str, audience: str | None = None) -> None:
+        """Drop a tutorial (or one audience of it) from the index."""
+        audiences = (audience,) if audience else AUDIENCES
+        with self._lock, self._conn:
+            for aud in audiences:
+                self._conn.execute("DELETE FROM sections WHERE repo_id = ? AND audience = ?", (repo_id, aud))
+                self._conn.execute("DELETE FROM sections_fts WHERE repo_id = ? AND audience = ?", (repo_id, aud))
+
+    def reindex_all(self) -> int:
+        """Incrementally index every tutorial on disk and forget deleted ones."""
+        updated = 0
+        seen = set()
+        if self._tutorials_dir.is_dir():
+            for repo_dir in sorted(p for p in self._tutorials_dir.iterdir() if p.is_dir()):
+                for audience in AUDIENCES:
+                    if (repo_dir / audience).is_dir():
+                        seen.add((repo_dir.name, audience))
+                        updated += self.index_tutorial(repo_dir.name, audience)
+
+        with self._lock:
+            indexed = {
+                (row["repo_id"], row["audience"])
+                for row in self._conn.execute("SELECT DISTINCT repo_id, audience FROM sections")
+            }
+        for repo_id, audience in indexed - seen:
+            self.remove_tutorial(repo_id, audience)
+        return updated
+
+    def ensure_backfilled(self) -> None:
+        """Index tutorials created before the index existed (once per process)."""
+        if not self._backfilled:
+            self.reindex_all()
+            self._backfilled = True
+
+    def list_sections(self, repo_id: str, audience: str) -> List[Dict]:
+        """List section summaries (artifact without markdown content), in filename order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT artifact FROM sections WHERE repo_id = ? AND audience = ? ORDER BY filename",
+                (repo_id, audience),
+            ).fetchall()
+        summaries = []
+        for row in rows:
+            artifact = json.loads(row["artifact"])
+            artifact.pop("content", None)
+            summaries.append(artifact)
+        return summaries
+
+    def get_section(self, repo_id: str, audience: str, filename: str) -> SectionArtifact | None:
+        """Get the full pre-rendered artifact for a section."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT artifact FROM sections WHERE repo_id = ? AND audience = ? AND filename = ?",
+                (repo_id, audience, filename),
+            ).fetchone()
+        return json.loads(row["artifact"]) if row else None
+
+    def search(self, query: str, limit: int = 20, audience: str | None = None, repo_id: str | None = None) -> List[SearchHit]:
+        """
+        Full-text search across all indexed tutorials.
+
+        Args:
+            query: Free-text query (treated as terms, last term prefix-matched)
+            limit: Maximum number of hits
+            audience: Optional audience filter
+            repo_id: Optional repository filter
+
+        Returns:
+            Hits ordered by BM25 relevance (best first).
+        """
+        match = _to_fts_query(query)
+        if not match:
+            return []
+
+        rows = self._search_rows(match, limit, audience, repo_id)
+        stale = {
+            (row["repo_id"], row["audience"]) for row in rows
+            if not (self._tutorials_dir / row["repo_id"] / row["audience"] / row["filename"]).is_file()
+        }
+        if stale:
+            # Deleted behind our back: re-sync those tutorials, then search again
+            for stale_repo_id, stale_audience in stale:
+                self.index_tutorial(stale_repo_id, stale_audience)
+            rows = self._search_rows(match, limit, audience, repo_id)
+
+        return [
+            {
+                "tutorialId": f"{row['repo_id']}_{row['audience']}",
+                "repoId": row["repo_id"],
+                "audience": row["audience"],
+                "filename": row["filename"],
+                "title": row["title"],
+                "snippet": _highlight(row["snippet"]),
+                "score": round(-row["rank"], 4),
+            }
+            for row in rows
+        ]
+
+    def _search_rows(self, match: str, limit: int, audience: str | None, repo_id: str | None) -> List[sqlite3.Row]:
+        sql = (
+            "SELECT repo_id, audience, filename, title, "
+            f"snippet(sections_fts, 4, '{MARK_OPEN}', '{MARK_CLOSE}', '…', 16) AS snippet, "
+            "bm25(sections_fts, 5.0, 1.0) AS rank "
+            "FROM sections_fts WHERE sections_fts MATCH ?"
+        )
+        params: List = [match]
+        if audience:
+            sql += " AND audience = ?"
+            params.append(audience)
+        if repo_id:
+            sql += " AND repo_id = ?"
+            params.append(repo_id)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+
+def _highlight(snippet: str) -> str:
+    """HTML-escape a snippet, then turn the match markers into <mark> tags."""
+    escaped = html.escape(snippet or "")
+    return escaped.replace(MARK_OPEN, "<mark>").replace(MARK_CLOSE, "</mark>")
+
+
+def _to_fts_query(query: str) -> str:
+    """Turn free text into a safe FTS5 query (quoted terms, prefix on the last)."""
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return ""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+# Global singleton instance
+_index_instance: TutorialIndex | None = None
+_index_lock = Lock()
+
+
+def get_tutorial_index() -> TutorialIndex:
+    """Get the global tutorial index singleton."""
+    global _index_instance
+    if _index_instance is None:
+        with _index_lock:
+            if _index_instance is None:
+                _index_instance = TutorialIndex()
+    return _index_instance
@@ -2,16 +2,54 @@
 Custom HTTP endpoints for the LangGraph server.
 
 This module provides additional API routes that extend the LangGraph server,
-including the endpoint for fetching subagent tool calls.
+including the endpoint for fetching subagent tool calls, the incremental
+thread-state delta endpoints, the tutorial search / pre-rendered section
+endpoints, and runtime statistics for load testing.
+
+On startup the agent graph is built in the background, in a worker thread:
+the server calls the `make_graph` factory on its event loop, and a cold build
+there would stall every other request for seconds. Startup (and /health)
+doesn't wait for it.
 """
 
-from fastapi import FastAPI
+import asyncio
+import json
+import re
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Dict, List
+from typing import Any, Dict, List, Tuple
 
 from agent.tool_call_store import get_tool_call_store, ToolCallEntry
+from agent.tutorial_index import get_tutorial_index, SearchHit, SectionArtifact, AUDIENCES
+from agent.ignore_policy import get_ignore_policy
+from agent.repo_store import get_repo_store
+from agent.runtime_stats import get_lag_probe, get_runtime_stats
+from agent.run_history import HISTORY_KINDS, HistoryPage, append_records, compact, get_counts, migrate_legacy_metadata, read_page
+from agent.thread_delta import ThreadDelta, compute_delta, decode_cursor, is_empty
+
+
+def _report_warmup(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        # Not fatal here: the first run builds it again and reports the error
+        print(f"Warning: Could not build the agent graph at startup: {task.exception()}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the agent graph off the event loop without delaying startup."""
+    from agent.graph import make_graph
+
+    warmup = asyncio.create_task(asyncio.to_thread(make_graph))
+    warmup.add_done_callback(_report_warmup)
+    yield
+
+
+app = FastAPI(title="RepoLearn Custom API", lifespan=lifespan)
 
-app = FastAPI(title="RepoLearn Custom API")
+# Sanitized repository names ("owner_repo"): no separators, no leading dot
+REPO_ID_RE = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9._-]*$")
 
 # Add CORS middleware (LangGraph server handles main CORS, but this is for safety)
 app.add_middleware(
@@ -69,6 +107,378 @@ async def clear_tool_calls(thread_id: str) -> Dict[str, str]:
     return {"status": "cleared", "thread_id": thread_id}
 
 
+async def _fetch_thread(thread_id: str) -> Tuple[Dict[str, Any], str, bool]:
+    """
+    Fetch thread state values, status and completion from the LangGraph server.
+    
+    Returns:
+        (values, status, finished)
+    """
+    # Imported lazily: the SDK client is only needed by the delta endpoints
+    from langgraph_sdk import get_client
+    
+    client = get_client()
+    try:
+        thread = await client.threads.get(thread_id)
+        state = await client.threads.get_state(thread_id)
+    except Exception as e:
+        if getattr(getattr(e, "response", None), "status_code", None) == 404:
+            raise HTTPException(status_code=404, detail="Thread not found")
+        raise
+    
+    values = state.get("values") or {}
+    if not isinstance(values, dict):
+        values = {}
+    # Same completion rule as the job page: no pending nodes and some output
+    finished = not state.get("next") and bool(values.get("messages"))
+    return values, thread.get("status", ""), finished
+
+
+async def _thread_delta(thread_id: str, cursor: str | None, repo_id: str | None, audience: str | None) -> ThreadDelta:
+    values, status, finished = await _fetch_thread(thread_id)
+    tool_calls = get_tool_call_store().get_entries(thread_id)
+    # Hashing messages and tutorial files is CPU/filesystem work: keep it off the loop
+    return await asyncio.to_thread(
+        compute_delta,
+        decode_cursor(cursor),
+        values,
+        tool_calls,
+        status=status,
+        finished=finished,
+        repo_id=repo_id,
+        audience=audience,
+    )
+
+
+@app.get("/threads/{thread_id}/delta")
+async def get_thread_delta(
+    thread_id: str,
+    cursor: str | None = None,
+    repo_id: str | None = None,
+    audience: str | None = None,
+) -> ThreadDelta:
+    """
+    Get only what changed in a thread since the client's cursor.
+    
+    Args:
+        thread_id: The LangGraph thread ID
+        cursor: The cursor returned by the previous call (omit for the first call)
+        repo_id: Optional repository name, to include tutorial file changes
+        audience: Optional 'user' or 'dev', to include tutorial file changes
+        
+    Returns:
+        New messages, changed todos, new tool calls, new/modified tutorial files,
+        and the cursor to send next time
+    """
+    _check_delta_scope(repo_id, audience)
+    return await _thread_delta(thread_id, cursor, repo_id, audience)
+
+
+@app.get("/threads/{thread_id}/delta/stream")
+async def stream_thread_delta(
+    request: Request,
+    thread_id: str,
+    cursor: str | None = None,
+    repo_id: str | None = None,
+    audience: str | None = None,
+    interval: float = Query(1.0, ge=0.25, le=30.0),
+):
+    """
+    Server-Sent Events variant of the delta endpoint.
+    
+    Emits a `delta` event whenever something changed (checked every `interval`
+    seconds) and an `end` event once the run has finished.
+    
+    Args:
+        thread_id: The LangGraph thread ID
+        cursor: Optional cursor to resume from
+        repo_id: Optional repository name, to include tutorial file changes
+        audience: Optional 'user' or 'dev', to include tutorial file changes
+        interval: Seconds between checks
+    """
+    from sse_starlette.sse import EventSourceResponse
+    
+    _check_delta_scope(repo_id, audience)
+    # Fail fast with a 404 instead of opening a stream for a missing thread
+    await _fetch_thread(thread_id)
+    
+    async def events():
+        current = cursor
+        while not await request.is_disconnected():
+            delta = await _thread_delta(thread_id, current, repo_id, audience)
+            current = delta["cursor"]
+            if not is_empty(delta):
+                yield {"event": "delta", "id": current, "data": json.dumps(delta)}
+            if delta["finished"] and delta["status"] != "busy":
+                yield {"event": "end", "id": current, "data": json.dumps({"cursor": current})}
+                return
+            await asyncio.sleep(interval)
+    
+    return EventSourceResponse(events())
+
+
+def _check_repo_id(repo_id: str) -> None:
+    """Reject repo ids that could escape the data directories (e.g., "..")."""
+    if not REPO_ID_RE.match(repo_id) or ".." in repo_id:
+        raise HTTPException(status_code=400, detail="Invalid repository id")
+
+
+def _check_tutorial(repo_id: str, audience: str) -> None:
+    _check_repo_id(repo_id)
+    if audience not in AUDIENCES:
+        raise HTTPException(status_code=400, detail="audience must be 'user' or 'dev'")
+
+
+def _check_delta_scope(repo_id: str | None, audience: str | None) -> None:
+    """Validate the optional tutorial scope of the delta endpoints."""
+    if repo_id is not None or audience is not None:
+        _check_tutorial(repo_id or "", audience or "")
+
+
+# Tutorial endpoints are sync: FastAPI runs them in its threadpool so SQLite
+# and filesystem work never blocks the event loop.
+
+@app.get("/tutorials/search")
+def search_tutorials(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    audience: str | None = None,
+    repo_id: str | None = None,
+) -> List[SearchHit]:
+    """
+    Full-text search across all generated tutorials.
+    
+    Args:
+        q: Search terms
+        limit: Maximum number of hits
+        audience: Optional 'user' or 'dev' filter
+        repo_id: Optional repository filter (e.g., "owner_repo")
+        
+    Returns:
+        Matching sections ordered by relevance, with highlighted snippets
+    """
+    if repo_id is not None:
+        _check_repo_id(repo_id)
+    index = get_tutorial_index()
+    index.ensure_backfilled()
+    return index.search(q, limit=limit, audience=audience, repo_id=repo_id)
+
+
+@app.get("/tutorials/{repo_id}/{audience}/sections")
+def list_tutorial_sections(repo_id: str, audience: str) -> List[Dict]:
+    """
+    List the pre-rendered sections of a tutorial (outline only, no content).
+    
+    Args:
+        repo_id: The sanitized repository name
+        audience: 'user' or 'dev'
+        
+    Returns:
+        Section summaries (title, headings, code links, mermaid blocks) in filename order
+    """
+    _check_tutorial(repo_id, audience)
+    index = get_tutorial_index()
+    # Cheap when nothing changed: only stats the section files
+    index.index_tutorial(repo_id, audience)
+    sections = index.list_sections(repo_id, audience)
+    if not sections:
+        raise HTTPException(status_code=404, detail="Tutorial not found")
+    return sections
+
+
+@app.get("/tutorials/{repo_id}/{audience}/sections/{filename}")
+def get_tutorial_section(repo_id: str, audience: str, filename: str) -> SectionArtifact:
+    """
+    Get one pre-rendered tutorial section, including its markdown.
+    
+    Args:
+        repo_id: The sanitized repository name
+        audience: 'user' or 'dev'
+        filename: The section filename (e.g., "0_overview.md")
+        
+    Returns:
+        The section artifact
+    """
+    _check_tutorial(repo_id, audience)
+    if "/" in filename or "\\" in filename or filename.startswith("."):
+        raise HTTPException(status_code=400, detail="Invalid section filename")
+    index = get_tutorial_index()
+    section = index.get_section(repo_id, audience, filename)
+    if section is None:
+        # Section may have been written after the last indexing pass
+        index.index_tutorial(repo_id, audience)
+        section = index.get_section(repo_id, audience, filename)
+    if section is None:
+        raise HTTPException(status_code=404, detail="Section not found")
+    return section
+
+
+@app.get("/tutorials/{repo_id}/{audience}/history")
+def get_tutorial_history(
+    repo_id: str,
+    audience: str,
+    kind: str = "tool_call",
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+) -> HistoryPage:
+    """
+    Get one page of a completed run's history.
+    
+    Args:
+        repo_id: The sanitized repository name
+        audience: 'user' or 'dev'
+        kind: 'tool_call', 'message', 'todo' or 'subagent'
+        offset: Index of the first record
+        limit: Page size
+        
+    Returns:
+        The records plus total count and the next offset (null on the last page)
+    """
+    _check_tutorial(repo_id, audience)
+    if kind not in HISTORY_KINDS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of {', '.join(HISTORY_KINDS)}")
+    migrate_legacy_metadata(repo_id, audience)
+    return read_page(repo_id, audience, kind, offset=offset, limit=limit)
+
+
+@app.post("/tutorials/{repo_id}/{audience}/history")
+def save_tutorial_snapshot(repo_id: str, audience: str, snapshot: Dict[str, List[Any]]) -> Dict[str, int]:
+    """
+    Store the job page's final snapshot (messages, todos, subagents) in the run history.
+    
+    Args:
+        repo_id: The sanitized repository name
+        audience: 'user' or 'dev'
+        snapshot: {"messages": [...], "todos": [...], "subagents": [...]}
+        
+    Returns:
+        Live record counts per kind
+    """
+    _check_tutorial(repo_id, audience)
+    migrate_legacy_metadata(repo_id, audience)
+    for key, kind in (("messages", "message"), ("todos", "todo"), ("subagents", "subagent")):
+        if key in snapshot:
+            append_records(repo_id, audience, kind, snapshot[key])
+    # The snapshot is saved once the run completes; drop the records it superseded
+    compact(repo_id, audience)
+    return get_counts(repo_id, audience)
+
+
+@app.post("/tutorials/{repo_id}/{audience}/history/migrate")
+def migrate_tutorial_history(repo_id: str, audience: str) -> Dict[str, Any]:
+    """
+    Move run history an older tutorial still inlines in metadata.json into the history files.
+    
+    Args:
+        repo_id: The sanitized repository name
+        audience: 'user' or 'dev'
+        
+    Returns:
+        Whether metadata.json was migrated, and the live record counts per kind
+    """
+    _check_tutorial(repo_id, audience)
+    migrated = migrate_legacy_metadata(repo_id, audience)
+    return {"migrated": migrated, "counts": get_counts(repo_id, audience)}
+
+
+@app.get("/repositories/usage")
+def get_repository_usage() -> Dict:
+    """
+    Get disk usage of cloned repositories against the quota.
+    
+    Returns:
+        Quota, total bytes, and per-repo size / last access / eviction state
+    """
+    return get_repo_store().get_usage()
+
+
+@app.get("/repositories/{repo_id}/files")
+def list_repository_files(repo_id: str) -> Dict[str, Any]:
+    """
+    List a clone's files with the repository ignore policy applied.
+    
+    Args:
+        repo_id: The sanitized repository name
+        
+    Returns:
+        Visible file paths (relative to the repo root) and per-reason filtered counts
+    """
+    _check_repo_id(repo_id)
+    error = get_repo_store().ensure_available(repo_id)
+    if error:
+        raise HTTPException(status_code=502, detail=error)
+    policy = get_ignore_policy(repo_id)
+    if policy is None:
+        raise HTTPException(status_code=404, detail="Repository not found")
+    return {"files": policy.visible_files(), "summary": policy.summary()}
+
+
+@app.post("/repositories/{repo_id}/restore")
+def restore_repository(repo_id: str) -> Dict[str, str]:
+    """
+    Re-clone a repository if the quota manager evicted it.
+    
+    Call before reading repo files directly from disk (e.g., the code viewer).
+    
+    Args:
+        repo_id: The sanitized repository name
+        
+    Returns:
+        Confirmation message
+    """
+    _check_repo_id(repo_id)
+    error = get_repo_store().ensure_available(repo_id)
+    if error:
+        raise HTTPException(status_code=502, detail=error)
+    return {"status": "available", "repo_id": repo_id}
+
+
+@app.get("/context-stats/{thread_id}")
+async def get_thread_context_stats(thread_id: str) -> Dict[str, int]:
+    """
+    Get the context governor's token savings for a thread.
+    
+    Args:
+        thread_id: The LangGraph thread ID
+        
+    Returns:
+        Model calls, estimated tokens before/after compaction, and counts of
+        stubbed tool outputs and summarised messages
+    """
+    # Imported lazily: pulls in LangChain, which the graph has loaded anyway
+    from agent.context_governor import get_context_stats
+    
+    stats = get_context_stats(thread_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="No model calls recorded for this thread")
+    return stats
+
+
+@app.get("/runtime-stats")
+async def get_server_runtime_stats() -> Dict[str, Any]:
+    """
+    Get server runtime statistics (for load tests and capacity planning).
+    
+    The first call starts the event-loop lag probe, so lag figures cover the
+    time since then (or since the last reset).
+    
+    Returns:
+        RSS, event-loop lag percentiles and ToolCallStore lock contention
+    """
+    get_lag_probe().ensure_started()
+    return get_runtime_stats()
+
+
+@app.post("/runtime-stats/reset")
+async def reset_server_runtime_stats() -> Dict[str, str]:
+    """Start a new measurement window (clears lag samples and lock counters)."""
+    probe = get_lag_probe()
+    probe.ensure_started()
+    probe.reset()
+    get_tool_call_store().reset_lock_stats()
+    return {"status": "reset"}
+
+
 @app.get("/health")
 async def health_check() -> Dict[str, str]:
     """Health check endpoint."""
@@ -0,0 +1,89 @@
+"""
+Benchmarks for the sandboxed filesystem backends (and the per-clone indexes
+they depend on), on the fixture repositories.
+"""
+
+import pytest
+
+from harness import fixture_repo_name
+
+SMALL = fixture_repo_name("pyshop")
+LARGE = fixture_repo_name("bigpkg")
+
+
+@pytest.fixture(scope="module")
+def repo_backend(repos_dir):
+    from agent.backends import ReadOnlyRepoBackend
+    return ReadOnlyRepoBackend(root_dir=str(repos_dir), virtual_mode=True, max_file_size_mb=10)
+
+
+@pytest.fixture(scope="module")
+def tutorials_backend(repos_dir):
+    from agent.backends import RestrictedTutorialsBackend
+    tutorials_dir = repos_dir.parent / "tutorials"
+    return RestrictedTutorialsBackend(root_dir=str(tutorials_dir), virtual_mode=True, max_file_size_mb=5)
+
+
+@pytest.mark.parametrize("repo", [SMALL, LARGE])
+def test_ls(benchmark, repo_backend, repo):
+    result = benchmark(repo_backend.ls_info, f"/{repo}")
+    assert result
+
+
+def test_ls_hides_ignored(benchmark, repo_backend):
+    result = benchmark(repo_backend.ls_info, f"/{fixture_repo_name('webdash')}")
+    names = {info["path"].rstrip("/").split("/")[-1] for info in result}
+    assert "node_modules" not in names and "src" in names
+
+
+@pytest.mark.parametrize("repo", [SMALL, LARGE])
+def test_glob(benchmark, repo_backend, repo):
+    result = benchmark(repo_backend.glob_info, "**/*.py", f"/{repo}")
+    assert result
+
+
+@pytest.mark.parametrize("repo", [SMALL, LARGE])
+def test_grep(benchmark, repo_backend, repo):
+    result = benchmark(repo_backend.grep_raw, "def ", f"/{repo}", None)
+    assert not isinstance(result, str)
+
+
+def test_read(benchmark, repo_backend):
+    result = benchmark(repo_backend.read, f"/{LARGE}/bigpkg/pkg5/mod200.py", 0, 2000)
+    assert "func_200_0" in result
+
+
+def test_read_filtered(benchmark, repo_backend):
+    result = benchmark(repo_backend.read, f"/{SMALL}/poetry.lock", 0, 2000)
+    assert result.startswith("Error: FILTERED")
+
+
+def test_tutorial_write(benchmark, tutorials_backend, monkeypatch):
+    from agent.run_scope import bind_tutorial_path, release_tutorial_path
+
+    # Writes need a run bound to its tutorial folder, as after get_tutorial_path
+    thread_id = "bench-tutorial-write"
+    monkeypatch.setattr("agent.backends.current_thread_id", lambda: thread_id)
+    bind_tutorial_path(thread_id, SMALL, "dev")
+    content = "# Overview\n\n" + "Some text.\n" * 200
+    counter = iter(range(10**9))
+
+    def write():
+        return tutorials_backend.write(f"/{SMALL}/dev/bench_{next(counter)}.md", content)
+
+    result = benchmark(write)
+    release_tutorial_path(thread_id)
+    assert not result.error
+    assert tutorials_backend.write(f"/{SMALL}/dev/unbound.md", content).error.startswith("NO TUTORIAL PATH")
+
+
+def test_ignore_policy_build(benchmark, repos_dir):
+    from agent.ignore_policy import IgnorePolicy
+    policy = benchmark(IgnorePolicy.build, LARGE)
+    assert len(policy.paths) > 400
+
+
+def test_rank_repository(benchmark, repos_dir):
+    from agent.file_ranking import rank_repository
+    ranked = benchmark(rank_repository, LARGE)
+    assert ranked
@@ -0,0 +1,48 @@
+"""
+End-to-end benchmark: full tutorial runs replayed from recorded cassettes.
+
+Measures the backend's own overhead per run (graph, middleware, tools,
+backends, indexing) with the model's latency removed. Cassettes are recorded
+with benchmarks/record_run.py; pyshop-dev.jsonl (recorded against the stub
+model) is committed so there is always at least one run to replay.
+"""
+
+import shutil
+
+import pytest
+
+from harness import CASSETTES_DIR, fixture_repo_name, recorded_tutorial_files, run_graph
+
+CASSETTES = sorted(CASSETTES_DIR.glob("*.jsonl"))
+
+
+@pytest.mark.skipif(not CASSETTES, reason="no cassettes recorded (see benchmarks/record_run.py)")
+@pytest.mark.parametrize("path", CASSETTES, ids=lambda p: p.stem)
+def test_full_run(benchmark, repos_dir, monkeypatch, path):
+    from agent.graph import reset_graph
+    from agent.llm_replay import get_cassette
+
+    monkeypatch.setenv("REPOLEARN_LLM_CASSETTE", str(path))
+    reset_graph()
+    cassette = get_cassette(path).load()
+    fixture, audience = cassette.header["fixture"], cassette.header["audience"]
+
+    tutorial_dir = repos_dir.parent / "tutorials" / fixture_repo_name(fixture) / audience
+
+    def setup():
+        # Every round starts like a fresh job: no tutorial files, first response
+        shutil.rmtree(tutorial_dir, ignore_errors=True)
+        cassette.rewind()
+        return (fixture, audience), {}
+
+    state = benchmark.pedantic(run_graph, setup=setup, rounds=5, warmup_rounds=1)
+
+    stats = cassette.stats()
+    benchmark.extra_info.update(stats)
+    assert stats["served"] == sum(cassette.agents().values()), "replay stopped before the recorded run ended"
+    assert state["messages"]
+    # The run's writes must have landed (a run whose writes were all rejected still "finishes")
+    expected = recorded_tutorial_files(path)
+    assert expected, "cassette records no tutorial writes"
+    missing = [name for name in expected if not (tutorial_dir / name).is_file()]
+    assert not missing, f"tutorial files not written: {missing}"
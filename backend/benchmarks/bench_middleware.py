@@ -0,0 +1,103 @@
+"""
+Benchmarks for the agent middleware: the subagent tool-call emitter and the
+context-window governor, on synthetic requests.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from agent import context_governor
+from agent.context_governor import ContextGovernorMiddleware, get_context_stats, govern_messages
+from agent.middleware import SubagentToolEventMiddleware
+from agent.tool_call_store import get_tool_call_store
+
+THREAD_ID = "bench-middleware"
+
+
+class _ThreadBoundMiddleware(SubagentToolEventMiddleware):
+    """Emitter with a fixed thread_id (benchmarks run outside a LangGraph run)."""
+
+    def _get_thread_id(self) -> str | None:
+        return THREAD_ID
+
+
+def _conversation(turns: int, tool_output_chars: int = 4000) -> list:
+    """A run-shaped history: task, then AI tool calls with their (large) results."""
+    messages = [HumanMessage(content="Please analyze this repository: https://github.com/o/r")]
+    for i in range(turns):
+        call_id = f"call_{i}"
+        messages.append(AIMessage(content="", tool_calls=[
+            {"name": "read_file", "args": {"file_path": f"/o_r/src/mod{i}.py"}, "id": call_id},
+        ]))
+        messages.append(ToolMessage(content=f"line {i}\n" * (tool_output_chars // 8), tool_call_id=call_id, name="read_file"))
+    return messages
+
+
+def test_tool_event_middleware(benchmark):
+    middleware = _ThreadBoundMiddleware("code-analyzer")
+    request = SimpleNamespace(tool_call={"name": "read_file", "args": {"file_path": "/o_r/src/app/main.py"}})
+    get_tool_call_store().clear_thread(THREAD_ID)
+
+    result = benchmark(middleware.wrap_tool_call, request, lambda req: "ok")
+    assert result == "ok"
+    get_tool_call_store().clear_thread(THREAD_ID)
+
+
+@pytest.mark.parametrize("turns", [10, 60, 200])
+def test_govern_messages(benchmark, turns):
+    messages = _conversation(turns)
+    governed, stubbed, _ = benchmark(govern_messages, messages, 24000)
+    assert len(governed) <= len(messages)
+    assert stubbed or turns <= 3
+
+
+def test_governor_wrap_model_call(benchmark):
+    middleware = ContextGovernorMiddleware("main", budget_tokens=24000)
+    request = SimpleNamespace(messages=_conversation(60))
+    request.override = lambda messages: SimpleNamespace(messages=messages)
+
+    result = benchmark(middleware.wrap_model_call, request, lambda req: req)
+    assert len(result.messages) <= len(request.messages)
+
+
+def test_governor_keeps_current_tool_call():
+    # Regression: a current tool result larger than the recent-turns budget used
+    # to be summarised away together with the AI call that requested it.
+    messages = _conversation(3, tool_output_chars=400)
+    messages.append(AIMessage(content="", tool_calls=[
+        {"name": "read_file", "args": {"file_path": "/o_r/src/big.py"}, "id": "call_big"},
+    ]))
+    messages.append(ToolMessage(content="x" * 100_000, tool_call_id="call_big", name="read_file"))
+
+    governed, stubbed, _ = govern_messages(messages, 24000)
+
+    assert isinstance(governed[-2], AIMessage) and governed[-2].tool_calls[0]["id"] == "call_big"
+    assert isinstance(governed[-1], ToolMessage) and governed[-1].tool_call_id == "call_big"
+    assert governed[-1].content.startswith("x" * 1000)
+    assert stubbed >= 1
+    # Every kept tool result still follows the AI message that issued it
+    issued = set()
+    for message in governed:
+        if isinstance(message, AIMessage):
+            issued.update(call["id"] for call in message.tool_calls)
+        elif isinstance(message, ToolMessage):
+            assert message.tool_call_id in issued
+
+
+def test_governor_keeps_stats_after_run(monkeypatch):
+    # Finishing the main agent used to delete the run's savings, so
+    # /context-stats 404'd as soon as there was something to report.
+    monkeypatch.setattr(context_governor, "current_thread_id", lambda: THREAD_ID)
+    context_governor.clear_context_stats(THREAD_ID)
+    middleware = ContextGovernorMiddleware("main", budget_tokens=24000)
+    request = SimpleNamespace(messages=_conversation(60))
+    request.override = lambda messages: SimpleNamespace(messages=messages)
+
+    middleware.wrap_model_call(request, lambda req: req)
+    middleware.after_agent({}, None)
+
+    stats = get_context_stats(THREAD_ID)
+    assert stats is not None and stats["model_calls"] == 1 and stats["tokens_saved"] > 0
+    context_governor.clear_context_stats(THREAD_ID)
@@ -0,0 +1,65 @@
+"""
+Benchmarks for ToolCallStore: the per-event write done by every subagent tool
+call, and the reads done by each dashboard poll, including under contention.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from agent.tool_call_store import ToolCallStore, create_tool_call_entry
+
+SUBAGENTS = ("code-analyzer", "doc-writer")
+
+
+def _filled_store(threads: int, entries_per_thread: int) -> ToolCallStore:
+    store = ToolCallStore()
+    for t in range(threads):
+        for i in range(entries_per_thread):
+            store.add_entry(f"thread-{t}", create_tool_call_entry(SUBAGENTS[i % 2], "read_file", f"file{i}.py"))
+    return store
+
+
+def test_add_entry(benchmark):
+    store = ToolCallStore()
+    entry = create_tool_call_entry("code-analyzer", "read_file", "main.py")
+    benchmark(store.add_entry, "thread-0", entry)
+
+
+def test_create_entry(benchmark):
+    benchmark(create_tool_call_entry, "code-analyzer", "read_file", "main.py")
+
+
+@pytest.mark.parametrize("entries", [100, 1000, 10000])
+def test_get_entries(benchmark, entries):
+    store = _filled_store(1, entries)
+    result = benchmark(store.get_entries, "thread-0")
+    assert len(result) == entries
+
+
+@pytest.mark.parametrize("entries", [100, 1000])
+def test_get_entries_by_subagent(benchmark, entries):
+    store = _filled_store(1, entries)
+    result = benchmark(store.get_entries_by_subagent, "thread-0")
+    assert sum(len(v) for v in result.values()) == entries
+
+
+@pytest.mark.parametrize("workers", [4, 16])
+def test_concurrent_writers_and_pollers(benchmark, workers):
+    """Half the workers append entries while the other half poll, like a busy server."""
+    store = _filled_store(workers, 500)
+    entry = create_tool_call_entry("code-analyzer", "read_file", "main.py")
+
+    def work(worker: int) -> None:
+        thread_id = f"thread-{worker // 2}"
+        for _ in range(200):
+            if worker % 2:
+                store.get_entries_by_subagent(thread_id)
+            else:
+                store.add_entry(thread_id, entry)
+
+    def run() -> None:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(work, range(workers)))
+
+    benchmark(run)
@@ -0,0 +1,35 @@
+"""
+Fixtures for the pytest-benchmark suite.
+
+The whole session runs in replay mode against a scratch data directory, with
+every fixture repository materialized up front.
+
+Usage (from backend/, with `uv sync --group bench`):
+    pytest                                         # run and print timings
+    pytest --benchmark-autosave                    # save a run to benchmarks/.results
+    pytest --benchmark-compare --benchmark-compare-fail=mean:25%   # CI: fail on regression
+
+Saved results are grouped per machine/interpreter, so compare runs from the
+same CI runner (commit or cache benchmarks/.results there).
+"""
+
+import os
+
+import pytest
+
+from harness import FIXTURE_REPOS, isolated_data_dir, materialize_fixture
+
+
+def pytest_configure(config):
+    # Before any agent module is imported: subagents attach CassetteMiddleware
+    # at import time, and no benchmark may reach a live model
+    os.environ["REPOLEARN_LLM_MODE"] = "replay"
+
+
+@pytest.fixture(scope="session")
+def repos_dir(tmp_path_factory):
+    """Scratch repositories/ directory (with all fixture repos) for the session."""
+    with isolated_data_dir(tmp_path_factory.mktemp("data")) as repos:
+        for name in FIXTURE_REPOS:
+            materialize_fixture(name, repos)
+        yield repos
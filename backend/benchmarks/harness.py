@@ -0,0 +1,209 @@
+"""
+Shared helpers for the benchmark suite and the cassette recorder.
+
+- Fixture repositories: small, deterministic repos written from the specs below
+  (plus a synthetic "large" one), each committed to a git repo so the ignore
+  policy can evaluate .gitignore / .gitattributes and ranking sees history.
+- Data isolation: `isolated_data_dir()` points agent.paths (and so every agent
+  module) at a scratch data directory, so benchmarks never touch data/ (or
+  each other).
+- Full runs: `run_graph()` invokes the agent graph on a fixture, the way the
+  frontend starts a tutorial job.
+"""
+
+import json
+import os
+import subprocess
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator
+
+BENCHMARKS_DIR = Path(__file__).parent
+CASSETTES_DIR = BENCHMARKS_DIR / "cassettes"
+
+# Fixture repos are "cloned" from these fake URLs (git_clone finds them on disk)
+FIXTURE_OWNER = "repolearn-fixtures"
+
+FIXTURE_REPOS: Dict[str, Dict[str, str]] = {
+    # A small Python package with the usual noise around it
+    "pyshop": {
+        ".gitignore": "*.log\n.venv/\n",
+        ".gitattributes": "shop/proto/*_pb2.py linguist-generated\n",
+        "README.md": "# pyshop\n\nA tiny shop backend.\n\n```bash\npython -m shop.cli serve\n```\n",
+        "pyproject.toml": "[project]\nname = \"pyshop\"\nversion = \"0.1.0\"\n",
+        "poetry.lock": "# lockfile\n" + "[[package]]\nname = \"dep\"\n" * 200,
+        "shop/__init__.py": "from shop.models import Cart, Item\n",
+        "shop/models.py": (
+            "from dataclasses import dataclass, field\n\n\n"
+            "@dataclass\nclass Item:\n    sku: str\n    price: float\n\n\n"
+            "@dataclass\nclass Cart:\n    items: list = field(default_factory=list)\n\n"
+            "    def add(self, item: Item) -> None:\n        self.items.append(item)\n\n"
+            "    def total(self) -> float:\n        return sum(i.price for i in self.items)\n"
+        ),
+        "shop/pricing.py": (
+            "from shop.models import Cart\n\n\n"
+            "def apply_discount(cart: Cart, percent: float) -> float:\n"
+            "    return cart.total() * (1 - percent / 100)\n"
+        ),
+        "shop/cli.py": (
+            "import argparse\n\nfrom shop.models import Cart, Item\nfrom shop.pricing import apply_discount\n\n\n"
+            "def main() -> None:\n    parser = argparse.ArgumentParser()\n    parser.add_argument(\"command\")\n"
+            "    args = parser.parse_args()\n    cart = Cart()\n    cart.add(Item(\"a\", 10.0))\n"
+            "    print(args.command, apply_discount(cart, 10))\n\n\n"
+            "if __name__ == \"__main__\":\n    main()\n"
+        ),
+        "shop/proto/order_pb2.py": "# Generated by the protocol buffer compiler.  DO NOT EDIT!\nDESCRIPTOR = None\n",
+        "tests/test_models.py": (
+            "from shop.models import Cart, Item\n\n\n"
+            "def test_total():\n    cart = Cart()\n    cart.add(Item(\"a\", 1.0))\n    assert cart.total() == 1.0\n"
+        ),
+        "debug.log": "noise\n" * 100,
+    },
+    # A small TypeScript web app with vendored, minified and built files
+    "webdash": {
+        ".gitignore": "node_modules/\ndist/\n",
+        "README.md": "# webdash\n\nA dashboard.\n\n```bash\nnpm install && npm run dev\n```\n",
+        "package.json": "{\n  \"name\": \"webdash\",\n  \"main\": \"src/index.ts\",\n  \"scripts\": {\"dev\": \"vite\"}\n}\n",
+        "package-lock.json": "{\n  \"lockfileVersion\": 3,\n  \"packages\": {}\n}\n",
+        "src/index.ts": "import { renderApp } from './app';\nimport { fetchStats } from './api/client';\n\nrenderApp(fetchStats);\n",
+        "src/app.ts": "import { Chart } from './components/Chart';\n\nexport function renderApp(load: () => Promise<number[]>) {\n  load().then((data) => new Chart(data).draw());\n}\n",
+        "src/api/client.ts": "export async function fetchStats(): Promise<number[]> {\n  const res = await fetch('/api/stats');\n  return res.json();\n}\n",
+        "src/components/Chart.ts": "export class Chart {\n  constructor(private data: number[]) {}\n  draw() {\n    console.log(this.data.join(','));\n  }\n}\n",
+        "public/vendor.min.js": "!function(){" + "var a=1;" * 800 + "}();\n",
+        "node_modules/left-pad/index.js": "module.exports = function leftPad(s, n) { return s.padStart(n); };\n",
+        "dist/bundle.js": "console.log('built');\n",
+    },
+}
+
+# Synthetic repo to see how per-file costs scale (modules import their neighbours)
+LARGE_FIXTURE_MODULES = 400
+
+
+def _large_fixture() -> Dict[str, str]:
+    files = {"README.md": "# bigpkg\n\nSynthetic package used for scaling benchmarks.\n"}
+    for i in range(LARGE_FIXTURE_MODULES):
+        package = f"bigpkg/pkg{i // 40}"
+        imports = "".join(f"from bigpkg.pkg{j // 40} import mod{j}\n" for j in (i // 2, i // 3) if j != i)
+        body = "".join(f"def func_{i}_{k}(x):\n    return x * {k} + {i}\n\n\n" for k in range(10))
+        files[f"{package}/mod{i}.py"] = imports + "\n\n" + body
+        files.setdefault(f"{package}/__init__.py", "")
+    return files
+
+
+FIXTURE_REPOS["bigpkg"] = _large_fixture()
+
+
+FIXTURE_GIT_ENV = {
+    "GIT_AUTHOR_NAME": "RepoLearn Fixtures",
+    "GIT_AUTHOR_EMAIL": "fixtures@repolearn.invalid",
+    "GIT_AUTHOR_DATE": "2024-01-01T00:00:00Z",
+    "GIT_COMMITTER_NAME": "RepoLearn Fixtures",
+    "GIT_COMMITTER_EMAIL": "fixtures@repolearn.invalid",
+    "GIT_COMMITTER_DATE": "2024-01-01T00:00:00Z",
+}
+
+
+def fixture_url(name: str) -> str:
+    return f"https://github.com/{FIXTURE_OWNER}/{name}"
+
+
+def fixture_repo_name(name: str) -> str:
+    """Directory name of a fixture under repositories/ (matches _sanitize_repo_name)."""
+    return f"{FIXTURE_OWNER}_{name}".lower()
+
+
+def materialize_fixture(name: str, repos_dir: Path) -> Path:
+    """Write a fixture repository (as a git repo) into repos_dir; returns its path."""
+    repo_dir = repos_dir / fixture_repo_name(name)
+    if repo_dir.exists():
+        return repo_dir
+    for rel_path, content in FIXTURE_REPOS[name].items():
+        path = repo_dir / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    subprocess.run(["git", "init", "-q", str(repo_dir)], check=True)
+    # Committed like a real clone (ignored files stay untracked), with a fixed identity and date
+    env = {**os.environ, **FIXTURE_GIT_ENV}
+    subprocess.run(["git", "-C", str(repo_dir), "add", "-A"], check=True, env=env)
+    subprocess.run(
+        ["git", "-C", str(repo_dir), "-c", "commit.gpgsign=false", "commit", "-q", "-m", f"Add {name} fixture"],
+        check=True,
+        env=env,
+    )
+    return repo_dir
+
+
+def recorded_tutorial_files(cassette_path: Path) -> list[str]:
+    """Tutorial files a recorded run wrote (write_file calls), relative to its tutorial folder."""
+    files: list[str] = []
+    with open(cassette_path, "r") as f:
+        for line in f:
+            entry = json.loads(line)
+            for call in entry.get("response", {}).get("data", {}).get("tool_calls", []):
+                file_path = call["args"].get("file_path", "") if call["name"] == "write_file" else ""
+                # /tutorials/{repo}/{audience}/{file}
+                parts = file_path.strip("/").split("/")
+                if len(parts) > 3 and parts[0] == "tutorials":
+                    files.append("/".join(parts[3:]))
+    return files
+
+
+@contextmanager
+def isolated_data_dir(root: Path) -> Iterator[Path]:
+    """
+    Point agent.paths (and the singletons built from it) at `root`.
+
+    Yields the repositories directory; everything is restored on exit.
+    """
+    from agent import ignore_policy, paths, repo_store, tutorial_index
+
+    saved: list[tuple[object, str, object]] = []
+    data_dir = paths.DATA_DIR
+    for attr, value in list(vars(paths).items()):
+        if isinstance(value, Path) and value.is_relative_to(data_dir):
+            saved.append((paths, attr, value))
+            setattr(paths, attr, root / value.relative_to(data_dir))
+
+    # Built after the patch, so they pick up the scratch paths
+    singletons = [
+        (repo_store, "_store_instance", repo_store.RepoStore()),
+        (tutorial_index, "_index_instance", tutorial_index.TutorialIndex()),
+    ]
+    for module, attr, value in singletons:
+        saved.append((module, attr, getattr(module, attr)))
+        setattr(module, attr, value)
+    ignore_policy._policies.clear()
+
+    (root / "repositories").mkdir(parents=True, exist_ok=True)
+    (root / "tutorials").mkdir(parents=True, exist_ok=True)
+    try:
+        yield root / "repositories"
+    finally:
+        for module, attr, value in reversed(saved):
+            setattr(module, attr, value)
+        ignore_policy._policies.clear()
+
+
+def run_message(name: str, audience: str) -> str:
+    """The user message the frontend sends to start a (basic depth) tutorial job."""
+    return (
+        f"Please analyze this repository: {fixture_url(name)}\nTarget audience: {audience}\n"
+        f"Tutorial depth: basic\n\n"
+        f"Provide a quick overview tutorial focusing on the main concepts and getting started."
+    )
+
+
+def run_graph(name: str, audience: str, thread_id: str | None = None) -> Dict:
+    """Run the agent graph to completion on a fixture; returns the final state."""
+    from agent.graph import make_graph
+
+    config = {
+        "configurable": {"thread_id": thread_id or f"bench-{uuid.uuid4()}"},
+        "recursion_limit": 500,
+    }
+    return make_graph().invoke({"messages": [{"role": "user", "content": run_message(name, audience)}]}, config)
+
+
+def cassette_path(name: str, audience: str) -> Path:
+    return CASSETTES_DIR / f"{name}-{audience}.jsonl"
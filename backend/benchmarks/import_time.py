@@ -0,0 +1,122 @@
+"""
+Import-time benchmark for the backend modules.
+
+Each module is imported in a fresh interpreter (so nothing is cached between
+samples) and the best of N wall-clock timings is reported. Results are checked
+against the committed baseline (import_time_baseline.json), so a change that
+drags the LangChain stack back into a cheap import path shows up as a
+regression. Timings are machine-dependent: on a different machine, --save a
+local baseline first (and commit it only when the expected costs change).
+
+make_graph() only constructs the model client, so the subprocesses get a
+placeholder OPENROUTER_API_KEY if none is set; nothing is sent.
+
+Usage (from backend/):
+    python benchmarks/import_time.py                 # print timings
+    python benchmarks/import_time.py --save          # write baseline
+    python benchmarks/import_time.py --check         # exit 1 on regression
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+BASELINE_PATH = Path(__file__).parent / "import_time_baseline.json"
+
+# Modules whose import cost matters on their own (server startup, CLIs, tests)
+MODULES = [
+    "agent.tool_call_store",
+    "agent.tools",
+    "agent.webapp",
+    "agent.middleware",
+    "agent.graph",
+]
+
+# Building the agent is the expensive path `make_graph()` defers to first use
+SNIPPETS = {
+    "agent.graph:make_graph()": "import agent.graph; agent.graph.make_graph()",
+}
+
+TIMER = (
+    "import time; _t = time.perf_counter(); {code}; "
+    "print(time.perf_counter() - _t)"
+)
+
+
+def time_snippet(code: str, repeat: int) -> float | None:
+    """Best-of-N seconds to run `code` in a fresh interpreter, or None if it fails."""
+    env = {**os.environ, "OPENROUTER_API_KEY": os.getenv("OPENROUTER_API_KEY") or "import-time"}
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", TIMER.format(code=code)],
+            cwd=BACKEND_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            print(f"  ! {code!r} failed: {result.stderr.strip().splitlines()[-1:]}", file=sys.stderr)
+            return None
+        elapsed = float(result.stdout.strip().splitlines()[-1])
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run(repeat: int) -> dict[str, float | None]:
+    targets = {module: f"import {module}" for module in MODULES}
+    targets.update(SNIPPETS)
+    results = {}
+    for name, code in targets.items():
+        results[name] = time_snippet(code, repeat)
+        shown = "failed" if results[name] is None else f"{results[name] * 1000:8.1f} ms"
+        print(f"{name:32s} {shown}")
+    return results
+
+
+def check(results: dict[str, float | None], max_regression: float, min_delta: float) -> bool:
+    """Compare against the saved baseline; returns False on any regression."""
+    if not BASELINE_PATH.exists():
+        print(f"No baseline at {BASELINE_PATH}; run with --save first.", file=sys.stderr)
+        return False
+    with open(BASELINE_PATH, "r") as f:
+        baseline = json.load(f)["results"]
+
+    ok = True
+    for name, elapsed in results.items():
+        before = baseline.get(name)
+        if elapsed is None or before is None:
+            continue
+        # Ignore tiny absolute changes; subprocess timing is noisy
+        if elapsed > before * (1 + max_regression) and elapsed - before > min_delta:
+            print(f"REGRESSION {name}: {before * 1000:.1f} ms -> {elapsed * 1000:.1f} ms")
+            ok = False
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="samples per module (best is kept)")
+    parser.add_argument("--save", action="store_true", help="save results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="fail if slower than the baseline")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--min-delta", type=float, default=0.05, help="ignore slowdowns under this many seconds")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+
+    if args.save:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+        print(f"Saved baseline to {BASELINE_PATH}")
+    if args.check and not check(results, args.max_regression, args.min_delta):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,404 @@
+"""
+Concurrent-load test for the LangGraph server and the custom API.
+
+Starts N detached tutorial runs (on the fixture repositories) against a local
+server whose model is the OpenAI-compatible stub (benchmarks/stub_model.py),
+while M dashboard clients poll `/tool-calls/{thread_id}` and the thread state
+the way the job page does. Reports:
+
+- throughput (completed runs per minute, requests per second)
+- p50/p95/p99/max latency per endpoint, and run durations
+- server event-loop lag, RSS growth and ToolCallStore lock contention
+  (sampled from `/runtime-stats`)
+
+Nothing touches data/: with --start-server the server gets a scratch data
+directory (REPOLEARN_DATA_DIR), deleted afterwards unless --keep-data is given.
+Against an external server, pass the data directory it was started with as
+--data-dir; the fixture repos and tutorials this tool adds there are removed.
+
+Usage (from backend/):
+    # Everything managed by the tool (stub model + `langgraph dev`)
+    python benchmarks/load_test.py --start-server --runs 20 --pollers 50
+
+    # Against a server you started yourself with
+    #   REPOLEARN_DATA_DIR=/tmp/repolearn-load OPENROUTER_BASE_URL=http://127.0.0.1:8765/v1 \
+    #   OPENROUTER_API_KEY=stub langgraph dev
+    # (remove OPENROUTER_BASE_URL from .env first if it's set there)
+    python benchmarks/load_test.py --data-dir /tmp/repolearn-load --runs 20 --pollers 50 --output load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import httpx  # noqa: E402
+
+from agent.runtime_stats import percentile  # noqa: E402
+from harness import FIXTURE_REPOS, fixture_repo_name, materialize_fixture, run_message  # noqa: E402
+from stub_model import start_stub_model  # noqa: E402
+
+BACKEND_DIR = Path(__file__).parent.parent
+TERMINAL_STATUSES = {"success", "error", "timeout", "interrupted"}
+# Small fixtures only: the point is server overhead, not repo size
+DEFAULT_FIXTURES = ["pyshop", "webdash"]
+
+
+class Recorder:
+    """Latencies and errors per endpoint label."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    async def request(self, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs: Any) -> httpx.Response | None:
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[label] = self.errors.get(label, 0) + 1
+            return None
+        self.latencies.setdefault(label, []).append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.errors[label] = self.errors.get(label, 0) + 1
+            return None
+        return response
+
+    def summary(self, wall_seconds: float) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for label in sorted(set(self.latencies) | set(self.errors)):
+            samples = self.latencies.get(label, [])
+            result[label] = {
+                "count": len(samples),
+                "errors": self.errors.get(label, 0),
+                "rps": round(len(samples) / wall_seconds, 2) if wall_seconds else 0.0,
+                **_latency_ms(samples),
+            }
+        return result
+
+
+def _latency_ms(samples: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": round(percentile(samples, 50) * 1000, 1),
+        "p95_ms": round(percentile(samples, 95) * 1000, 1),
+        "p99_ms": round(percentile(samples, 99) * 1000, 1),
+        "max_ms": round(max(samples, default=0.0) * 1000, 1),
+    }
+
+
+# ----------------------------------------------------------------------
+# Runs and pollers
+# ----------------------------------------------------------------------
+
+async def start_run(client: httpx.AsyncClient, recorder: Recorder, run: Dict[str, Any], assistant_id: str) -> None:
+    """Create a thread and a detached (background) run on it."""
+    response = await recorder.request(client, "POST /threads", "POST", "/threads",
+                                      json={"metadata": {"source": "load-test"}})
+    if response is None:
+        run["status"] = "error"
+        return
+    run["thread_id"] = response.json()["thread_id"]
+
+    response = await recorder.request(
+        client, "POST /threads/{id}/runs", "POST", f"/threads/{run['thread_id']}/runs",
+        json={
+            "assistant_id": assistant_id,
+            "input": {"messages": [{"type": "human", "content": run_message(run["fixture"], run["audience"])}]},
+            "config": {"recursion_limit": 200},
+        },
+    )
+    if response is None:
+        run["status"] = "error"
+        return
+    run["run_id"] = response.json()["run_id"]
+    run["started"] = time.perf_counter()
+    run["status"] = "pending"
+
+
+async def watch_run(client: httpx.AsyncClient, recorder: Recorder, run: Dict[str, Any], interval: float, deadline: float) -> None:
+    """Poll a run's status until it finishes (or the deadline passes)."""
+    while run["status"] not in TERMINAL_STATUSES:
+        if time.perf_counter() > deadline:
+            run["status"] = "timeout"
+            break
+        await asyncio.sleep(interval)
+        response = await recorder.request(client, "GET /threads/{id}/runs/{run_id}", "GET",
+                                          f"/threads/{run['thread_id']}/runs/{run['run_id']}")
+        if response is not None:
+            run["status"] = response.json().get("status", run["status"])
+    run["finished"] = time.perf_counter()
+
+
+async def poll_dashboard(client: httpx.AsyncClient, recorder: Recorder, runs: List[Dict[str, Any]], worker: int,
+                         interval: float, stop: asyncio.Event) -> None:
+    """One dashboard client: rotates over the active runs, like an open job page."""
+    turn = worker
+    while not stop.is_set():
+        active = [r["thread_id"] for r in runs if r.get("thread_id") and r["status"] not in TERMINAL_STATUSES]
+        if active:
+            thread_id = active[turn % len(active)]
+            turn += 1
+            await recorder.request(client, "GET /tool-calls/{id}", "GET", f"/tool-calls/{thread_id}")
+            await recorder.request(client, "GET /threads/{id}/state", "GET", f"/threads/{thread_id}/state")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def sample_server(client: httpx.AsyncClient, samples: List[Dict[str, Any]], interval: float, stop: asyncio.Event) -> None:
+    """Collect /runtime-stats snapshots (RSS, lag, lock contention) during the test."""
+    while not stop.is_set():
+        try:
+            response = await client.get("/runtime-stats")
+            if response.status_code == 200:
+                samples.append({"t": time.perf_counter(), **response.json()})
+        except httpx.HTTPError:
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_load(args: argparse.Namespace) -> Dict[str, Any]:
+    recorder = Recorder()
+    runs = [
+        {"fixture": args.fixtures[i % len(args.fixtures)],
+         "audience": ("user", "dev")[(i // len(args.fixtures)) % 2],
+         "thread_id": None, "run_id": None, "status": "new"}
+        for i in range(args.runs)
+    ]
+    server_samples: List[Dict[str, Any]] = []
+    stop = asyncio.Event()
+    limits = httpx.Limits(max_connections=args.pollers + args.runs + 10)
+
+    async with httpx.AsyncClient(base_url=args.server, timeout=args.request_timeout, limits=limits) as client:
+        await client.post("/runtime-stats/reset")
+        sampler = asyncio.create_task(sample_server(client, server_samples, args.sample_interval, stop))
+        # Let the sampler record the idle baseline first
+        await asyncio.sleep(args.sample_interval)
+
+        start = time.perf_counter()
+        deadline = start + args.timeout
+        pollers = [
+            asyncio.create_task(poll_dashboard(client, recorder, runs, i, args.poll_interval, stop))
+            for i in range(args.pollers)
+        ]
+
+        async def launch(i: int) -> None:
+            if args.ramp:
+                await asyncio.sleep(args.ramp * i / max(1, args.runs))
+            await start_run(client, recorder, runs[i], args.assistant)
+            if runs[i]["status"] == "pending":
+                await watch_run(client, recorder, runs[i], args.status_interval, deadline)
+
+        await asyncio.gather(*(launch(i) for i in range(args.runs)))
+        wall = time.perf_counter() - start
+
+        stop.set()
+        await asyncio.gather(*pollers, sampler)
+        final = await client.get("/runtime-stats")
+        server_samples.append({"t": time.perf_counter(), **final.json()})
+
+    return _report(args, runs, recorder, server_samples, wall)
+
+
+def _report(args: argparse.Namespace, runs: List[Dict[str, Any]], recorder: Recorder,
+            server_samples: List[Dict[str, Any]], wall: float) -> Dict[str, Any]:
+    completed = [r for r in runs if r["status"] == "success"]
+    durations = [r["finished"] - r["started"] for r in completed]
+    statuses: Dict[str, int] = {}
+    for run in runs:
+        statuses[run["status"]] = statuses.get(run["status"], 0) + 1
+
+    rss = [s["rss_bytes"] for s in server_samples if s["rss_bytes"] is not None]
+    last = server_samples[-1] if server_samples else {}
+    lock = last.get("tool_call_store", {})
+    return {
+        "config": {
+            "runs": args.runs, "pollers": args.pollers, "poll_interval": args.poll_interval,
+            "model_latency": args.model_latency, "fixtures": args.fixtures,
+        },
+        "runs": {
+            "statuses": statuses,
+            "wall_seconds": round(wall, 2),
+            "throughput_runs_per_min": round(len(completed) / wall * 60, 2) if wall else 0.0,
+            "duration": {k.replace("_ms", "_s"): round(v / 1000, 2) for k, v in _latency_ms(durations).items()},
+        },
+        "requests": recorder.summary(wall),
+        "server": {
+            "rss_start_mb": round(rss[0] / 2**20, 1) if rss else None,
+            "rss_end_mb": round(rss[-1] / 2**20, 1) if rss else None,
+            "rss_peak_mb": round(max(rss) / 2**20, 1) if rss else None,
+            "rss_growth_mb": round((rss[-1] - rss[0]) / 2**20, 1) if rss else None,
+            "event_loop_lag": last.get("event_loop_lag"),
+            "tool_call_store_lock": {
+                **lock,
+                "contended_pct": round(100 * lock["contended"] / lock["acquisitions"], 2) if lock.get("acquisitions") else 0.0,
+            },
+        },
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    runs = report["runs"]
+    print(f"\nRuns: {runs['statuses']} in {runs['wall_seconds']}s "
+          f"-> {runs['throughput_runs_per_min']} runs/min")
+    d = runs["duration"]
+    print(f"Run duration: p50 {d['p50_s']}s  p95 {d['p95_s']}s  p99 {d['p99_s']}s  max {d['max_s']}s")
+
+    print(f"\n{'endpoint':34s} {'count':>7s} {'err':>5s} {'rps':>7s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'max':>8s}")
+    for label, s in report["requests"].items():
+        print(f"{label:34s} {s['count']:7d} {s['errors']:5d} {s['rps']:7.1f} "
+              f"{s['p50_ms']:6.1f}ms {s['p95_ms']:6.1f}ms {s['p99_ms']:6.1f}ms {s['max_ms']:6.1f}ms")
+
+    server = report["server"]
+    print(f"\nServer RSS: {server['rss_start_mb']} -> {server['rss_end_mb']} MB "
+          f"(peak {server['rss_peak_mb']}, growth {server['rss_growth_mb']})")
+    lag = server["event_loop_lag"] or {}
+    if lag:
+        print(f"Event-loop lag: p50 {lag['p50_ms']}ms  p95 {lag['p95_ms']}ms  p99 {lag['p99_ms']}ms  "
+              f"max {lag['max_ms']}ms ({lag['samples']} samples)")
+    lock = server["tool_call_store_lock"]
+    if lock.get("acquisitions"):
+        print(f"ToolCallStore lock: {lock['acquisitions']} acquisitions, {lock['contended']} contended "
+              f"({lock['contended_pct']}%), waited {lock['wait_seconds'] * 1000:.1f}ms total, "
+              f"max {lock['max_wait_seconds'] * 1000:.2f}ms")
+
+
+# ----------------------------------------------------------------------
+# Environment setup
+# ----------------------------------------------------------------------
+
+def prepare_fixtures(data_dir: Path, fixtures: List[str]) -> List[str]:
+    """Write the fixture repos into the server's data dir; returns the ones created."""
+    created = []
+    for name in fixtures:
+        if not (data_dir / "repositories" / fixture_repo_name(name)).exists():
+            materialize_fixture(name, data_dir / "repositories")
+            created.append(name)
+    return created
+
+
+def cleanup_fixtures(data_dir: Path, fixtures: List[str], created: List[str]) -> None:
+    """Remove the tutorials the runs wrote (and the fixture repos this tool created)."""
+    from agent.tutorial_index import TutorialIndex
+
+    index = TutorialIndex(db_path=data_dir / "index" / "tutorials.db", tutorials_dir=data_dir / "tutorials")
+    for name in fixtures:
+        repo_name = fixture_repo_name(name)
+        shutil.rmtree(data_dir / "tutorials" / repo_name, ignore_errors=True)
+        index.remove_tutorial(repo_name)
+        if name in created:
+            shutil.rmtree(data_dir / "repositories" / repo_name, ignore_errors=True)
+            for cache in ("rankings", "ignore"):
+                (data_dir / "index" / cache / f"{repo_name}.json").unlink(missing_ok=True)
+
+
+def start_server(args: argparse.Namespace, stub_url: str, data_dir: Path) -> subprocess.Popen:
+    """Start `langgraph dev` with the stub as its model and its own data dir, and wait until it's up."""
+    port = httpx.URL(args.server).port or 2024
+    command = ["langgraph", "dev", "--port", str(port), "--no-browser"]
+    if args.jobs_per_worker:
+        command += ["--n-jobs-per-worker", str(args.jobs_per_worker)]
+    env = {**os.environ, "OPENROUTER_BASE_URL": stub_url, "OPENROUTER_API_KEY": "stub", "REPOLEARN_LLM_MODE": "",
+           "REPOLEARN_DATA_DIR": str(data_dir)}
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, start_new_session=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"langgraph dev exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{args.server}/ok", timeout=2).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(1)
+    stop_server(process)
+    raise RuntimeError("langgraph dev did not become ready within 120s")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=30)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", default="http://127.0.0.1:2024", help="LangGraph server URL")
+    parser.add_argument("--assistant", default="agent", help="Graph id from langgraph.json")
+    parser.add_argument("--runs", type=int, default=10, help="Concurrent detached runs (N)")
+    parser.add_argument("--pollers", type=int, default=20, help="Polling dashboard clients (M)")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between a client's polls")
+    parser.add_argument("--status-interval", type=float, default=1.0, help="Seconds between run-status checks")
+    parser.add_argument("--ramp", type=float, default=0.0, help="Spread run starts over this many seconds")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Give up on runs after this many seconds")
+    parser.add_argument("--request-timeout", type=float, default=30.0)
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="Seconds between /runtime-stats samples")
+    parser.add_argument("--fixtures", nargs="+", choices=sorted(FIXTURE_REPOS), default=DEFAULT_FIXTURES)
+    parser.add_argument("--stub-port", type=int, default=8765)
+    parser.add_argument("--model-latency", type=float, default=0.5, help="Stub seconds per model call")
+    parser.add_argument("--model-jitter", type=float, default=0.2, help="Stub extra random seconds per call")
+    parser.add_argument("--no-stub", action="store_true", help="Don't start the stub (already running elsewhere)")
+    parser.add_argument("--start-server", action="store_true", help="Start `langgraph dev` with the stub model")
+    parser.add_argument("--jobs-per-worker", type=int, default=0, help="With --start-server: run concurrency")
+    parser.add_argument("--data-dir", type=Path,
+                        help="The server's REPOLEARN_DATA_DIR (default with --start-server: a scratch dir)")
+    parser.add_argument("--keep-data", action="store_true", help="Keep fixture repos and generated tutorials")
+    parser.add_argument("--output", type=Path, help="Also write the report as JSON")
+    args = parser.parse_args()
+    if not args.start_server and not args.data_dir:
+        parser.error("--data-dir is required with an external server (start it with the same REPOLEARN_DATA_DIR)")
+
+    scratch = args.data_dir is None
+    data_dir = Path(tempfile.mkdtemp(prefix="repolearn-load-")) if scratch else args.data_dir.resolve()
+    stub = None if args.no_stub else start_stub_model(args.stub_port, args.model_latency, args.model_jitter)
+    created = prepare_fixtures(data_dir, args.fixtures)
+    server = None
+    try:
+        if args.start_server:
+            stub_url = stub.base_url if stub else f"http://127.0.0.1:{args.stub_port}/v1"
+            server = start_server(args, stub_url, data_dir)
+        report = asyncio.run(run_load(args))
+        if stub:
+            report["stub_model_requests"] = stub.requests
+    finally:
+        if server:
+            stop_server(server)
+        if stub:
+            stub.shutdown()
+        if args.keep_data:
+            print(f"Data kept in {data_dir}")
+        elif scratch:
+            shutil.rmtree(data_dir, ignore_errors=True)
+        else:
+            cleanup_fixtures(data_dir, args.fixtures, created)
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+    failed = report["runs"]["statuses"].get("error", 0) + report["runs"]["statuses"].get("timeout", 0)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Record a cassette for the full-run benchmark.
+
+Runs the real graph (live model, so OPENROUTER_API_KEY is required) on a
+fixture repository in a scratch data directory, capturing every model call to
+benchmarks/cassettes/{fixture}-{audience}.jsonl. Commit the cassette; the
+benchmark suite then replays it with no network access.
+
+With --stub, the scripted model in benchmarks/stub_model.py stands in for the
+live one (no API key needed). The committed pyshop-dev cassette is recorded
+this way, so the full-run benchmark always has something to replay.
+
+Re-record after changing prompts, tools or middleware that alter what the
+agents see (replay reports such runs as diverged).
+
+Usage (from backend/):
+    python benchmarks/record_run.py pyshop --audience dev
+    python benchmarks/record_run.py pyshop --audience dev --stub
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from harness import FIXTURE_REPOS, cassette_path, isolated_data_dir, materialize_fixture, run_graph  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixture", choices=sorted(FIXTURE_REPOS))
+    parser.add_argument("--audience", choices=["user", "dev"], default="dev")
+    parser.add_argument("--stub", action="store_true", help="Record against the scripted stub model")
+    args = parser.parse_args()
+
+    path = cassette_path(args.fixture, args.audience)
+    os.environ["REPOLEARN_LLM_MODE"] = "record"
+    os.environ["REPOLEARN_LLM_CASSETTE"] = str(path)
+
+    stub = None
+    if args.stub:
+        from stub_model import start_stub_model
+        stub = start_stub_model(port=0)
+        os.environ["OPENROUTER_BASE_URL"] = stub.base_url
+        os.environ["OPENROUTER_API_KEY"] = "stub"
+
+    from agent.graph import get_model
+    from agent.llm_replay import get_cassette
+
+    get_cassette(path).start_recording({
+        "fixture": args.fixture,
+        "audience": args.audience,
+        "model": "stub" if stub else getattr(get_model(), "model_name", None),
+    })
+
+    with tempfile.TemporaryDirectory(prefix="repolearn-record-") as tmp:
+        with isolated_data_dir(Path(tmp)) as repos_dir:
+            materialize_fixture(args.fixture, repos_dir)
+            state = run_graph(args.fixture, args.audience)
+    if stub:
+        stub.shutdown()
+
+    calls = get_cassette(path).agents()
+    print(f"Recorded {sum(calls.values())} model calls to {path}: {calls}")
+    print(f"Final message: {str(state['messages'][-1].content)[:200]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
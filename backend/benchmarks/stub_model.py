@@ -0,0 +1,264 @@
+"""
+OpenAI-compatible stub model for load tests.
+
+Serves POST /v1/chat/completions (plain and streaming) with a scripted tutorial
+run instead of a real LLM: the main agent plans, clones, delegates to both
+subagents, writes its overview and completes the tutorial; code-analyzer ranks,
+lists and reads files; doc-writer writes its section. Which agent is asking is
+read from its system prompt, and the step from the number of assistant turns so
+far, so the stub is stateless and any number of runs can share it.
+
+A fixed latency (plus jitter) per request stands in for the model's think time.
+
+Usage (from backend/):
+    python benchmarks/stub_model.py --port 8765 --latency 0.5
+    OPENROUTER_BASE_URL=http://127.0.0.1:8765/v1 OPENROUTER_API_KEY=stub langgraph dev
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+
+URL_PATTERN = re.compile(r"https://github\.com/[\w.-]+/[\w.-]+")
+AUDIENCE_PATTERN = re.compile(r"Target audience:\s*(user|dev)")
+TUTORIAL_FILE_PATTERN = re.compile(r"/tutorials/[\w./-]+\.md")
+
+
+def _text(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return "\n".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content)
+
+
+def _repo_name(url: str) -> str:
+    owner, repo = url.rstrip("/").split("/")[-2:]
+    return f"{owner}_{repo.removesuffix('.git')}".lower()
+
+
+def _call(name: str, **args: Any) -> Dict[str, Any]:
+    return {"name": name, "args": args}
+
+
+def _main_step(step: int, task: str) -> Tuple[str, List[Dict[str, Any]]]:
+    url_match = URL_PATTERN.search(task)
+    if not url_match:
+        return "I need a GitHub URL to analyze.", []
+    url = url_match.group(0)
+    audience_match = AUDIENCE_PATTERN.search(task)
+    audience = audience_match.group(1) if audience_match else "user"
+    tutorial_path = f"/tutorials/{_repo_name(url)}/{audience}"
+
+    script = [
+        _call("write_todos", todos=[
+            {"content": "Clone repo and get tutorial path", "status": "in_progress"},
+            {"content": "DELEGATE: Quick code overview (code-analyzer)", "status": "pending"},
+            {"content": "DELEGATE: Write brief docs (doc-writer)", "status": "pending"},
+            {"content": "Create overview document", "status": "pending"},
+        ]),
+        _call("git_clone", github_url=url),
+        _call("get_tutorial_path", github_url=url, audience=audience),
+        _call("task", subagent_type="code-analyzer",
+              description=f"Repo: {url}. Give a 2-3 sentence overview of the main files and architecture"),
+        _call("task", subagent_type="doc-writer",
+              description=f"Write a short getting started guide (max 10 lines) to {tutorial_path}/1_getting_started.md"),
+        _call("write_file", file_path=f"{tutorial_path}/0_overview.md",
+              content="# Overview\n\nA small project. See the getting started guide.\n"),
+        _call("complete_tutorial", github_url=url, audience=audience, summary="Load-test tutorial."),
+    ]
+    if step < len(script):
+        return "", [script[step]]
+    return "Tutorial complete.", []
+
+
+def _analyzer_step(step: int, task: str) -> Tuple[str, List[Dict[str, Any]]]:
+    url_match = URL_PATTERN.search(task)
+    if not url_match:
+        return "No repository given.", []
+    url = url_match.group(0)
+    repo_path = f"/{_repo_name(url)}"
+    script = [
+        _call("get_important_files", github_url=url),
+        _call("ls", path=repo_path),
+        _call("read_file", file_path=f"{repo_path}/README.md"),
+    ]
+    if step < len(script):
+        return "", [script[step]]
+    return "**Purpose**: A small project.\n**Key Components**: README, sources.\n**Architecture**: Flat.", []
+
+
+def _writer_step(step: int, task: str) -> Tuple[str, List[Dict[str, Any]]]:
+    path_match = TUTORIAL_FILE_PATTERN.search(task)
+    if step == 0 and path_match:
+        return "", [_call("write_file", file_path=path_match.group(0),
+                          content="# Getting Started\n\n1. Install.\n2. Run.\n")]
+    target = path_match.group(0) if path_match else "(no path given)"
+    return f"Wrote {target} (4 lines): install and run steps.", []
+
+
+def script_response(messages: List[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]]]:
+    """Next (content, tool calls) for a chat request."""
+    system = "\n".join(_text(m) for m in messages if m.get("role") in ("system", "developer"))
+    task = next((_text(m) for m in messages if m.get("role") == "user"), "")
+    step = sum(1 for m in messages if m.get("role") == "assistant")
+
+    if "Code Analyzer" in system:
+        return _analyzer_step(step, task)
+    if "Doc Writer" in system:
+        return _writer_step(step, task)
+    return _main_step(step, task)
+
+
+def _openai_tool_calls(calls: List[Dict[str, Any]], streaming: bool = False) -> List[Dict[str, Any]]:
+    result = []
+    for i, call in enumerate(calls):
+        item = {
+            "id": f"call_{uuid.uuid4().hex[:24]}",
+            "type": "function",
+            "function": {"name": call["name"], "arguments": json.dumps(call["args"])},
+        }
+        if streaming:
+            item["index"] = i
+        result.append(item)
+    return result
+
+
+class StubModelHandler(BaseHTTPRequestHandler):
+    """Handles /v1/chat/completions and /v1/models."""
+
+    server: "StubModelServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Keep load-test output readable
+        pass
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json({"object": "list", "data": [{"id": "stub", "object": "model"}]})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self) -> None:
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json({"error": "not found"}, status=404)
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json({"error": "invalid JSON"}, status=400)
+            return
+
+        self.server.count_request()
+        content, calls = script_response(body.get("messages", []))
+        latency = self.server.latency + random.uniform(0, self.server.jitter)
+        if latency > 0:
+            time.sleep(latency)
+
+        completion_id = f"chatcmpl-stub-{uuid.uuid4().hex[:12]}"
+        model = body.get("model", "stub")
+        finish_reason = "tool_calls" if calls else "stop"
+        prompt_tokens = sum(len(_text(m)) for m in body.get("messages", [])) // 4
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": 20, "total_tokens": prompt_tokens + 20}
+
+        if body.get("stream"):
+            delta: Dict[str, Any] = {"role": "assistant", "content": content}
+            if calls:
+                delta["tool_calls"] = _openai_tool_calls(calls, streaming=True)
+            chunks = [
+                {"choices": [{"index": 0, "delta": delta, "finish_reason": None}]},
+                {"choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}]},
+            ]
+            if (body.get("stream_options") or {}).get("include_usage"):
+                chunks.append({"choices": [], "usage": usage})
+            self._send_stream([
+                {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                 "model": model, **chunk}
+                for chunk in chunks
+            ])
+            return
+
+        message: Dict[str, Any] = {"role": "assistant", "content": content or None}
+        if calls:
+            message["tool_calls"] = _openai_tool_calls(calls)
+        self._send_json({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": usage,
+        })
+
+    def _send_json(self, data: Dict[str, Any], status: int = 200) -> None:
+        payload = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_stream(self, chunks: List[Dict[str, Any]]) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        for chunk in chunks:
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+
+class StubModelServer(ThreadingHTTPServer):
+    """Threaded HTTP server with the stub's settings and a request counter."""
+
+    daemon_threads = True
+
+    def __init__(self, port: int, latency: float = 0.0, jitter: float = 0.0, host: str = "127.0.0.1"):
+        super().__init__((host, port), StubModelHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self._count_lock = threading.Lock()
+
+    def count_request(self) -> None:
+        with self._count_lock:
+            self.requests += 1
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def start_stub_model(port: int, latency: float = 0.0, jitter: float = 0.0) -> StubModelServer:
+    """Start the stub in a background thread; call .shutdown() to stop it."""
+    server = StubModelServer(port, latency, jitter)
+    threading.Thread(target=server.serve_forever, name="stub-model", daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per model call")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random seconds per call (0..jitter)")
+    args = parser.parse_args()
+
+    server = StubModelServer(args.port, args.latency, args.jitter)
+    print(f"Stub model listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
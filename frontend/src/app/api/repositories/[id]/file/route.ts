@@ -24,6 +24,16 @@ export async function GET(
         return NextResponse.json({ error: "Invalid file path" }, { status: 403 });
     }
 
+    // Re-clone the repo first if the quota manager evicted it
+    const apiUrl = process.env.NEXT_PUBLIC_LANGGRAPH_URL || "http://localhost:2024";
+    try {
+        const res = await fetch(`${apiUrl}/repositories/${encodeURIComponent(id)}/restore`, { method: "POST" });
+        if (res.status === 400 || res.status === 502) {
+            const { detail } = await res.json();
+            return NextResponse.json({ error: detail }, { status: res.status });
+        }
+    } catch { /* backend unavailable - serve whatever is on disk */ }
+
     try {
         // Check if file exists and is a file
         const stats = await stat(fullPath);
@@ -37,6 +37,21 @@ export async function GET(
 ) {
     const { id } = await params;
 
+    // Prefer the backend's ignore policy (.gitignore, linguist attributes, generated/binary heuristics).
+    // The backend also re-clones repos the quota manager evicted, so ask it before checking the disk.
+    const apiUrl = process.env.NEXT_PUBLIC_LANGGRAPH_URL || "http://localhost:2024";
+    try {
+        const res = await fetch(`${apiUrl}/repositories/${encodeURIComponent(id)}/files`);
+        if (res.ok) {
+            const { files } = await res.json();
+            return NextResponse.json({ files });
+        }
+        if (res.status === 400 || res.status === 502) {
+            const { detail } = await res.json();
+            return NextResponse.json({ error: detail }, { status: res.status });
+        }
+    } catch { /* backend unavailable - fall back to the local walk */ }
+
     // Safety check: ensure repo exists
     const repoPath = path.join(REPOS_DIR, id);
     try {
@@ -1,6 +1,7 @@
 import { NextRequest, NextResponse } from "next/server";
-import { readdir, rm, stat, readFile, writeFile, mkdir } from "fs/promises";
+import { readdir, rm, stat, readFile, mkdir } from "fs/promises";
 import path from "path";
+import { writeJsonAtomic } from "@/lib/metadata";
 
 const DATA_DIR = path.join(process.cwd(), "..", "data");
 const TUTORIALS_DIR = path.join(DATA_DIR, "tutorials");
@@ -98,11 +99,11 @@ async function getGitHubStars(repoId: string, metadataPath: string): Promise<num
                 existingMeta = JSON.parse(existing);
             } catch { /* no existing */ }
 
-            await writeFile(metadataPath, JSON.stringify({
+            await writeJsonAtomic(metadataPath, {
                 ...existingMeta,
                 stars,
                 starsUpdatedAt: new Date().toISOString(),
-            }, null, 2));
+            });
         } catch { /* ignore cache write errors */ }
 
         return stars;
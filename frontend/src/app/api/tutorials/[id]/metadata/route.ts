@@ -1,6 +1,7 @@
 import { NextRequest, NextResponse } from "next/server";
-import { readFile, writeFile, mkdir } from "fs/promises";
+import { readFile, mkdir } from "fs/promises";
 import path from "path";
+import { hasLegacyHistory, migrateLegacyHistory, writeJsonAtomic } from "@/lib/metadata";
 
 const DATA_DIR = path.join(process.cwd(), "..", "data");
 const TUTORIALS_DIR = path.join(DATA_DIR, "tutorials");
@@ -29,8 +30,12 @@ export async function GET(
         // 2. Read audience-specific metadata (contains threadId)
         if (audienceMetadataPath) {
             try {
-                const audienceContent = await readFile(audienceMetadataPath, "utf-8");
-                metadata = { ...metadata, ...JSON.parse(audienceContent) };
+                let audienceMetadata = JSON.parse(await readFile(audienceMetadataPath, "utf-8"));
+                // Older tutorials inline their run history; move it to the backend's history files
+                if (hasLegacyHistory(audienceMetadata) && await migrateLegacyHistory(id, audience!)) {
+                    audienceMetadata = JSON.parse(await readFile(audienceMetadataPath, "utf-8"));
+                }
+                metadata = { ...metadata, ...audienceMetadata };
             } catch { /* ignore */ }
         }
 
@@ -90,7 +95,12 @@ export async function POST(
             updatedAt: new Date().toISOString(),
         };
 
-        await writeFile(metadataPath, JSON.stringify(newMetadata, null, 2));
+        await writeJsonAtomic(metadataPath, newMetadata);
+
+        // Older tutorials inline their run history; move it to the backend's history files
+        if (audience && isAudienceSpecific && hasLegacyHistory(newMetadata)) {
+            await migrateLegacyHistory(id, audience);
+        }
 
         return NextResponse.json({ success: true, metadata: newMetadata });
     } catch (error) {
@@ -133,9 +133,17 @@ function JobPageContent() {
                 body: JSON.stringify({
                     threadId: tid,
                     audience: aud,
-                    snapshot: snapshot
                 }),
             });
+            // Snapshot goes to the backend's compressed run history, keeping metadata.json tiny
+            if (snapshot) {
+                const apiUrl = process.env.NEXT_PUBLIC_LANGGRAPH_URL || "http://localhost:2024";
+                await fetch(`${apiUrl}/tutorials/${encodeURIComponent(repoId)}/${aud}/history`, {
+                    method: "POST",
+                    headers: { "Content-Type": "application/json" },
+                    body: JSON.stringify(snapshot),
+                });
+            }
             console.log("[JobPage] Saved thread metadata & snapshot for:", repoId);
         } catch (err) {
             console.error("Failed to save thread metadata:", err);
@@ -610,12 +618,22 @@ function JobPageContent() {
 
                 {/* Center Panel: The Brain (6 cols) */}
                 <div className="col-span-6 min-h-0 border-r border-zinc-900">
-                    <BrainPanel messages={messages} isLoading={isLoading && !isReadonly} />
+                    <BrainPanel
+                        messages={messages}
+                        isLoading={isLoading && !isReadonly}
+                        hasMore={isReadonly && historyStream.hasMoreMessages}
+                        onLoadMore={historyStream.loadMoreMessages}
+                    />
                 </div>
 
                 {/* Right Panel: Sub-agents Grid (3 cols) */}
                 <div className="col-span-3 min-h-0">
-                    <GridPanel subagents={subagents} isLoading={isLoading && !isReadonly} />
+                    <GridPanel
+                        subagents={subagents}
+                        isLoading={isLoading && !isReadonly}
+                        hasMoreToolCalls={isReadonly && historyStream.hasMoreToolCalls}
+                        onLoadMoreToolCalls={historyStream.loadMoreToolCalls}
+                    />
                 </div>
             </div>
 
@@ -6,9 +6,11 @@ import { AgentMessage } from "@/hooks/useAgentStream";
 interface BrainPanelProps {
     messages: AgentMessage[];
     isLoading: boolean;
+    hasMore?: boolean; // More history pages can be loaded (historical view)
+    onLoadMore?: () => void;
 }
 
-export function BrainPanel({ messages, isLoading }: BrainPanelProps) {
+export function BrainPanel({ messages, isLoading, hasMore, onLoadMore }: BrainPanelProps) {
     const endRef = useRef<HTMLDivElement>(null);
     const [expandedItems, setExpandedItems] = useState<Set<string>>(new Set());
 
@@ -140,6 +142,16 @@ export function BrainPanel({ messages, isLoading }: BrainPanelProps) {
                         </div>
                     )}
 
+                    {hasMore && onLoadMore && (
+                        <button
+                            type="button"
+                            onClick={onLoadMore}
+                            className="w-full py-2 text-xs font-mono text-zinc-500 hover:text-zinc-300 transition-colors"
+                        >
+                            Load more history
+                        </button>
+                    )}
+
                     <div ref={endRef} />
                 </div>
             </div>
@@ -6,9 +6,11 @@ import { SubagentStatus, SubagentToolCall } from "@/hooks/useAgentStream";
 interface GridPanelProps {
     subagents: SubagentStatus[];
     isLoading: boolean;
+    hasMoreToolCalls?: boolean; // More logged tool calls can be loaded (historical view)
+    onLoadMoreToolCalls?: () => void;
 }
 
-export function GridPanel({ subagents, isLoading }: GridPanelProps) {
+export function GridPanel({ subagents, isLoading, hasMoreToolCalls, onLoadMoreToolCalls }: GridPanelProps) {
     const [expandedAgents, setExpandedAgents] = useState<Set<string>>(new Set());
 
     const toggleAccordion = (agentName: string) => {
@@ -160,6 +162,7 @@ export function GridPanel({ subagents, isLoading }: GridPanelProps) {
                                                 toolCalls={agent.toolCalls || []}
                                                 activityLogs={agent.activityLogs}
                                                 isDone={isDone}
+                                                onLoadMore={hasMoreToolCalls ? onLoadMoreToolCalls : undefined}
                                             />
 
 
@@ -180,9 +183,10 @@ interface ToolCallsLogAreaProps {
     toolCalls: SubagentToolCall[];
     activityLogs: string[];
     isDone: boolean;
+    onLoadMore?: () => void;
 }
 
-function ToolCallsLogArea({ toolCalls, activityLogs, isDone }: ToolCallsLogAreaProps) {
+function ToolCallsLogArea({ toolCalls, activityLogs, isDone, onLoadMore }: ToolCallsLogAreaProps) {
     const scrollContainerRef = useRef<HTMLDivElement>(null);
     const prevToolCallsLengthRef = useRef(toolCalls.length);
 
@@ -242,6 +246,16 @@ function ToolCallsLogArea({ toolCalls, activityLogs, isDone }: ToolCallsLogAreaP
                 </div>
             </div>
 
+            {onLoadMore && (
+                <button
+                    type="button"
+                    onClick={onLoadMore}
+                    className="mt-1 w-full text-center text-[9px] font-mono text-zinc-600 hover:text-zinc-400 transition-colors"
+                >
+                    load more calls
+                </button>
+            )}
+
             {/* Scroll hint indicator */}
             {hasToolCalls && toolCalls.length > 3 && (
                 <div className={`mt-1 text-center ${isDone ? "text-zinc-700" : "text-zinc-600"}`}>
@@ -102,6 +102,17 @@ export function usePersistentAgent(options: UsePersistentAgentOptions = {}) {
         status: string;
     }
 
+    // Response of the backend's GET /threads/{id}/delta
+    interface ThreadDelta {
+        cursor: string;
+        reset: boolean;
+        messages: Array<Record<string, unknown>>;
+        todos: unknown[] | null;
+        tool_calls: ToolCallEntry[];
+        status: string;
+        finished: boolean;
+    }
+
     // --- Helpers to parse state ---
     const parseState = useCallback((
         values: Record<string, unknown>,
@@ -330,53 +341,44 @@ export function usePersistentAgent(options: UsePersistentAgentOptions = {}) {
         console.log("[usePersistentAgent] Monitoring thread:", activeJob.threadId);
         setState(prev => ({ ...prev, status: "running", isLoading: true }));
 
+        // Incremental polling: the delta endpoint returns only what changed since
+        // the cursor, so we keep the raw message list and append to it.
+        let cursor: string | null = null;
+        let rawMessages: Array<Record<string, unknown>> = [];
+        let rawTodos: unknown[] = [];
+
         const poll = async () => {
             try {
-                const client = new Client({ apiUrl });
-                let threadState;
-                try {
-                    // NEW: Request subgraphs to get subagent tool calls
-                    threadState = await client.threads.getState(activeJob.threadId, undefined, {
-                        subgraphs: true
-                    });
-                } catch (err: any) {
-                    if (err.message?.includes("404") || err.status === 404) {
-                        console.warn("[usePersistentAgent] Thread not found (404). This usually happens if the dev server was restarted.");
-                        setState(prev => ({
-                            ...prev,
-                            status: "error",
-                            error: new Error("Session history lost (404). Local development server resets state if restarted.")
-                        }));
-                        if (pollingIntervalRef.current) clearInterval(pollingIntervalRef.current);
-                        return;
-                    }
-                    throw err;
+                const params = new URLSearchParams({ repo_id: activeJob.repoId, audience: activeJob.audience });
+                if (cursor) params.set("cursor", cursor);
+                const res = await fetch(`${apiUrl}/threads/${activeJob.threadId}/delta?${params}`);
+                if (res.status === 404) {
+                    console.warn("[usePersistentAgent] Thread not found (404). This usually happens if the dev server was restarted.");
+                    setState(prev => ({
+                        ...prev,
+                        status: "error",
+                        error: new Error("Session history lost (404). Local development server resets state if restarted.")
+                    }));
+                    if (pollingIntervalRef.current) clearInterval(pollingIntervalRef.current);
+                    return;
                 }
+                if (!res.ok) throw new Error(`Delta request failed: ${res.status}`);
+                const delta: ThreadDelta = await res.json();
+                cursor = delta.cursor;
 
-                if (!threadState) return;
-
-                const values = (threadState.values as Record<string, unknown>) || {};
-                const rawMessages = (values.messages || []) as Array<Record<string, unknown>>;
+                rawMessages = delta.reset ? delta.messages : [...rawMessages, ...delta.messages];
+                if (delta.todos !== null) rawTodos = delta.todos;
 
-                // NEW: Extract subgraph states if available
-                // The threadState with subgraphs: true includes a 'tasks' or 'subgraphs' field
-                const subgraphStates = extractSubgraphStates(threadState);
-
-                // NEW: Fetch Custom Tool Calls (Backend Option B)
-                let customToolCalls: Record<string, ToolCallEntry[]> = {};
-                try {
-                    // Use direct fetch to backend endpoint
-                    const res = await fetch(`${apiUrl}/tool-calls/${activeJob.threadId}`);
-                    if (res.ok) {
-                        customToolCalls = await res.json();
-                    }
-                } catch (e) {
-                    // Silently ignore fetch errors (e.g. backend restarting)
+                // Group the new subagent tool calls the way /tool-calls/{id} does
+                const customToolCalls: Record<string, ToolCallEntry[]> = {};
+                for (const entry of delta.tool_calls) {
+                    (customToolCalls[entry.subagent] ??= []).push(entry);
                 }
 
+                const messagesSnapshot = rawMessages;
+                const values = { todos: rawTodos };
                 setState(prev => {
-                    const { messages, todos, subagents } = parseState(values, rawMessages, prev.subagents, subgraphStates, customToolCalls);
-                    const isFinished = threadState.next?.length === 0 && messages.length > 0;
+                    const { messages, todos, subagents } = parseState(values, messagesSnapshot, prev.subagents, undefined, customToolCalls);
 
                     return {
                         ...prev,
@@ -384,12 +386,11 @@ export function usePersistentAgent(options: UsePersistentAgentOptions = {}) {
                         todos,
                         subagents: subagents.length > 0 ? subagents : prev.subagents,
                         isLoading: false,
-                        status: isFinished ? "completed" : "running"
+                        status: delta.finished ? "completed" : "running"
                     };
                 });
 
-                const isFinished = threadState.next?.length === 0 && rawMessages.length > 0;
-                if (isFinished && activeJob.status !== "completed") {
+                if (delta.finished && activeJob.status !== "completed") {
                     completeJob();
                 }
 
@@ -404,7 +405,7 @@ export function usePersistentAgent(options: UsePersistentAgentOptions = {}) {
         return () => {
             if (pollingIntervalRef.current) clearInterval(pollingIntervalRef.current);
         };
-    }, [activeJob?.threadId, apiUrl, activeJob?.status, completeJob, options.disabled, parseState]);
+    }, [activeJob?.threadId, activeJob?.repoId, activeJob?.audience, apiUrl, activeJob?.status, completeJob, options.disabled, parseState]);
 
 
     return {
@@ -419,72 +420,3 @@ export function usePersistentAgent(options: UsePersistentAgentOptions = {}) {
         }
     };
 }
-
-// Helper to extract subgraph states from the threadState response (future-proofing)
-// Note: With current Deep Agents design, subagent tool calls are hidden from state.
-// This infrastructure is in place for when streaming or backend changes enable it.
-function extractSubgraphStates(threadState: any): Array<{ namespace: string[]; state: Record<string, unknown> }> {
-    const results: Array<{ namespace: string[]; state: Record<string, unknown> }> = [];
-
-    // Check tasks field (ThreadTask objects with nested state)
-    if (threadState.tasks && Array.isArray(threadState.tasks)) {
-        for (const task of threadState.tasks) {
-            if (task.state && typeof task.state === 'object') {
-                const subgraphState = task.state;
-                const subgraphValues = subgraphState.values || subgraphState;
-
-                let subagentName = task.name;
-                const colonIdx = subagentName?.indexOf(":") ?? -1;
-                if (colonIdx > 0) {
-                    subagentName = subagentName.slice(0, colonIdx);
-                }
-
-                results.push({
-                    namespace: [subagentName],
-                    state: typeof subgraphValues === 'object' ? subgraphValues : {},
-                });
-
-                // Recursively check for nested subgraph states
-                if (subgraphState.tasks && Array.isArray(subgraphState.tasks)) {
-                    for (const nestedTask of subgraphState.tasks) {
-                        if (nestedTask.state && nestedTask.name) {
-                            const nestedValues = nestedTask.state.values || nestedTask.state;
-                            results.push({
-                                namespace: [subagentName, nestedTask.name],
-                                state: typeof nestedValues === 'object' ? nestedValues : {},
-                            });
-                        }
-                    }
-                }
-            }
-        }
-    }
-
-    // Secondary: subgraphs field
-    if (threadState.subgraphs && typeof threadState.subgraphs === 'object') {
-        for (const [namespace, state] of Object.entries(threadState.subgraphs)) {
-            if (state && typeof state === 'object') {
-                results.push({
-                    namespace: [namespace],
-                    state: state as Record<string, unknown>,
-                });
-            }
-        }
-    }
-
-    // Tertiary: values.subgraph_states
-    const values = threadState.values as Record<string, unknown>;
-    if (values && values.subgraph_states && Array.isArray(values.subgraph_states)) {
-        for (const sg of values.subgraph_states) {
-            if (sg.namespace && sg.state) {
-                results.push({
-                    namespace: Array.isArray(sg.namespace) ? sg.namespace : [sg.namespace],
-                    state: sg.state,
-                });
-            }
-        }
-    }
-
-    return results;
-}
-
@@ -1,6 +1,6 @@
 "use client";
 
-import { useState, useEffect, useCallback } from "react";
+import { useState, useEffect, useCallback, useRef } from "react";
 import { Client } from "@langchain/langgraph-sdk";
 import type { Todo, AgentMessage, SubagentStatus, SubagentToolCall } from "./useAgentStream";
 
@@ -10,9 +10,18 @@ interface ThreadHistoryState {
     subagents: SubagentStatus[];
     isLoading: boolean;
     isSnapshot: boolean; // True if using local metadata instead of LangGraph server
+    hasMoreMessages: boolean; // More snapshot messages in the run history
+    hasMoreToolCalls: boolean; // More subagent tool calls in the run history
     error: Error | null;
 }
 
+type ToolLogEntry = {
+    id: string; subagent: string; tool: string; args_brief: string; timestamp: string; status: string;
+};
+
+// Records per run-history request; further pages load when the user asks for them
+const HISTORY_PAGE_SIZE = 100;
+
 // Helper: Extract brief args from tool call arguments
 function extractBriefArgs(toolName: string, args: Record<string, unknown>): string {
     switch (toolName) {
@@ -56,6 +65,43 @@ function extractBriefArgs(toolName: string, args: Record<string, unknown>): stri
     }
 }
 
+// Helper: Load one page of one kind of run history from the backend (compressed, paged storage)
+async function fetchHistoryPage<T>(
+    apiUrl: string, repoId: string, audience: string, kind: string, offset: number
+): Promise<{ records: T[]; nextOffset: number | null }> {
+    const res = await fetch(`${apiUrl}/tutorials/${encodeURIComponent(repoId)}/${audience}/history?kind=${kind}&offset=${offset}&limit=${HISTORY_PAGE_SIZE}`);
+    if (!res.ok) return { records: [], nextOffset: null };
+    const page = await res.json();
+    return { records: page.records as T[], nextOffset: page.next_offset };
+}
+
+// Helper: Attach logged tool calls to their subagents (sorted by time, without duplicates)
+function mergeToolLog(subagents: SubagentStatus[], toolLog: ToolLogEntry[]): SubagentStatus[] {
+    const merged = subagents.map(agent => ({ ...agent, toolCalls: [...agent.toolCalls] }));
+    const byName = new Map(merged.map(agent => [agent.name, agent] as const));
+
+    for (const entry of toolLog) {
+        const agent = byName.get(entry.subagent);
+        if (entry.status === 'start' && agent && !agent.toolCalls.some(tc => tc.id === entry.id)) {
+            agent.toolCalls.push({
+                id: entry.id,
+                name: entry.tool,
+                briefArgs: entry.args_brief,
+                timestamp: new Date(entry.timestamp)
+            });
+        }
+    }
+
+    for (const agent of merged) {
+        agent.toolCalls.sort((a, b) => {
+            const timeA = a.timestamp instanceof Date ? a.timestamp.getTime() : 0;
+            const timeB = b.timestamp instanceof Date ? b.timestamp.getTime() : 0;
+            return timeA - timeB;
+        });
+    }
+    return merged;
+}
+
 // Helper: Ensure subagent has toolCalls array and hydrated dates (backwards compat for old snapshots)
 function ensureSubagentToolCalls(subagent: Partial<SubagentStatus>): SubagentStatus {
     return {
@@ -83,8 +129,13 @@ export function useThreadHistory(threadId: string | null, repoId?: string | null
         subagents: [],
         isLoading: true,
         isSnapshot: false,
+        hasMoreMessages: false,
+        hasMoreToolCalls: false,
         error: null,
     });
+    // Offsets of the next run-history pages (null once everything is loaded)
+    const nextOffsets = useRef<{ message: number | null; tool_call: number | null }>({ message: null, tool_call: null });
+    const loadingMore = useRef(false);
 
     const fetchHistory = useCallback(async () => {
         if (!threadId) {
@@ -119,6 +170,15 @@ export function useThreadHistory(threadId: string | null, repoId?: string | null
                 console.warn(`[useThreadHistory] Missing repoId or audience for snapshot fetch: repoId=${repoId}, audience=${audience}`);
             }
 
+            nextOffsets.current = { message: null, tool_call: null };
+
+            // Snapshot subagents (activity logs, tool calls) seed the view on both paths below.
+            // Older tutorials inline the snapshot in metadata; newer ones keep it in run history.
+            let snapshotSubagents: Partial<SubagentStatus>[] = snapshot?.subagents || [];
+            if (!snapshot && repoId && audience) {
+                snapshotSubagents = (await fetchHistoryPage<SubagentStatus>(apiUrl, repoId, audience, "subagent", 0)).records;
+            }
+
             const client = new Client({ apiUrl });
 
             // 2. Try to get the current/final state of the thread from server
@@ -127,6 +187,17 @@ export function useThreadHistory(threadId: string | null, repoId?: string | null
                 threadState = await client.threads.getState(threadId);
             } catch (err: any) {
                 if (err.message?.includes("404") || err.status === 404) {
+                    // FALLBACK: Load the snapshot's first page from run history (older tutorials inline it in metadata)
+                    if (!snapshot && repoId && audience) {
+                        const [messagePage, todoPage] = await Promise.all([
+                            fetchHistoryPage<AgentMessage>(apiUrl, repoId, audience, "message", 0),
+                            fetchHistoryPage<Todo>(apiUrl, repoId, audience, "todo", 0),
+                        ]);
+                        if (messagePage.records.length > 0) {
+                            snapshot = { messages: messagePage.records, todos: todoPage.records, subagents: snapshotSubagents };
+                            nextOffsets.current.message = messagePage.nextOffset;
+                        }
+                    }
                     // FALLBACK: Use snapshot if server returns 404
                     if (snapshot) {
                         console.log("[useThreadHistory] Server 404 - Falling back to local snapshot.");
@@ -138,6 +209,8 @@ export function useThreadHistory(threadId: string | null, repoId?: string | null
                             subagents,
                             isLoading: false,
                             isSnapshot: true,
+                            hasMoreMessages: nextOffsets.current.message !== null,
+                            hasMoreToolCalls: false,
                             error: null,
                         });
                         return;
@@ -174,12 +247,10 @@ export function useThreadHistory(threadId: string | null, repoId?: string | null
             // Parse subagents with toolCalls support
             const subagentsMap = new Map<string, SubagentStatus>();
 
-            // First, try to use snapshot subagents if available
-            if (snapshot?.subagents && Array.isArray(snapshot.subagents)) {
-                for (const sa of snapshot.subagents) {
-                    if (sa.name) {
-                        subagentsMap.set(sa.name, ensureSubagentToolCalls(sa));
-                    }
+            // First, use the snapshot subagents if available
+            for (const sa of snapshotSubagents) {
+                if (sa.name) {
+                    subagentsMap.set(sa.name, ensureSubagentToolCalls(sa));
                 }
             }
 
@@ -207,46 +278,25 @@ export function useThreadHistory(threadId: string | null, repoId?: string | null
                 }
             }
 
-            // NEW: Merge tool logs from metadata (Option B Persistence)
-            // Access tool log from the metadata response scope
-            if (meta?.subagent_tool_log && Array.isArray(meta.subagent_tool_log)) {
-                const toolLog = meta.subagent_tool_log as Array<{
-                    id: string; subagent: string; tool: string; args_brief: string; timestamp: string; status: string;
-                }>;
-
-                for (const entry of toolLog) {
-                    if (entry.status === 'start' && subagentsMap.has(entry.subagent)) {
-                        const agent = subagentsMap.get(entry.subagent)!;
-                        // Avoid duplicates if snapshot already had them (unlikely for now but safe)
-                        if (!agent.toolCalls.some(tc => tc.id === entry.id)) {
-                            agent.toolCalls.push({
-                                id: entry.id,
-                                name: entry.tool,
-                                briefArgs: entry.args_brief,
-                                timestamp: new Date(entry.timestamp)
-                            });
-                        }
-                    }
-                }
-
-                // Sort all tool calls by timestamp
-                for (const agent of subagentsMap.values()) {
-                    if (agent.toolCalls.length > 0) {
-                        agent.toolCalls.sort((a, b) => {
-                            const timeA = a.timestamp instanceof Date ? a.timestamp.getTime() : 0;
-                            const timeB = b.timestamp instanceof Date ? b.timestamp.getTime() : 0;
-                            return timeA - timeB;
-                        });
-                    }
-                }
+            // NEW: Merge tool logs from run history (Option B Persistence)
+            // Older tutorials inline the log in metadata; newer ones keep it in paged history
+            let subagents = Array.from(subagentsMap.values());
+            if (Array.isArray(meta?.subagent_tool_log)) {
+                subagents = mergeToolLog(subagents, meta.subagent_tool_log);
+            } else if (repoId && audience) {
+                const page = await fetchHistoryPage<ToolLogEntry>(apiUrl, repoId, audience, "tool_call", 0);
+                subagents = mergeToolLog(subagents, page.records);
+                nextOffsets.current.tool_call = page.nextOffset;
             }
 
             setState({
                 messages,
                 todos,
-                subagents: Array.from(subagentsMap.values()),
+                subagents,
                 isLoading: false,
                 isSnapshot: false,
+                hasMoreMessages: false,
+                hasMoreToolCalls: nextOffsets.current.tool_call !== null,
                 error: null,
             });
         } catch (err) {
@@ -259,6 +309,41 @@ export function useThreadHistory(threadId: string | null, repoId?: string | null
         }
     }, [threadId, repoId, audience]);
 
+    // Load the next page of one kind of run history (on expand / "load more")
+    const loadMore = useCallback(async (kind: "message" | "tool_call") => {
+        const offset = nextOffsets.current[kind];
+        if (offset === null || !repoId || !audience || loadingMore.current) return;
+
+        const apiUrl = process.env.NEXT_PUBLIC_LANGGRAPH_URL || "http://localhost:2024";
+        loadingMore.current = true;
+        try {
+            if (kind === "message") {
+                const page = await fetchHistoryPage<AgentMessage>(apiUrl, repoId, audience, "message", offset);
+                nextOffsets.current.message = page.nextOffset;
+                setState(prev => ({
+                    ...prev,
+                    messages: [...prev.messages, ...page.records],
+                    hasMoreMessages: page.nextOffset !== null,
+                }));
+            } else {
+                const page = await fetchHistoryPage<ToolLogEntry>(apiUrl, repoId, audience, "tool_call", offset);
+                nextOffsets.current.tool_call = page.nextOffset;
+                setState(prev => ({
+                    ...prev,
+                    subagents: mergeToolLog(prev.subagents, page.records),
+                    hasMoreToolCalls: page.nextOffset !== null,
+                }));
+            }
+        } catch (err) {
+            console.warn(`[useThreadHistory] Failed to load more ${kind} history:`, err);
+        } finally {
+            loadingMore.current = false;
+        }
+    }, [repoId, audience]);
+
+    const loadMoreMessages = useCallback(() => loadMore("message"), [loadMore]);
+    const loadMoreToolCalls = useCallback(() => loadMore("tool_call"), [loadMore]);
+
     useEffect(() => {
         fetchHistory();
     }, [fetchHistory]);
@@ -266,5 +351,7 @@ export function useThreadHistory(threadId: string | null, repoId?: string | null
     return {
         ...state,
         refetch: fetchHistory,
+        loadMoreMessages,
+        loadMoreToolCalls,
     };
 }
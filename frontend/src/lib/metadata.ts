@@ -0,0 +1,37 @@
+import { writeFile, rename, rm } from "fs/promises";
+
+// Run history older tutorials inlined into metadata.json (now kept in the backend's history files)
+export const LEGACY_HISTORY_FIELDS = ["snapshot", "subagent_tool_log"];
+
+// Atomic write (temp file + rename) so concurrent readers never see torn JSON
+export async function writeJsonAtomic(filePath: string, data: unknown): Promise<void> {
+    const tmpPath = `${filePath}.${process.pid}.${Date.now()}.tmp`;
+    try {
+        await writeFile(tmpPath, JSON.stringify(data, null, 2));
+        await rename(tmpPath, filePath);
+    } catch (error) {
+        await rm(tmpPath, { force: true });
+        throw error;
+    }
+}
+
+export function hasLegacyHistory(metadata: Record<string, unknown>): boolean {
+    return LEGACY_HISTORY_FIELDS.some((field) => field in metadata);
+}
+
+// Ask the backend to move inlined run history into its history files and drop it from metadata.json.
+// Returns false if the backend is unavailable; the legacy fields then stay and are still readable.
+export async function migrateLegacyHistory(id: string, audience: string): Promise<boolean> {
+    const apiUrl = process.env.NEXT_PUBLIC_LANGGRAPH_URL || "http://localhost:2024";
+    try {
+        const res = await fetch(
+            `${apiUrl}/tutorials/${encodeURIComponent(id)}/${encodeURIComponent(audience)}/history/migrate`,
+            { method: "POST" }
+        );
+        if (!res.ok) return false;
+        const { migrated } = await res.json();
+        return Boolean(migrated);
+    } catch {
+        return false;
+    }
+}